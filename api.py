@@ -0,0 +1,455 @@
+"""
+DOCWISE AI - Standalone HTTP API
+Summarization and doctor recommendation without the Streamlit UI.
+
+Usage:
+    python api.py --port 8000 --workers 4
+
+Endpoints:
+    POST /summarize   PDF as the request body (application/pdf) or as a multipart
+                      form field named "file"; query: max_length, min_length, long_document,
+                      salience_budget (tokens kept by the extractive pre-filter),
+                      deadline_s (latency budget; decoding is planned to fit it)
+    GET  /recommend   ?disease=...&location=...  (POST with a JSON body also works)
+    GET  /health      model status and data version (plus inference worker memory)
+
+With ``--workers N`` the listening socket is opened once and N worker
+processes are forked to accept on it (pre-fork); each loads its own model
+and a crashed worker is replaced. With ``--inference-processes N`` instead,
+one server process loads the model once and forks N inference workers that
+share its weights (see modules/model_pool.py). Connections are HTTP/1.1
+keep-alive.
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from modules.config import (
+    MODEL_NAME, QUANTIZE, SUMMARY_WORKERS, INFERENCE_PROCESSES, API_HOST, API_PORT, API_WORKERS,
+    API_REQUEST_TIMEOUT, API_KEEPALIVE_TIMEOUT, API_MAX_UPLOAD_MB,
+)
+from modules.data_reload import start_watcher, data_version
+from modules.inference_broker import InferenceBroker
+from modules.jobs import SummaryJobQueue, FAILED
+from modules.model_loader import BackgroundModel, load_model, FAILED as MODEL_FAILED
+from modules.model_pool import ModelPool
+from modules.recommendation import recommend as recommend_doctors
+from modules.summary_cache import SummaryCache, PAGE_CACHE_PATH
+from modules.telemetry import telemetry
+from modules.uploads import SpooledUpload, UploadTooLarge, READ_CHUNK_BYTES
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def recommend(disease, location=None, limit=10):
+    """Specialist for ``disease`` and the best matching doctors, as a JSON-ready dict"""
+    found = recommend_doctors(disease, location, limit)
+    result = {"disease": disease, "location": location, "specialist": found.specialist, "method": found.method}
+    if found.specialist is None:
+        return {**result, "nearby": False, "doctors": []}
+    # to_json turns NaN into null and numpy scalars into plain numbers
+    doctors = found.doctors
+    total = doctors.attrs.get("total", len(doctors))
+    return {**result, "nearby": found.nearby, "total": total,
+            "doctors": json.loads(doctors.to_json(orient="records"))}
+
+
+class Services:
+    """Model, broker and job queue of one worker process (created after fork)"""
+
+    def __init__(self, model_name=MODEL_NAME, quantize=QUANTIZE, cache=True, inference_processes=0):
+        self.model = BackgroundModel(lambda: load_model(model_name, quantize=quantize))
+        if inference_processes > 0:
+            self.broker = ModelPool(self.model.get, inference_processes)
+        else:
+            self.broker = InferenceBroker(self.model.get)
+        model_id = f"{model_name}+int8" if quantize else model_name
+        self.jobs = SummaryJobQueue(
+            None,
+            model_id,
+            workers=SUMMARY_WORKERS,
+            cache=SummaryCache() if cache else None,
+            broker=self.broker,
+            page_cache=SummaryCache(PAGE_CACHE_PATH) if cache else None
+        )
+
+
+def _query_int(query, name, default):
+    try:
+        return int(query[name][0]) if name in query else default
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer")
+
+
+def _query_float(query, name, default):
+    try:
+        return float(query[name][0]) if name in query else default
+    except ValueError:
+        raise ApiError(400, f"{name} must be a number")
+
+
+def _multipart_file(data, content_type, max_bytes):
+    """The "file" field of a multipart/form-data body (bytes or an mmap), as a SpooledUpload.
+
+    Parts are located with ``find`` on the spooled body and the file is
+    copied out in chunks, so a large upload is never held in memory whole.
+    """
+    boundary = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1")
+    ).get_param("boundary")
+    if not boundary:
+        raise ApiError(400, "multipart body without a boundary")
+    delimiter = b"\r\n--" + boundary.encode("latin-1")
+    # The first delimiter may open the body, without a CRLF before it
+    position = data.find(delimiter[2:])
+    while position != -1:
+        headers_start = position + len(delimiter) - 2
+        if data[headers_start:headers_start + 2] == b"--":
+            break  # closing delimiter
+        headers_end = data.find(b"\r\n\r\n", headers_start)
+        part_end = data.find(delimiter, headers_end) if headers_end != -1 else -1
+        if part_end == -1:
+            break
+        part = BytesParser(policy=HTTP).parsebytes(data[headers_start:headers_end + 4].lstrip(b"\r\n"))
+        if part.get_param("name", header="content-disposition") == "file":
+            upload = SpooledUpload(max_bytes=max_bytes)
+            try:
+                for start in range(headers_end + 4, part_end, READ_CHUNK_BYTES):
+                    upload.write(data[start:min(start + READ_CHUNK_BYTES, part_end)])
+            except BaseException:
+                # Don't leave a half-written temp file behind
+                upload.close()
+                raise
+            return upload
+        position = part_end + 2
+    raise ApiError(400, 'multipart upload needs a "file" field')
+
+
+def _query_bool(query, name, default):
+    if name not in query:
+        return default
+    return query[name][0].strip().lower() in ("1", "true", "yes", "on")
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open between requests
+    protocol_version = "HTTP/1.1"
+    server_version = "DocwiseAPI/1.0"
+    # Socket timeout: closes idle keep-alive connections and stalled uploads
+    timeout = API_KEEPALIVE_TIMEOUT
+
+    routes = {
+        "/summarize": ("POST", "summarize"),
+        "/recommend": ("GET", "recommend"),
+        "/health": ("GET", "health"),
+    }
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        self._body_read = False
+        try:
+            if url.path not in self.routes:
+                raise ApiError(404, f"unknown path {url.path}")
+            allowed, name = self.routes[url.path]
+            # /recommend also accepts its parameters as a JSON body
+            if method != allowed and not (name == "recommend" and method == "POST"):
+                raise ApiError(405, f"{url.path} expects {allowed}")
+            status, payload = 200, getattr(self, f"_{name}")(query, method)
+        except ApiError as e:
+            status, payload = e.status, {"error": e.message}
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+        if not self._body_read and self.headers.get("Content-Length", "0").strip() != "0":
+            # Answered without reading the body (unknown path, wrong method, bad
+            # parameters): it would be parsed as the next request on this connection
+            self.close_connection = True
+        self._send_json(status, payload)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _content_length(self):
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self.close_connection = True
+            raise ApiError(411, "Content-Length is required")
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # Where the body ends is unknown, so the connection cannot be reused
+            self.close_connection = True
+            raise ApiError(400, "Content-Length must be a non-negative integer")
+        if length > self.server.max_upload_bytes:
+            # The body is not read, so the connection cannot be reused
+            self.close_connection = True
+            raise ApiError(413, f"upload larger than {self.server.max_upload_bytes // (1024 * 1024)} MB")
+        return length
+
+    def _read_body(self):
+        length = self._content_length()
+        try:
+            body = self.rfile.read(length)
+        except TimeoutError:
+            self.close_connection = True
+            raise ApiError(408, "timed out reading the request body")
+        self._body_read = True
+        return body
+
+    def _spool_body(self):
+        """The body copied in chunks into a SpooledUpload (a temp file past the spool size)"""
+        length = self._content_length()
+        try:
+            upload = SpooledUpload.from_stream(self.rfile, length, max_bytes=self.server.max_upload_bytes)
+        except TimeoutError:
+            self.close_connection = True
+            raise ApiError(408, "timed out reading the request body")
+        self._body_read = True
+        return upload
+
+    def _pdf_from_body(self, body):
+        """The uploaded PDF: the whole body, or the "file" field of a multipart form"""
+        content_type = self.headers.get("Content-Type", "")
+        if not content_type.startswith("multipart/form-data"):
+            return body
+        with body:
+            return _multipart_file(body.data(), content_type, self.server.max_upload_bytes)
+
+    def _summarize(self, query, method):
+        # Validated before the body is spooled, so a bad parameter leaves no upload to clean up
+        options = {
+            "max_length": _query_int(query, "max_length", 200),
+            "min_length": _query_int(query, "min_length", 50),
+            "long_document": _query_bool(query, "long_document", True),
+            "salience_budget": _query_int(query, "salience_budget", None),
+            "deadline_s": _query_float(query, "deadline_s", None),
+        }
+        upload = self._pdf_from_body(self._spool_body())
+        services = self.server.services
+        try:
+            if not upload.size:
+                raise ApiError(400, "empty upload")
+            if services.model.status == MODEL_FAILED:
+                raise ApiError(503, f"model failed to load: {services.model.error}")
+        except ApiError:
+            upload.close()
+            raise
+
+        jobs = services.jobs
+        job_id = jobs.submit(upload, **options)
+        job = jobs.wait(job_id, self.server.request_timeout)
+        if not job.finished:
+            # The job keeps running; its result is cached for a retry
+            raise ApiError(504, f"summary not ready within {self.server.request_timeout:g}s")
+        if job.status == FAILED:
+            raise ApiError(413 if isinstance(job.exception, UploadTooLarge) else 422, job.error)
+        result = job.result
+        return {
+            "summary": result["summary"],
+            "word_count": result["word_count"],
+            "page_count": result.get("page_count"),
+            "pages_reused": result.get("pages_reused"),
+            "pages_recomputed": result.get("pages_recomputed"),
+            "salience": result.get("salience"),
+            "generation": result.get("generation"),
+            "memory": result.get("memory"),
+            "from_cache": result["from_cache"],
+            "processing_time": result["processing_time"],
+            "stages": result.get("stages"),
+        }
+
+    def _recommend(self, query, method):
+        params = {name: values[0] for name, values in query.items()}
+        if method == "POST":
+            try:
+                body = json.loads(self._read_body() or b"{}")
+            except ValueError:
+                body = None
+            if not isinstance(body, dict):
+                raise ApiError(400, "body must be a JSON object")
+            params.update(body)
+        disease = str(params.get("disease") or "").strip()
+        if not disease:
+            raise ApiError(400, "disease is required")
+        try:
+            limit = int(params.get("limit", 10))
+        except (TypeError, ValueError):
+            raise ApiError(400, "limit must be an integer")
+        if limit < 0:
+            raise ApiError(400, "limit must not be negative")
+        location = str(params.get("location") or "").strip() or None
+        with telemetry.trace("recommend"):
+            return recommend(disease, location, limit)
+
+    def _health(self, query, method):
+        model = self.server.services.model
+        broker = self.server.services.broker
+        health = {
+            "status": "ok",
+            "pid": os.getpid(),
+            "model": model.status,
+            "model_error": model.error,
+            "data_version": data_version(),
+            "pending_jobs": self.server.services.jobs.pending(),
+        }
+        if isinstance(broker, ModelPool):
+            health["inference"] = {
+                "workers": broker.processes,
+                "restarts": broker.restarts,
+                "shared_memory": broker.shared_memory,
+                "memory": broker.memory(),
+            }
+        return health
+
+    def log_message(self, format, *args):
+        if self.server.access_log:
+            super().log_message(format, *args)
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Connections waiting to be accepted, shared by every pre-forked worker
+    request_queue_size = 128
+
+    def __init__(self, address, request_timeout=API_REQUEST_TIMEOUT, max_upload_mb=API_MAX_UPLOAD_MB,
+                 access_log=False):
+        super().__init__(address, ApiHandler)
+        self.request_timeout = request_timeout
+        self.max_upload_bytes = int(max_upload_mb * 1024 * 1024)
+        self.access_log = access_log
+        self.services = None
+
+
+def run_worker(server, model_name, quantize, cache, inference_processes=0):
+    """Serve requests in this process; model and threads are started here, after any fork"""
+    server.services = Services(model_name, quantize, cache, inference_processes)
+    start_watcher()
+    server.serve_forever()
+
+
+def serve(server, workers, model_name=MODEL_NAME, quantize=QUANTIZE, cache=True, inference_processes=0):
+    if workers <= 1:
+        try:
+            run_worker(server, model_name, quantize, cache, inference_processes)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    # Every worker polls the shared socket; the ones that lose the race for
+    # a connection get EAGAIN instead of blocking in accept()
+    server.socket.setblocking(False)
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            # Ctrl-C reaches the whole process group; let the parent shut workers down
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(server, model_name, quantize, cache)
+            except BaseException:
+                import traceback
+
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited ({status}); starting a replacement", file=sys.stderr)
+            # Back off so a worker that dies on start-up does not spin
+            time.sleep(1)
+            spawn()
+    server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT, help="0 picks a free port")
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="Pre-forked worker processes")
+    parser.add_argument("--inference-processes", type=int, default=INFERENCE_PROCESSES,
+                        help="Inference worker processes forked from one shared model (needs --workers 1)")
+    parser.add_argument("--model", default=MODEL_NAME, help="Model name or local path")
+    parser.add_argument("--quantize", action="store_true", default=QUANTIZE,
+                        help="Apply dynamic int8 quantization to Linear layers")
+    parser.add_argument("--request-timeout", type=float, default=API_REQUEST_TIMEOUT,
+                        help="Seconds /summarize waits before answering 504")
+    parser.add_argument("--keepalive-timeout", type=float, default=API_KEEPALIVE_TIMEOUT,
+                        help="Seconds an idle connection is kept open")
+    parser.add_argument("--max-upload-mb", type=float, default=API_MAX_UPLOAD_MB)
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the shared summary cache")
+    parser.add_argument("--access-log", action="store_true", help="Log every request to stderr")
+    args = parser.parse_args(argv)
+    if args.inference_processes > 0 and args.workers > 1:
+        # Every pre-forked worker would load the model and fork its own pool
+        parser.error("--inference-processes needs --workers 1")
+
+    ApiHandler.timeout = args.keepalive_timeout
+    server = ApiServer(
+        (args.host, args.port),
+        request_timeout=args.request_timeout,
+        max_upload_mb=args.max_upload_mb,
+        access_log=args.access_log
+    )
+    host, port = server.server_address[:2]
+    inference = f" and {args.inference_processes} inference process(es)" if args.inference_processes > 0 else ""
+    print(f"Listening on http://{host}:{port} with {max(args.workers, 1)} worker(s){inference}", file=sys.stderr, flush=True)
+    serve(server, args.workers, args.model, args.quantize, cache=not args.no_cache,
+          inference_processes=args.inference_processes)
+
+
+if __name__ == "__main__":
+    main()
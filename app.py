@@ -5,8 +5,8 @@ Combines PDF Summarization and Doctor Recommendation System
 
 import streamlit as st
 from streamlit_option_menu import option_menu
-import pandas as pd
 import time
+import html
 from pathlib import Path
 import sys
 
@@ -14,13 +14,19 @@ import sys
 sys.path.append(str(Path(__file__).parent))
 
 # Import modules
-from modules.disease_mapper import predict_specialist
-from modules.doctor_filtering import get_doctors_by_specialist
-
-# For PDF summarization
-from transformers import BartForConditionalGeneration, BartTokenizer
-import PyPDF2
-import io
+from modules.doctor_filtering import doctor_index, NEARBY_RADIUS_KM
+from modules.recommendation import recommend as recommend_doctors
+from modules.summary_cache import SummaryCache, PAGE_CACHE_PATH
+from modules.jobs import SummaryJobQueue, DONE, FAILED, QUEUED, EXTRACTING, GENERATING
+from modules.config import (
+    MODEL_NAME, QUANTIZE, SUMMARY_WORKERS, SALIENCE_FILTER, SALIENCE_BUDGET, INFERENCE_PROCESSES, UPLOAD_MAX_MB,
+)
+from modules.model_loader import BackgroundModel, load_model, FAILED as MODEL_FAILED
+from modules.inference_broker import InferenceBroker
+from modules.model_pool import ModelPool
+from modules.telemetry import telemetry
+from modules.uploads import MB
+from modules.data_reload import start_watcher, data_status, data_version
 
 # ============ PAGE CONFIG ============
 st.set_page_config(
@@ -579,63 +585,68 @@ st.markdown("""
 # ============ LOAD MODELS (CACHED) ============
 @st.cache_resource
 def load_bart_model():
-    """Load BART model for PDF summarization"""
-    model_name = "facebook/bart-large-cnn"
-    tokenizer = BartTokenizer.from_pretrained(model_name)
-    model = BartForConditionalGeneration.from_pretrained(model_name)
-    return tokenizer, model
+    """Start loading and warming the BART model in the background (model and quantization set in modules/config.py)"""
+    return BackgroundModel(lambda: load_model(MODEL_NAME, quantize=QUANTIZE))
+
+@st.cache_resource
+def load_summary_cache():
+    """Disk-backed summary cache shared across sessions"""
+    return SummaryCache()
+
+@st.cache_resource
+def load_page_cache():
+    """Per-page texts and chunk summaries, so revised reports only redo changed pages"""
+    return SummaryCache(PAGE_CACHE_PATH)
+
+@st.cache_resource
+def load_inference_broker():
+    """Shared model thread (or forked worker processes) that batches generate calls from every session"""
+    # Both wait for the background load, so jobs can be queued while it warms
+    if INFERENCE_PROCESSES > 0:
+        return ModelPool(load_bart_model().get, INFERENCE_PROCESSES)
+    return InferenceBroker(load_bart_model().get)
 
 @st.cache_resource
+def load_job_queue():
+    """Background summarization workers shared across sessions"""
+    model_id = f"{MODEL_NAME}+int8" if QUANTIZE else MODEL_NAME
+    return SummaryJobQueue(
+        None,
+        model_id,
+        workers=SUMMARY_WORKERS,
+        cache=load_summary_cache(),
+        broker=load_inference_broker(),
+        page_cache=load_page_cache()
+    )
+
+@st.cache_resource(max_entries=1)
+def _doctor_frame(snapshot, _store):
+    """Decoded once per snapshot; the store itself is not hashed"""
+    return _store.to_frame()
+
 def load_doctor_data():
-    """Load doctor profiles CSV"""
+    """Doctor profiles from the shared columnar store (current data version)"""
     try:
-        df = pd.read_csv("data/doctor_profiles.csv")
-        return df
+        store = doctor_index.current.store
+        return _doctor_frame(store.path or id(store), store)
     except:
         return None
 
-# ============ PDF FUNCTIONS ============
-def extract_text_from_pdf(uploaded_file):
-    """Extract text from PDF file"""
-    pdf_reader = PyPDF2.PdfReader(uploaded_file)
-    extracted_text = ""
-    for page in pdf_reader.pages:
-        extracted_text += page.extract_text()
-    return extracted_text
-
-def generate_summary(text, tokenizer, model, max_length=200, min_length=50):
-    """Generate summary using BART model - optimized for speed"""
-    try:
-        # Truncate text for faster processing
-        inputs = tokenizer.encode(
-            "summarize: " + text,
-            max_length=1024,
-            truncation=True,
-            return_tensors="pt"
-        )
-        
-        # Generate summary with optimized parameters for speed
-        summary_ids = model.generate(
-    inputs,
-    max_length=max_length,
-    min_length=min_length,
-    num_beams=2,
-    length_penalty=1.5,
-    early_stopping=True,
-    no_repeat_ngram_size=3,
-    forced_bos_token_id=tokenizer.bos_token_id
-)
-        
-        summary = tokenizer.decode(
-            summary_ids[0],
-            skip_special_tokens=True
-        )
-        
-        return summary
-    except Exception as e:
-        return f"Error generating summary: {str(e)}"
+@st.cache_resource
+def start_data_watcher():
+    """One background thread per server that reloads the CSVs when they change"""
+    return start_watcher()
 
 # ============ DOCTOR DASHBOARD ============
+JOB_POLL_SECONDS = 1.0
+# Faster refresh while a streamed summary is being written
+STREAM_POLL_SECONDS = 0.3
+JOB_STATUS_LABELS = {
+    QUEUED: "⏳ Waiting in queue…",
+    EXTRACTING: "🔄 Extracting text from PDF…",
+    GENERATING: "🤖 Generating AI summary…",
+}
+
 def doctor_dashboard():
     """Doctor Dashboard - PDF Summarization"""
     st.markdown("""
@@ -648,11 +659,17 @@ def doctor_dashboard():
     </div>
     """, unsafe_allow_html=True)
     
-    # Load BART model
-    with st.spinner("Loading AI model…"):
-        tokenizer, model = load_bart_model()
-    
-    st.success("✅ AI model loaded and ready")
+    # The model loads in the background; the page renders while it warms up
+    bart = load_bart_model()
+    if bart.ready:
+        st.success("✅ AI model loaded and ready")
+    elif bart.status == MODEL_FAILED:
+        st.error(f"❌ AI model failed to load: {bart.error}")
+    else:
+        st.info(
+            f"⏳ AI model {bart.status}… ({time.time() - bart.started_at:.0f}s). "
+            "You can upload a report now; it will be summarised as soon as the model is ready."
+        )
     
     # Main content
     col1, col2 = st.columns([1, 1], gap="large")
@@ -678,81 +695,98 @@ def doctor_dashboard():
         
         # Summarization parameters
         with st.expander("⚙️ Summarisation Settings"):
-            max_length = st.slider("Maximum Summary Length", 50, 5000, 200, 10)
+            # BART's decoder has 1024 positions; longer limits were never reachable
+            max_length = st.slider("Maximum Summary Length", 50, 1024, 200, 10)
             min_length = st.slider("Minimum Summary Length", 10, 500, 50, 5)
+            long_document = st.checkbox(
+                "Long document mode",
+                value=True,
+                help="Summarise the full report in overlapping chunks instead of only the first ~1024 tokens"
+            )
+            stream_summary = st.checkbox(
+                "Stream summary as it is written",
+                # Opt-in: streaming decodes greedily, the default keeps beam search
+                value=False,
+                help="Show the summary word by word while it is generated (greedy decoding instead of beam search)"
+            )
+            salience_filter = st.checkbox(
+                "Skip boilerplate (extractive pre-filter)",
+                value=SALIENCE_FILTER,
+                help="Rank sentences and summarise only the most central ones, dropping headers, reference ranges and disclaimers"
+            )
+            salience_budget = st.slider(
+                "Pre-filter token budget", 256, 4096, SALIENCE_BUDGET, 64, disabled=not salience_filter
+            )
+            deadline_s = st.select_slider(
+                "Time budget",
+                options=[None, 5, 10, 20, 30, 60, 120],
+                value=None,
+                format_func=lambda seconds: "No limit" if seconds is None else f"under {seconds} s",
+                help="Pick beam search, greedy decoding or a shorter summary so the result arrives within this time"
+            )
     
     with col2:
         st.markdown('<div class="dw-section-label" style="font-size:0.70rem;font-weight:700;letter-spacing:0.18em;text-transform:uppercase;color:#0077b6;margin-bottom:0.5rem;">Step 2</div>', unsafe_allow_html=True)
         st.markdown('<div class="dw-section-title" style="font-family:Playfair Display,serif;font-size:1.45rem;font-weight:600;color:#0a1628;margin:0 0 1.2rem 0;">Generated Summary</div>', unsafe_allow_html=True)
         
+        job_queue = load_job_queue()
+        
         if uploaded_pdf is not None:
             st.info(f"📎 **{uploaded_pdf.name}** — {uploaded_pdf.size / 1024:.2f} KB")
             
             if st.button("🚀 Generate Summary", use_container_width=True):
-                start_time = time.time()
-                
-                with st.spinner("🔄 Extracting text from PDF…"):
-                    try:
-                        final_text = extract_text_from_pdf(uploaded_pdf)
-                        word_count = len(final_text.split())
-                        st.caption(f"Words detected: {word_count:,}")
-                    except Exception as e:
-                        st.error(f"❌ Error reading PDF: {str(e)}")
-                        return
-                
-                with st.spinner("🤖 Generating AI summary…"):
-                    try:
-                        summary = generate_summary(
-                            final_text,
-                            tokenizer,
-                            model,
-                            max_length,
-                            min_length
-                        )
-                        
-                        end_time = time.time()
-                        processing_time = end_time - start_time
-                        
-                        st.markdown(f"""
-                        <div class="dw-summary-box">
-                            <div class="dw-summary-label" style="font-size:0.68rem;font-weight:700;letter-spacing:0.18em;text-transform:uppercase;color:#0077b6;margin-bottom:0.6rem;">AI Summary</div>
-                            <p style="color:#0a1628 !important;font-size:0.95rem;line-height:1.75;margin:0;">{summary}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        summary_words = len(summary.split())
-                        compression = round((1 - summary_words / word_count) * 100, 1)
-                        
-                        st.markdown(f"""
-                        <div class="dw-metrics-row">
-                            <div class="dw-metric">
-                                <div class="dw-metric-value">{word_count:,}</div>
-                                <div class="dw-metric-label">Original Words</div>
-                            </div>
-                            <div class="dw-metric">
-                                <div class="dw-metric-value">{summary_words}</div>
-                                <div class="dw-metric-label">Summary Words</div>
-                            </div>
-                            <div class="dw-metric">
-                                <div class="dw-metric-value">{compression}%</div>
-                                <div class="dw-metric-label">Compression</div>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        st.success(f"⏱️ Completed in {processing_time:.2f}s")
-                        
-                        st.download_button(
-                            "📥 Download Summary",
-                            summary,
-                            file_name="medical_summary.txt",
-                            mime="text/plain",
-                            use_container_width=True
-                        )
-                        
-                    except Exception as e:
-                        st.error(f"❌ Error generating summary: {str(e)}")
-        else:
+                if uploaded_pdf.size > UPLOAD_MAX_MB * MB:
+                    st.error(f"❌ upload larger than {UPLOAD_MAX_MB:g} MB")
+                else:
+                    # Streamlit already holds the whole upload in memory, so its bytes are
+                    # handed over as they are; only the HTTP API spools uploads to disk
+                    st.session_state.summary_job_id = job_queue.submit(
+                        uploaded_pdf.getvalue(),
+                        max_length=max_length,
+                        min_length=min_length,
+                        long_document=long_document,
+                        stream=stream_summary,
+                        salience_budget=salience_budget if salience_filter else None,
+                        deadline_s=deadline_s
+                    )
+                    st.session_state.summary_file_name = uploaded_pdf.name
+                    st.session_state.pop("summary_result", None)
+        
+        job_id = st.session_state.get("summary_job_id")
+        if job_id is not None:
+            job = job_queue.get(job_id)
+            if job is None:
+                st.session_state.pop("summary_job_id", None)
+                st.warning("⚠️ The summarisation job expired. Please generate the summary again.")
+            elif job.status == DONE:
+                st.session_state.summary_result = job.result
+                st.session_state.pop("summary_job_id", None)
+            elif job.status == FAILED:
+                st.session_state.pop("summary_job_id", None)
+                st.error(f"❌ Error generating summary: {job.error}")
+            else:
+                st.info(f"{JOB_STATUS_LABELS[job.status]} · {time.time() - job.submitted_at:.0f}s elapsed")
+                if job.partial_summary:
+                    render_summary_box(job.partial_summary + " ▌")
+                # Poll again shortly; the job keeps running in the worker between reruns
+                time.sleep(STREAM_POLL_SECONDS if job.params["stream"] else JOB_POLL_SECONDS)
+                st.rerun()
+        
+        result = st.session_state.get("summary_result")
+        if result is not None:
+            render_summary_result(result, job_queue.cache.stats())
+            batching = job_queue.broker.stats()
+            st.caption(
+                f"Inference batching: {batching['requests']} requests in {batching['batches']} generate calls "
+                f"(mean batch {batching['mean_batch_size']:.1f}, largest {batching['largest_batch']})"
+            )
+            if isinstance(job_queue.broker, ModelPool):
+                pool = job_queue.broker.memory()
+                st.caption(
+                    f"Inference processes: {batching['processes']} workers sharing one model · "
+                    f"{pool['pss_mb'] or pool['rss_mb']:,.0f} MB total across {pool['processes']} processes"
+                )
+        elif uploaded_pdf is None and job_id is None:
             st.markdown("""
             <div class="dw-empty-state">
                 <div class="dw-empty-icon" style="font-size:3rem;margin-bottom:0.8rem;opacity:0.5;">📋</div>
@@ -760,7 +794,142 @@ def doctor_dashboard():
             </div>
             """, unsafe_allow_html=True)
 
+def render_summary_box(summary):
+    """The dw-summary-box card, used for both streamed and finished summaries"""
+    st.markdown(f"""
+    <div class="dw-summary-box">
+        <div class="dw-summary-label" style="font-size:0.68rem;font-weight:700;letter-spacing:0.18em;text-transform:uppercase;color:#0077b6;margin-bottom:0.6rem;">AI Summary</div>
+        <p style="color:#0a1628 !important;font-size:0.95rem;line-height:1.75;margin:0;">{html.escape(summary)}</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+def render_summary_result(result, cache_stats):
+    """Render a finished summary with its metrics and download button"""
+    summary = result["summary"]
+    word_count = result["word_count"]
+    
+    if result["from_cache"]:
+        st.caption(f"Words detected: {word_count:,} · served from cache")
+    else:
+        st.caption(
+            f"Words detected: {word_count:,} · {result['page_count']} pages · "
+            f"{result['page_time']:.2f}s total page time (slowest page {result['slowest_page']:.2f}s)"
+        )
+        salience = result.get("salience")
+        if salience:
+            st.caption(
+                f"Pre-filter kept {salience['sentences_kept']} of {salience['sentences_in']} sentences "
+                f"({salience['tokens_kept']:,} of {salience['tokens_in']:,} tokens)"
+            )
+        if "pages_reused" in result:
+            st.caption(
+                f"Pages reused from an earlier version: {result['pages_reused']} · "
+                f"recomputed: {result['pages_recomputed']}"
+            )
+        memory = result.get("memory")
+        if memory:
+            st.caption(
+                f"Process peak memory: {memory['peak_mb']:,.0f} MB (+{memory['growth_mb']:,.1f} MB while this "
+                "summary ran; the whole app process, other sessions' work included)"
+            )
+        generation = result.get("generation")
+        if generation:
+            st.caption(
+                f"Time budget {generation['budget_s']:g}s · decoding: {generation['strategy']} "
+                f"(estimated {generation['estimated_s']:.1f}s, took {generation['generate_s']:.1f}s"
+                + (", stopped at the deadline)" if generation["stopped_at_deadline"] else ")")
+            )
+    
+    render_summary_box(summary)
+    
+    summary_words = len(summary.split())
+    compression = round((1 - summary_words / word_count) * 100, 1) if word_count else 0.0
+    
+    st.markdown(f"""
+    <div class="dw-metrics-row">
+        <div class="dw-metric">
+            <div class="dw-metric-value">{word_count:,}</div>
+            <div class="dw-metric-label">Original Words</div>
+        </div>
+        <div class="dw-metric">
+            <div class="dw-metric-value">{summary_words}</div>
+            <div class="dw-metric-label">Summary Words</div>
+        </div>
+        <div class="dw-metric">
+            <div class="dw-metric-value">{compression}%</div>
+            <div class="dw-metric-label">Compression</div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    ttft = result.get("time_to_first_token")
+    if ttft is not None:
+        st.success(f"⏱️ Completed in {result['processing_time']:.2f}s · first words after {ttft:.2f}s")
+    else:
+        st.success(f"⏱️ Completed in {result['processing_time']:.2f}s")
+    
+    stages = result.get("stages")
+    if stages:
+        st.caption("Stages: " + " · ".join(f"{stage} {seconds:.2f}s" for stage, seconds in stages.items()))
+    
+    st.caption(
+        f"Summary cache: {cache_stats['hits']} hits · {cache_stats['misses']} misses · "
+        f"{cache_stats['entries']} entries ({cache_stats['size_bytes'] / 1024:.1f} KB)"
+    )
+    
+    st.download_button(
+        "📥 Download Summary",
+        summary,
+        file_name="medical_summary.txt",
+        mime="text/plain",
+        use_container_width=True
+    )
+
 # ============ PATIENT DASHBOARD ============
+# Doctor cards shown per page of results; "load more" adds another page
+DOCTOR_PAGE_SIZE = 20
+
+DOCTOR_CARD_HTML = """<div class="dw-doctor-card">
+<div class="dw-doctor-rank" style="font-family:'Playfair Display',serif;font-size:1.6rem;font-weight:700;color:#dde3ec;min-width:2.5rem;line-height:1;">#{rank}</div>
+<div class="dw-doctor-info" style="flex:1;">
+<h3 style="font-size:1.05rem;font-weight:600;color:#0a1628;margin:0 0 0.3rem;">{name}</h3>
+<div class="dw-doctor-meta" style="font-size:0.83rem;color:#4a5568;margin:0.2rem 0;display:flex;flex-wrap:wrap;gap:0.8rem;">
+<span style="color:#4a5568;">👨‍⚕️ {specialist}</span>
+<span style="color:#4a5568;">💼 {experience} yrs exp</span>
+<span style="color:#4a5568;">🏢 {location}</span>
+<span style="color:#4a5568;">📞 {contact}</span>
+</div>
+</div>
+<div class="dw-rating-badge" style="background:linear-gradient(135deg,#0a1628 0%,#112240 100%);border-radius:50%;width:58px;height:58px;display:flex;flex-direction:column;align-items:center;justify-content:center;flex-shrink:0;box-shadow:0 4px 12px rgba(10,22,40,0.20);">
+<div style="font-family:'Playfair Display',serif;font-size:1.15rem;font-weight:700;color:#00b4d8;line-height:1;">{rating}</div>
+<div style="font-size:0.55rem;font-weight:600;letter-spacing:0.10em;text-transform:uppercase;color:rgba(240,244,248,0.65);margin-top:0.15rem;">Rating</div>
+</div>
+</div>"""
+
+def doctor_cards_html(doctors_df):
+    """One HTML block with a card per doctor, ranked in frame order"""
+    distances = doctors_df["Distance_km"] if "Distance_km" in doctors_df else [None] * len(doctors_df)
+    # Zipped columns instead of iterrows: no Series built per row
+    rows = zip(
+        doctors_df["Name"], doctors_df["Specialist"], doctors_df["Experience"],
+        doctors_df["Location"], distances, doctors_df["Contact"], doctors_df["Rating"]
+    )
+    cards = [
+        DOCTOR_CARD_HTML.format(
+            rank=rank,
+            name=html.escape(str(name)),
+            specialist=html.escape(str(specialist)),
+            experience=experience,
+            location=html.escape(str(location)) + (f" · {distance} km" if distance is not None else ""),
+            contact=html.escape(str(contact)),
+            rating=rating
+        )
+        for rank, (name, specialist, experience, location, distance, contact, rating) in enumerate(rows, 1)
+    ]
+    # No blank lines, so markdown keeps the whole list as a single HTML block
+    return '<div class="dw-doctor-list">' + "\n".join(cards) + "</div>"
+
+
 def patient_dashboard():
     """Patient Dashboard - Doctor Recommendation"""
     st.markdown("""
@@ -817,66 +986,77 @@ def patient_dashboard():
         """, unsafe_allow_html=True)
     
     if search_clicked and disease:
+        # Results stay on screen across reruns ("load more") until the next search
+        st.session_state.patient_search = {"disease": disease, "location": location}
+        st.session_state.doctor_results_shown = DOCTOR_PAGE_SIZE
+    elif search_clicked and not disease:
+        st.session_state.pop("patient_search", None)
+        st.warning("⚠️ Please enter a disease or symptom to search for doctors.")
+    
+    search = st.session_state.get("patient_search")
+    if search:
+        disease, location = search["disease"], search["location"]
+        shown = st.session_state.get("doctor_results_shown", DOCTOR_PAGE_SIZE)
         st.markdown("---")
         
         with st.spinner("Matching you with the best specialists…"):
-            specialist = predict_specialist(disease)
+            try:
+                found = recommend_doctors(disease, location, limit=shown)
+            except Exception as e:
+                st.error(f"❌ Error fetching doctors: {str(e)}")
+                return
+            specialist, matches, symptom_matches = found.specialist, found.matches, found.symptom_matches
             
             if specialist:
+                if symptom_matches:
+                    likely = ", ".join(symptom_matches[0].diseases[:3])
+                    others = ", ".join(m.specialist for m in symptom_matches[1:])
+                    st.caption(
+                        f"🔍 Based on your symptoms (possible: {likely})"
+                        + (f" · also consider: {others}" if others else "")
+                    )
+                elif matches[0].score < 1.0:
+                    st.caption(f"🔍 Showing results for **{matches[0].disease}** (closest match, {matches[0].score:.0%})")
                 st.markdown(f"""
                 <div class="dw-specialist-badge">
                     🩺 <span style="color:#0077b6;">Recommended Specialist: <strong style="color:#0a1628;">{specialist}</strong></span>
                 </div>
                 """, unsafe_allow_html=True)
                 
-                try:
-                    doctors_df = get_doctors_by_specialist(
-                        specialist, 
-                        location=location if location else None,
-                        min_experience=2,
-                        min_rating=3.5
-                    )
+                doctors_df = found.doctors
+                if not doctors_df.empty:
+                    total = doctors_df.attrs.get("total", len(doctors_df))
+                    if found.nearby:
+                        st.info(f"📍 No {specialist} found in {location}. Showing doctors in towns within {NEARBY_RADIUS_KM} km.")
+                    
+                    shown_label = f"Top {len(doctors_df)} of {total}" if total > len(doctors_df) else f"Top {len(doctors_df)}"
+                    st.markdown('<div class="dw-section-label" style="font-size:0.70rem;font-weight:700;letter-spacing:0.18em;text-transform:uppercase;color:#0077b6;margin-bottom:0.5rem;">Results</div>', unsafe_allow_html=True)
+                    st.markdown(f'<div class="dw-section-title" style="font-family:Playfair Display,serif;font-size:1.45rem;font-weight:600;color:#0a1628;margin:0 0 1.2rem 0;">{shown_label} Doctors Found</div>', unsafe_allow_html=True)
+                    
+                    # Every card in one element: one frontend delta per page, not per doctor
+                    with telemetry.span("render_doctors", rows=len(doctors_df)):
+                        st.markdown(doctor_cards_html(doctors_df), unsafe_allow_html=True)
+                    
+                    if total > len(doctors_df):
+                        more = min(DOCTOR_PAGE_SIZE, total - len(doctors_df))
+                        if st.button(f"⬇️ Load {more} more", use_container_width=True):
+                            st.session_state.doctor_results_shown = shown + DOCTOR_PAGE_SIZE
+                            st.rerun()
                     
-                    if not doctors_df.empty:
-                        doctors_df = doctors_df.sort_values(by="Rating", ascending=False)
-                        
-                        st.markdown('<div class="dw-section-label" style="font-size:0.70rem;font-weight:700;letter-spacing:0.18em;text-transform:uppercase;color:#0077b6;margin-bottom:0.5rem;">Results</div>', unsafe_allow_html=True)
-                        st.markdown(f'<div class="dw-section-title" style="font-family:Playfair Display,serif;font-size:1.45rem;font-weight:600;color:#0a1628;margin:0 0 1.2rem 0;">Top {len(doctors_df)} Doctors Found</div>', unsafe_allow_html=True)
-                        
-                        for idx, (_, doctor) in enumerate(doctors_df.iterrows(), 1):
-                            st.markdown(f"""
-                            <div class="dw-doctor-card">
-                                <div class="dw-doctor-rank" style="font-family:'Playfair Display',serif;font-size:1.6rem;font-weight:700;color:#dde3ec;min-width:2.5rem;line-height:1;">#{idx}</div>
-                                <div class="dw-doctor-info" style="flex:1;">
-                                    <h3 style="font-size:1.05rem;font-weight:600;color:#0a1628;margin:0 0 0.3rem;">{doctor['Name']}</h3>
-                                    <div class="dw-doctor-meta" style="font-size:0.83rem;color:#4a5568;margin:0.2rem 0;display:flex;flex-wrap:wrap;gap:0.8rem;">
-                                        <span style="color:#4a5568;">👨‍⚕️ {doctor['Specialist']}</span>
-                                        <span style="color:#4a5568;">💼 {doctor['Experience']} yrs exp</span>
-                                        <span style="color:#4a5568;">🏢 {doctor['Location']}</span>
-                                        <span style="color:#4a5568;">📞 {doctor['Contact']}</span>
-                                    </div>
-                                </div>
-                                <div class="dw-rating-badge" style="background:linear-gradient(135deg,#0a1628 0%,#112240 100%);border-radius:50%;width:58px;height:58px;display:flex;flex-direction:column;align-items:center;justify-content:center;flex-shrink:0;box-shadow:0 4px 12px rgba(10,22,40,0.20);">
-                                    <div style="font-family:'Playfair Display',serif;font-size:1.15rem;font-weight:700;color:#00b4d8;line-height:1;">{doctor['Rating']}</div>
-                                    <div style="font-size:0.55rem;font-weight:600;letter-spacing:0.10em;text-transform:uppercase;color:rgba(240,244,248,0.65);margin-top:0.15rem;">Rating</div>
-                                </div>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                    else:
-                        st.warning("⚠️ No suitable doctors found in your area. Try broadening your location.")
-                        
-                except Exception as e:
-                    st.error(f"❌ Error fetching doctors: {str(e)}")
+                else:
+                    st.warning("⚠️ No suitable doctors found in your area. Try broadening your location.")
             else:
                 st.error("❌ Condition not found in our database. Please try a different search term.")
+                if matches:
+                    st.caption("Did you mean: " + ", ".join(m.disease for m in matches) + "?")
     
-    elif search_clicked and not disease:
-        st.warning("⚠️ Please enter a disease or symptom to search for doctors.")
 
 # ============ MAIN APP ============
 def main():
     """Main application - no authentication required"""
+    start_data_watcher()
+    # Kick off the model load on the first page view, whichever dashboard it is
+    load_bart_model()
     
     with st.sidebar:
         st.markdown("""
@@ -918,6 +1098,11 @@ def main():
         st.markdown("""
         <div class="dw-sidebar-footer">DOCWISE AI © 2025</div>
         """, unsafe_allow_html=True)
+        last_reload = max(data_status(), key=lambda s: s["loaded_at"])
+        st.caption(
+            f"Data version {data_version()} · last load: {last_reload['name']} "
+            f"in {last_reload['reload_seconds']:.2f}s"
+        )
     
     if selected == "👨‍⚕️ Doctor":
         doctor_dashboard()
@@ -0,0 +1,195 @@
+"""
+DOCWISE AI - Headless batch summarizer
+Summarizes every PDF under a directory into a JSON-lines file.
+
+Usage:
+    python batch_summarize.py reports/ -o summaries.jsonl
+
+Re-running with the same output file resumes: PDFs already summarized
+successfully are skipped.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from modules.config import MODEL_NAME, QUANTIZE
+from modules.model_loader import load_model
+from modules.pdf_extractor import extract_pages
+from modules.summarizer import summarize_batch, generate_long_summaries
+
+
+def find_pdfs(input_dir):
+    """All PDFs under ``input_dir``, in a stable order"""
+    return sorted(p for p in Path(input_dir).rglob("*") if p.suffix.lower() == ".pdf")
+
+
+def load_completed(output_path):
+    """Relative paths already summarized successfully in an earlier run"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line behind
+                continue
+            if "summary" in record:
+                completed.add(record["file"])
+    return completed
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def extract_text(path):
+    """Extraction worker task: the PDF's text, extracted in this worker process"""
+    # Fanning a large PDF out again from here would start a pool per worker
+    return extract_pages(path, workers=1).text
+
+
+def prefetch_texts(pdfs, executor, depth):
+    """Yield ``(path, text_or_exception)`` while extracting up to ``depth`` files ahead"""
+    futures = []
+    pdfs = iter(pdfs)
+    for path in pdfs:
+        futures.append((path, executor.submit(extract_text, str(path))))
+        if len(futures) >= depth:
+            break
+    while futures:
+        path, future = futures.pop(0)
+        next_path = next(pdfs, None)
+        if next_path is not None:
+            futures.append((next_path, executor.submit(extract_text, str(next_path))))
+        try:
+            yield path, future.result()
+        except Exception as e:
+            yield path, e
+
+
+def batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run(args):
+    input_dir = Path(args.input_dir)
+    completed = load_completed(args.output)
+    pdfs = [p for p in find_pdfs(input_dir) if str(p.relative_to(input_dir)) not in completed]
+    print(f"{len(completed)} already done, {len(pdfs)} to summarize", file=sys.stderr)
+    if not pdfs:
+        return
+
+    tokenizer, model = load_model(args.model, quantize=args.quantize)
+
+    docs = failed = input_tokens = output_tokens = 0
+    start_time = time.time()
+
+    with ProcessPoolExecutor(max_workers=args.extract_workers,
+                             mp_context=multiprocessing.get_context("spawn")) as executor, \
+            open(args.output, "a", encoding="utf-8") as out:
+        # Start on a fresh line if the previous run died mid-record
+        if out.tell() and not _ends_with_newline(args.output):
+            out.write("\n")
+        for batch in batched(prefetch_texts(pdfs, executor, args.prefetch), args.batch_size):
+            records, texts = [], []
+            for path, text in batch:
+                record = {"file": str(path.relative_to(input_dir))}
+                if isinstance(text, Exception):
+                    record["error"] = f"Error reading PDF: {text}"
+                    failed += 1
+                    out.write(json.dumps(record) + "\n")
+                    continue
+                records.append(record)
+                texts.append(text)
+
+            if texts:
+                batch_start = time.time()
+                try:
+                    if args.long_document:
+                        summaries = generate_long_summaries(
+                            texts, tokenizer, model,
+                            max_length=args.max_length,
+                            min_length=args.min_length,
+                            batch_size=args.batch_size
+                        )
+                    else:
+                        summaries = summarize_batch(
+                            texts, tokenizer, model,
+                            max_length=args.max_length,
+                            min_length=args.min_length,
+                            batch_size=args.batch_size
+                        )
+                except Exception as e:
+                    summaries = [e] * len(texts)
+                seconds = (time.time() - batch_start) / len(texts)
+
+                for record, text, summary in zip(records, texts, summaries):
+                    if isinstance(summary, Exception):
+                        record["error"] = f"Error generating summary: {summary}"
+                        failed += 1
+                    else:
+                        n_in = len(tokenizer.encode(text))
+                        n_out = len(tokenizer.encode(summary))
+                        input_tokens += n_in
+                        output_tokens += n_out
+                        docs += 1
+                        record.update({
+                            "summary": summary,
+                            "words": len(text.split()),
+                            "input_tokens": n_in,
+                            "summary_tokens": n_out,
+                            "seconds": round(seconds, 3),
+                        })
+                    out.write(json.dumps(record) + "\n")
+
+            # Make finished records durable before moving on, so a crash
+            # loses at most the batch in flight
+            out.flush()
+            os.fsync(out.fileno())
+            print(f"{docs + failed}/{len(pdfs)} files", file=sys.stderr)
+
+    elapsed = time.time() - start_time
+    print(
+        f"Summarized {docs} documents ({failed} failed) in {elapsed:.1f}s: "
+        f"{docs / elapsed:.2f} docs/sec, "
+        f"{input_tokens / elapsed:.0f} input tokens/sec, "
+        f"{output_tokens / elapsed:.1f} generated tokens/sec"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a directory of PDF medical reports")
+    parser.add_argument("input_dir", help="Directory searched recursively for PDFs")
+    parser.add_argument("-o", "--output", default="summaries.jsonl", help="JSON-lines output file (appended to)")
+    parser.add_argument("--model", default=MODEL_NAME, help="Model name or local path")
+    parser.add_argument("--quantize", action="store_true", default=QUANTIZE,
+                        help="Apply dynamic int8 quantization to Linear layers")
+    parser.add_argument("--batch-size", type=int, default=4, help="Documents per generate call")
+    parser.add_argument("--max-length", type=int, default=200)
+    parser.add_argument("--min-length", type=int, default=50)
+    parser.add_argument("--long-document", action="store_true",
+                        help="Summarize full reports with chunked map-reduce instead of truncating")
+    parser.add_argument("--prefetch", type=int, default=8, help="Files extracted ahead of inference")
+    parser.add_argument("--extract-workers", type=int, default=2, help="Processes used for PDF extraction")
+    run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Local load test of the HTTP API (api.py) with 1, 2 and 4 pre-forked workers.
+
+    python -m benchmarks.bench_api                        # tiny offline BART
+    python -m benchmarks.bench_api --workers 1 4 --clients 16 --duration 20
+
+Starts ``api.py`` on a free local port for each worker count, waits for the
+model to be ready, then drives it with closed-loop keep-alive clients (one
+thread and one connection each) for ``--duration`` seconds per endpoint:
+
+    recommend   GET /recommend with rotating diseases and towns
+    summarize   POST /summarize with a different small PDF every request (cache off)
+"""
+
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_pdf
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DISEASES = ["asthma", "heart attack", "diabetes", "migraine", "chest pain and wheezing", "kidney stones"]
+TOWNS = ["Madurai", "Chennai", "Kumbakonam", "Coimbatore", "Salem", ""]
+
+
+def start_server(workers, model_path):
+    env = {**os.environ, "DOCWISE_MODEL": model_path, "DOCWISE_TELEMETRY": "0", "DOCWISE_RELOAD_INTERVAL": "0"}
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "api.py"), "--port", "0", "--workers", str(workers), "--no-cache"],
+        cwd=ROOT, env=env, stderr=subprocess.PIPE, text=True
+    )
+    # First line: "Listening on http://127.0.0.1:<port> with N worker(s)"
+    line = process.stderr.readline()
+    port = int(line.split("http://", 1)[1].split()[0].rsplit(":", 1)[1])
+    # Keep draining stderr so a chatty server never blocks on a full pipe
+    threading.Thread(target=process.stderr.read, daemon=True).start()
+    return process, port
+
+
+def wait_ready(port, workers, timeout=600):
+    """Poll /health until every worker reports a ready model"""
+    deadline = time.time() + timeout
+    ready = set()
+    while len(ready) < workers:
+        if time.time() > deadline:
+            raise TimeoutError("API workers did not become ready")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/health")
+            health = json.loads(conn.getresponse().read())
+            conn.close()
+            if health["model"] == "ready":
+                ready.add(health["pid"])
+        except OSError:
+            pass
+        time.sleep(0.05)
+
+
+def _client(port, endpoint, stop_at, latencies, errors, lock, seed, pdfs):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    i = seed
+    while time.perf_counter() < stop_at:
+        if endpoint == "recommend":
+            path = f"/recommend?disease={DISEASES[i % len(DISEASES)].replace(' ', '%20')}&location={TOWNS[i % len(TOWNS)]}"
+            method, body, headers = "GET", None, {}
+        else:
+            path = "/summarize?max_length=40&min_length=10"
+            method, body, headers = "POST", pdfs[i % len(pdfs)], {"Content-Type": "application/pdf"}
+        i += 7
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            ok = False
+        with lock:
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors.append(1)
+    conn.close()
+
+
+def load(port, endpoint, clients, duration, pdfs):
+    latencies, errors, lock = [], [], threading.Lock()
+    stop_at = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_client, args=(port, endpoint, stop_at, latencies, errors, lock, i, pdfs))
+        for i in range(clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+    return {
+        "requests_per_s": len(latencies) / seconds,
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000 if latencies else float("nan"),
+        "p95_ms": float(np.percentile(latencies, 95)) * 1000 if latencies else float("nan"),
+        "errors": len(errors),
+    }
+
+
+def run(model_path, worker_counts, clients, duration):
+    pdfs = [make_pdf(pages=2, lines_per_page=20, seed=i) for i in range(500)]
+    results = []
+    for workers in worker_counts:
+        process, port = start_server(workers, model_path)
+        try:
+            wait_ready(port, workers)
+            for endpoint in ("recommend", "summarize"):
+                stats = load(port, endpoint, clients, duration, pdfs)
+                results.append({"workers": workers, "endpoint": endpoint, **stats})
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Model name or path (default: a tiny BART built offline)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per endpoint")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = args.model
+        if model_path is None:
+            from modules.model_loader import build_tiny_bart
+
+            tokenizer, model = build_tiny_bart(tmp, d_model=64, layers=2)
+            tokenizer.save_pretrained(tmp)
+            model.save_pretrained(tmp)
+            model_path = tmp
+
+        print(f"{args.clients} clients, {args.duration:g}s per endpoint")
+        print(f"{'workers':>8} {'endpoint':<10} {'req/s':>9} {'p50':>10} {'p95':>10} {'errors':>7}")
+        for r in run(model_path, args.workers, args.clients, args.duration):
+            print(
+                f"{r['workers']:>8} {r['endpoint']:<10} {r['requests_per_s']:>9.1f} "
+                f"{r['p50_ms']:>8.1f}ms {r['p95_ms']:>8.1f}ms {r['errors']:>7}"
+            )
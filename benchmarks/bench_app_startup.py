@@ -0,0 +1,89 @@
+"""
+Time to first render of each dashboard in a freshly started app.
+
+    python -m benchmarks.bench_app_startup               # tiny offline BART
+    python -m benchmarks.bench_app_startup --model facebook/bart-large-cnn
+
+Every scenario runs in a new process through Streamlit's AppTest, so module
+imports, data loading and the model load are all cold:
+
+    patient             model warm-up started in the background, Patient page rendered
+    doctor              Doctor page rendered while the model warms in the background
+    doctor (blocking)   the previous behaviour: wait for the model, then render
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "patient": "app.load_bart_model()\napp.patient_dashboard()",
+    "doctor": "app.doctor_dashboard()",
+    "doctor (blocking)": "app.load_bart_model().get()\napp.doctor_dashboard()",
+}
+
+
+def _measure(scenario, model_path):
+    """Runs in a child process: seconds to the first complete render"""
+    os.environ["DOCWISE_MODEL"] = model_path
+    os.environ["DOCWISE_TELEMETRY"] = "0"
+    from streamlit.testing.v1 import AppTest
+
+    script = f"import sys\nsys.path.insert(0, {ROOT!r})\nimport app\n{SCENARIOS[scenario]}\n"
+    started = time.perf_counter()
+    at = AppTest.from_string(script, default_timeout=600).run()
+    first_render = time.perf_counter() - started
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    import app
+
+    bart = app.load_bart_model()
+    bart.get()
+    return {
+        "first_render_s": first_render,
+        "model_ready_s": time.perf_counter() - started,
+        "model_load_s": bart.load_seconds,
+        "model_warmup_s": bart.warmup_seconds,
+    }
+
+
+def run(model_path, repeat=3):
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for scenario in SCENARIOS:
+        runs = []
+        for _ in range(repeat):
+            with context.Pool(1) as pool:
+                runs.append(pool.apply(_measure, (scenario, model_path)))
+        best = min(runs, key=lambda r: r["first_render_s"])
+        results.append({"scenario": scenario, **best})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Model name or path (default: a tiny BART built offline)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = args.model
+        if model_path is None:
+            from modules.model_loader import build_tiny_bart
+
+            tokenizer, model = build_tiny_bart(tmp, d_model=64, layers=2)
+            tokenizer.save_pretrained(tmp)
+            model.save_pretrained(tmp)
+            model_path = tmp
+
+        print(f"{'scenario':<20} {'first render':>13} {'model ready':>12} {'load':>8} {'warm-up':>8}")
+        for r in run(model_path, args.repeat):
+            print(
+                f"{r['scenario']:<20} {r['first_render_s']:>12.2f}s {r['model_ready_s']:>11.2f}s "
+                f"{r['model_load_s']:>7.2f}s {r['model_warmup_s']:>7.2f}s"
+            )
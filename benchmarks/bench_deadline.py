@@ -0,0 +1,59 @@
+"""
+Deadline-aware generation: chosen decoding strategy and how well jobs keep their time budget.
+
+    python -m benchmarks.bench_deadline --pages 2 10 --budgets 0.5 1 2 5
+    python -m benchmarks.bench_deadline --model facebook/bart-large-cnn --budgets 5 10 30
+
+The model is warmed up first (the warm-up generate is the speed estimator's
+first sample). Each report is then summarized in long-document mode
+without a budget, then once per ``--budgets`` value.
+"""
+
+import argparse
+
+from benchmarks.synthetic import make_pdf
+from modules.jobs import SummaryJobQueue, DONE
+from modules.model_loader import warm_up
+
+
+def run(tokenizer, model, page_counts, budgets, max_length=200, min_length=50):
+    warm_up(tokenizer, model)
+    jobs = SummaryJobQueue(lambda: (tokenizer, model), "bench")
+    results = []
+    for pages in page_counts:
+        pdf = make_pdf(pages)
+        for budget in [None, *budgets]:
+            job = jobs.wait(jobs.submit(pdf, max_length, min_length, long_document=True, deadline_s=budget))
+            if job.status != DONE:
+                raise RuntimeError(job.error)
+            generation = job.result.get("generation", {})
+            results.append({
+                "pages": pages,
+                "budget_s": budget,
+                "strategy": generation.get("strategy", "unbounded (beam search, map-reduce)"),
+                "estimated_s": generation.get("estimated_s"),
+                # The budget runs from submission, so queueing counts too
+                "seconds": job.finished_at - job.submitted_at,
+                "within_budget": budget is None or job.finished_at - job.submitted_at <= budget,
+                "summary_words": len(job.result["summary"].split()),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Model name or path (default: a tiny BART built offline)")
+    parser.add_argument("--pages", type=int, nargs="+", default=[2, 10])
+    parser.add_argument("--budgets", type=float, nargs="+", default=[0.5, 1, 2, 5])
+    args = parser.parse_args()
+
+    from modules.model_loader import build_tiny_bart, load_model
+
+    tokenizer, model = load_model(args.model) if args.model else build_tiny_bart(d_model=64, layers=2)
+    print(f"{'pages':>5} {'budget':>7} {'total':>8} {'met':>4} {'words':>6}  strategy")
+    for r in run(tokenizer, model, args.pages, args.budgets):
+        budget = "none" if r["budget_s"] is None else f"{r['budget_s']:g}s"
+        print(
+            f"{r['pages']:>5} {budget:>7} {r['seconds']:>7.2f}s {'yes' if r['within_budget'] else 'NO':>4} "
+            f"{r['summary_words']:>6}  {r['strategy']}"
+        )
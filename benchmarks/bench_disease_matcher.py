@@ -0,0 +1,63 @@
+"""
+Disease matcher lookup latency as the vocabulary grows.
+
+    python -m benchmarks.bench_disease_matcher --sizes 1000 10000 50000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_disease_df
+from modules.disease_mapper import DiseaseMatcher
+
+
+def _misspell(name, rng):
+    """Drop one character to simulate a typo"""
+    i = rng.integers(len(name))
+    return name[:i] + name[i + 1:]
+
+
+def run(sizes, queries=500):
+    rng = np.random.default_rng(1)
+    results = []
+    for size in sizes:
+        df = make_disease_df(size)
+        started = time.perf_counter()
+        matcher = DiseaseMatcher(df)
+        build_s = time.perf_counter() - started
+
+        names = df["Disease"].to_numpy()[rng.integers(size, size=queries)]
+        typos = [_misspell(n, rng) for n in names]
+
+        started = time.perf_counter()
+        for name in names:
+            matcher.match(name)
+        exact_us = (time.perf_counter() - started) / queries * 1e6
+
+        started = time.perf_counter()
+        found = sum(matcher.match(t, k=1)[0].disease == n for t, n in zip(typos, names))
+        fuzzy_us = (time.perf_counter() - started) / queries * 1e6
+
+        results.append({
+            "vocabulary": size,
+            "build_s": build_s,
+            "exact_us": exact_us,
+            "fuzzy_us": fuzzy_us,
+            "fuzzy_top1_accuracy": found / queries,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    for r in run(args.sizes, args.queries):
+        print(
+            f"{r['vocabulary']:>7,} terms: build {r['build_s']:.2f}s, exact {r['exact_us']:.1f} µs, "
+            f"fuzzy {r['fuzzy_us']:.1f} µs (top-1 {r['fuzzy_top1_accuracy']:.0%})"
+        )
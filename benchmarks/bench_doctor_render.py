@@ -0,0 +1,136 @@
+"""
+Rendering a large doctor result set: every match card by card vs a top-K page in one block.
+
+    python -m benchmarks.bench_doctor_render --matches 100 1000 10000
+
+Each scenario runs the results part of the patient dashboard as a Streamlit
+script (``streamlit.testing.v1.AppTest``) over a synthetic directory where
+the searched specialist has ``--matches`` doctors:
+
+    legacy   full search, sort_values by rating, one st.markdown per doctor (iterrows)
+    paged    search with limit=page (top K, no sort), all cards in one st.markdown
+
+``render`` is the time spent building and emitting the cards inside the
+script, ``run`` the whole script run as seen by the test runner (search,
+render and delta processing), and ``elements``/``html`` what the browser
+would receive.
+"""
+
+import argparse
+import functools
+import os
+import time
+
+from benchmarks.synthetic import make_doctor_df, SPECIALISTS, RATINGS
+from modules.doctor_filtering import DoctorIndex
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPECIALIST = SPECIALISTS[10]
+MIN_EXPERIENCE, MIN_RATING = 2, 3.5
+
+SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+from benchmarks.bench_doctor_render import render_results
+render_results({mode!r}, {matches}, {page})
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _index(matches):
+    # Doctors are spread evenly over the specialists and ratings; size the
+    # frame so roughly ``matches`` of them pass the search
+    passing = sum(r >= MIN_RATING for r in RATINGS) / len(RATINGS)
+    rows = int(matches * len(SPECIALISTS) / passing)
+    return DoctorIndex(make_doctor_df(rows))
+
+
+def legacy_card(rank, doctor):
+    """The original per-doctor card markup, kept here as the baseline"""
+    return f"""
+    <div class="dw-doctor-card">
+        <div class="dw-doctor-rank" style="font-family:'Playfair Display',serif;font-size:1.6rem;font-weight:700;color:#dde3ec;min-width:2.5rem;line-height:1;">#{rank}</div>
+        <div class="dw-doctor-info" style="flex:1;">
+            <h3 style="font-size:1.05rem;font-weight:600;color:#0a1628;margin:0 0 0.3rem;">{doctor['Name']}</h3>
+            <div class="dw-doctor-meta" style="font-size:0.83rem;color:#4a5568;margin:0.2rem 0;display:flex;flex-wrap:wrap;gap:0.8rem;">
+                <span style="color:#4a5568;">👨‍⚕️ {doctor['Specialist']}</span>
+                <span style="color:#4a5568;">💼 {doctor['Experience']} yrs exp</span>
+                <span style="color:#4a5568;">🏢 {doctor['Location']}</span>
+                <span style="color:#4a5568;">📞 {doctor['Contact']}</span>
+            </div>
+        </div>
+        <div class="dw-rating-badge" style="background:linear-gradient(135deg,#0a1628 0%,#112240 100%);border-radius:50%;width:58px;height:58px;display:flex;flex-direction:column;align-items:center;justify-content:center;flex-shrink:0;box-shadow:0 4px 12px rgba(10,22,40,0.20);">
+            <div style="font-family:'Playfair Display',serif;font-size:1.15rem;font-weight:700;color:#00b4d8;line-height:1;">{doctor['Rating']}</div>
+            <div style="font-size:0.55rem;font-weight:600;letter-spacing:0.10em;text-transform:uppercase;color:rgba(240,244,248,0.65);margin-top:0.15rem;">Rating</div>
+        </div>
+    </div>
+    """
+
+
+def render_results(mode, matches, page):
+    """Body of the benchmark script; timings go to st.session_state.bench"""
+    import streamlit as st
+    from app import doctor_cards_html
+
+    index = _index(matches)
+    started = time.perf_counter()
+    if mode == "legacy":
+        doctors_df = index.search(SPECIALIST, None, MIN_EXPERIENCE, MIN_RATING)
+        doctors_df = doctors_df.sort_values(by="Rating", ascending=False)
+    else:
+        doctors_df = index.search(SPECIALIST, None, MIN_EXPERIENCE, MIN_RATING, limit=page)
+    searched = time.perf_counter()
+    if mode == "legacy":
+        for rank, (_, doctor) in enumerate(doctors_df.iterrows(), 1):
+            st.markdown(legacy_card(rank, doctor), unsafe_allow_html=True)
+    else:
+        st.markdown(doctor_cards_html(doctors_df), unsafe_allow_html=True)
+    st.session_state.bench = {
+        "total": doctors_df.attrs.get("total", len(doctors_df)),
+        "shown": len(doctors_df),
+        "search_ms": (searched - started) * 1000,
+        "render_ms": (time.perf_counter() - searched) * 1000,
+    }
+
+
+def run(match_counts, page=20, repeat=3):
+    from streamlit.testing.v1 import AppTest
+
+    results = []
+    for matches in match_counts:
+        _index(matches)
+        for mode in ("legacy", "paged"):
+            best = None
+            for _ in range(repeat + 1):  # the first run imports app and warms up
+                at = AppTest.from_string(SCRIPT.format(root=ROOT, mode=mode, matches=matches, page=page), default_timeout=600)
+                started = time.perf_counter()
+                at.run()
+                run_ms = (time.perf_counter() - started) * 1000
+                if at.exception:
+                    raise RuntimeError(at.exception[0].message)
+                stats = {**at.session_state["bench"], "run_ms": run_ms}
+                if best is None or run_ms < best["run_ms"]:
+                    best = stats
+            results.append({
+                "matches": matches,
+                "mode": mode,
+                "elements": len(at.markdown),
+                "html_kb": sum(len(m.value.encode()) for m in at.markdown) / 1024,
+                **best,
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--matches", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--page", type=int, default=20, help="Cards per page in the paged mode")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'matches':>8} {'mode':<7} {'shown':>6} {'elements':>9} {'html':>10} {'search':>9} {'render':>10} {'run':>10}")
+    for r in run(args.matches, args.page, args.repeat):
+        print(
+            f"{r['total']:>8,} {r['mode']:<7} {r['shown']:>6,} {r['elements']:>9,} {r['html_kb']:>8.1f}kB "
+            f"{r['search_ms']:>7.2f}ms {r['render_ms']:>8.1f}ms {r['run_ms']:>8.1f}ms"
+        )
@@ -0,0 +1,87 @@
+"""
+Doctor search: original per-call filter/sort vs the precomputed DoctorIndex.
+
+    python -m benchmarks.bench_doctor_search --rows 1000000
+"""
+
+import argparse
+import time
+
+from benchmarks.synthetic import make_doctor_df, SPECIALISTS, LOCATIONS
+from modules.doctor_filtering import DoctorIndex
+
+
+def legacy_get_doctors_by_specialist(doctor_df, specialist, location=None, min_experience=0, min_rating=None):
+    """The original implementation, kept here as the baseline"""
+    doctor_df['Specialist'] = doctor_df['Specialist'].str.strip().str.lower()
+    specialist = specialist.strip().lower()
+    filtered = doctor_df[doctor_df['Specialist'] == specialist]
+    if location:
+        filtered = filtered[filtered['Location'].str.strip().str.lower() == location.strip().lower()]
+    filtered = filtered[filtered['Experience'] >= min_experience]
+    if min_rating is not None and "Rating" in filtered.columns:
+        filtered = filtered[filtered['Rating'] >= min_rating]
+        filtered = filtered.sort_values(by=["Rating", "Experience"], ascending=[False, False])
+    else:
+        filtered = filtered.sort_values(by="Experience", ascending=False)
+    return filtered
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(rows, repeat=5):
+    df = make_doctor_df(rows)
+    started = time.perf_counter()
+    index = DoctorIndex(df)
+    build_s = time.perf_counter() - started
+
+    queries = [
+        (SPECIALISTS[0], LOCATIONS[0], 2, 3.5),
+        (SPECIALISTS[5], None, 2, 3.5),
+        (SPECIALISTS[10], LOCATIONS[8], 10, None),
+    ]
+    results = []
+    for specialist, location, min_experience, min_rating in queries:
+        args = (specialist, location, min_experience, min_rating)
+        expected = legacy_get_doctors_by_specialist(df, *args)
+        actual = index.search(*args)
+        if min_rating is not None:
+            # Multi-column sort_values is stable, so order must match exactly
+            identical = expected.index.equals(actual.index)
+        else:
+            # Single-column sort_values is not stable; compare as sets + sortedness
+            identical = (
+                set(expected.index) == set(actual.index)
+                and actual["Experience"].is_monotonic_decreasing
+            )
+        results.append({
+            "query": args,
+            "matches": len(actual),
+            "identical": identical,
+            "legacy_ms": _time(lambda: legacy_get_doctors_by_specialist(df, *args), repeat) * 1000,
+            "index_ms": _time(lambda: index.search(*args), repeat) * 1000,
+        })
+    return {"rows": rows, "index_build_s": build_s, "queries": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    report = run(args.rows, args.repeat)
+    print(f"{report['rows']:,} doctors, index built in {report['index_build_s']:.2f}s")
+    for q in report["queries"]:
+        print(
+            f"{q['query']}: {q['matches']:,} matches, identical={q['identical']}, "
+            f"legacy {q['legacy_ms']:.1f} ms, index {q['index_ms']:.2f} ms "
+            f"({q['legacy_ms'] / q['index_ms']:.0f}x)"
+        )
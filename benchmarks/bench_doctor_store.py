@@ -0,0 +1,85 @@
+"""
+Doctor directory startup: three independent CSV loads vs the shared columnar store.
+
+    python -m benchmarks.bench_doctor_store --rows 1000 100000 1000000
+
+Every scenario runs in a fresh process so resident memory and load time are
+what a newly started app would see:
+
+    csv x3      what doctor_filtering, doctor_profiles and app.py used to do
+    store cold  first start: parse the CSV, write the .npy snapshot, build the index
+    store warm  later starts: memory-map the snapshot, build the index
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import write_doctor_profiles_csv
+
+
+def _csv_x3(csv_path, snapshot_dir):
+    import pandas as pd
+
+    frames = [pd.read_csv(csv_path) for _ in range(3)]
+    return sum(int(f.memory_usage(deep=True).sum()) for f in frames)
+
+
+def _store(csv_path, snapshot_dir):
+    from modules.doctor_filtering import DoctorIndex
+    from modules.doctor_store import load_doctor_store
+
+    store = load_doctor_store(csv_path, snapshot_dir)
+    DoctorIndex(store).search("Cardiologist", "Madurai", 2, 3.5)
+    return store.nbytes()
+
+
+SCENARIOS = {"csv x3": _csv_x3, "store cold": _store, "store warm": _store}
+
+
+def _measure(scenario, csv_path, snapshot_dir):
+    """Runs in a child process: seconds and resident-memory growth of one start"""
+    # Import the libraries first so only the data itself is measured
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+
+    import modules.doctor_filtering  # noqa: F401 (also builds the app's own small store)
+    from modules.telemetry import current_rss_mb
+
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    data_bytes = SCENARIOS[scenario](csv_path, snapshot_dir)
+    return {
+        "seconds": time.perf_counter() - started,
+        "rss_growth_mb": current_rss_mb() - rss_before,
+        "data_mb": data_bytes / (1024 * 1024),
+    }
+
+
+def run(row_counts):
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in row_counts:
+            csv_path = write_doctor_profiles_csv(os.path.join(tmp, f"doctors_{rows}.csv"), rows)
+            snapshot_dir = os.path.join(tmp, f"snapshots_{rows}")
+            for scenario in SCENARIOS:
+                with context.Pool(1) as pool:
+                    stats = pool.apply(_measure, (scenario, csv_path, snapshot_dir))
+                results.append({"rows": rows, "scenario": scenario, **stats})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'scenario':<12} {'startup':>10} {'RSS growth':>12} {'data':>10}")
+    for r in run(args.rows):
+        print(
+            f"{r['rows']:>10,} {r['scenario']:<12} {r['seconds'] * 1000:>8.1f}ms "
+            f"{r['rss_growth_mb']:>10.1f}MB {r['data_mb']:>8.1f}MB"
+        )
@@ -0,0 +1,70 @@
+"""
+Re-summarizing a revised report: whole-document map-reduce vs the page-level cache.
+
+    python -m benchmarks.bench_incremental_summary --pages 20 --revised 3 11
+    python -m benchmarks.bench_incremental_summary --model facebook/bart-large-cnn --pages 10
+
+A report is summarized once, then re-issued with the ``--revised`` pages
+changed and summarized again:
+
+    full          no page cache: every page is extracted and summarized again
+    incremental   page texts and page chunk summaries come from the page cache;
+                  only the revised pages and the final combination are redone
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_pdf
+from modules.jobs import SummaryJobQueue, DONE
+from modules.summary_cache import SummaryCache
+
+
+def _summarize(jobs, pdf_bytes, max_length, min_length):
+    started = time.perf_counter()
+    job = jobs.wait(jobs.submit(pdf_bytes, max_length, min_length, long_document=True))
+    if job.status != DONE:
+        raise RuntimeError(job.error)
+    return time.perf_counter() - started, job.result
+
+
+def run(tokenizer, model, pages, revised, max_length=60, min_length=10):
+    original = make_pdf(pages)
+    reissued = make_pdf(pages, revised=set(revised))
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scenario in ("full", "incremental"):
+            page_cache = SummaryCache(os.path.join(tmp, f"{scenario}.sqlite3")) if scenario == "incremental" else None
+            jobs = SummaryJobQueue(lambda: (tokenizer, model), "bench", page_cache=page_cache)
+            first_s, _ = _summarize(jobs, original, max_length, min_length)
+            seconds, result = _summarize(jobs, reissued, max_length, min_length)
+            results.append({
+                "scenario": scenario,
+                "first_s": first_s,
+                "revised_s": seconds,
+                "extract_s": result["stages"].get("pdf_extraction", 0.0),
+                "pages_reused": result.get("pages_reused", 0),
+                "pages_recomputed": result.get("pages_recomputed", result["page_count"]),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Model name or path (default: a tiny BART built offline)")
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--revised", type=int, nargs="+", default=[3, 11], help="0-based pages changed in the re-issue")
+    args = parser.parse_args()
+
+    from modules.model_loader import build_tiny_bart, load_model
+
+    tokenizer, model = load_model(args.model) if args.model else build_tiny_bart(d_model=64, layers=2)
+    print(f"{args.pages} pages, revised: {', '.join(str(p) for p in args.revised)}")
+    print(f"{'scenario':<12} {'first issue':>12} {'re-issue':>10} {'extraction':>11} {'reused':>7} {'recomputed':>11}")
+    for r in run(tokenizer, model, args.pages, args.revised):
+        print(
+            f"{r['scenario']:<12} {r['first_s']:>11.2f}s {r['revised_s']:>9.2f}s {r['extract_s'] * 1000:>9.1f}ms "
+            f"{r['pages_reused']:>7} {r['pages_recomputed']:>11}"
+        )
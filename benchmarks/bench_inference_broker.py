@@ -0,0 +1,106 @@
+"""
+Summarization throughput against concurrency: per-session generate vs the shared inference broker.
+
+    python -m benchmarks.bench_inference_broker --clients 1 2 4 8 16
+    python -m benchmarks.bench_inference_broker --model facebook/bart-large-cnn --requests 2
+
+Each client is a thread that sends ``--requests`` summaries back to back,
+like a session waiting on its own result:
+
+    direct   every client calls generate on the shared model with a batch of one
+    broker   clients submit to the InferenceBroker, which batches across clients
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import REPORT_LINES
+from modules.config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+from modules.inference_broker import InferenceBroker
+from modules.summarizer import generate_summary
+
+
+def make_reports(count, lines=12, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        " ".join(REPORT_LINES[i] for i in rng.integers(len(REPORT_LINES), size=lines))
+        for _ in range(count)
+    ]
+
+
+def _drive(clients, requests, summarize):
+    """Run ``clients`` threads; returns (wall seconds, per-request latencies)"""
+    reports = make_reports(clients * requests)
+    latencies = []
+    lock = threading.Lock()
+    start = threading.Barrier(clients + 1)
+
+    def client(offset):
+        start.wait()
+        for text in reports[offset:offset + requests]:
+            started = time.perf_counter()
+            summarize(text)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=client, args=(i * requests,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, latencies
+
+
+def run(tokenizer, model, client_counts, requests=4, max_length=60, min_length=20,
+        max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS):
+    broker = InferenceBroker(lambda: (tokenizer, model), max_batch_size, max_wait_ms)
+    scenarios = {
+        "direct": lambda text: generate_summary(text, tokenizer, model, max_length, min_length),
+        "broker": lambda text: broker.summarize(text, max_length, min_length),
+    }
+    # Warm both paths so one-off allocations are not counted
+    for summarize in scenarios.values():
+        summarize(make_reports(1)[0])
+
+    results = []
+    for clients in client_counts:
+        for scenario, summarize in scenarios.items():
+            batches_before = broker.stats()["batches"]
+            seconds, latencies = _drive(clients, requests, summarize)
+            batches = broker.stats()["batches"] - batches_before
+            results.append({
+                "clients": clients,
+                "scenario": scenario,
+                "requests_per_s": len(latencies) / seconds,
+                "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+                "p95_ms": float(np.percentile(latencies, 95)) * 1000,
+                "mean_batch": len(latencies) / batches if batches else 1.0,
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Model name or path (default: a tiny BART built offline)")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=4, help="Summaries per client")
+    parser.add_argument("--max-batch-size", type=int, default=BATCH_MAX_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=BATCH_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    from modules.model_loader import build_tiny_bart, load_model
+
+    tokenizer, model = load_model(args.model) if args.model else build_tiny_bart(d_model=128, layers=2)
+    print(f"max batch {args.max_batch_size}, max wait {args.max_wait_ms:g} ms")
+    print(f"{'clients':>8} {'scenario':<8} {'req/s':>8} {'p50':>10} {'p95':>10} {'batch':>6}")
+    for r in run(tokenizer, model, args.clients, args.requests,
+                 max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms):
+        print(
+            f"{r['clients']:>8} {r['scenario']:<8} {r['requests_per_s']:>8.2f} "
+            f"{r['p50_ms']:>8.0f}ms {r['p95_ms']:>8.0f}ms {r['mean_batch']:>6.1f}"
+        )
@@ -0,0 +1,187 @@
+"""
+Multi-process model serving: total memory and throughput of N inference workers.
+
+    python -m benchmarks.bench_model_pool --workers 1 2 4 8
+    python -m benchmarks.bench_model_pool --model facebook/bart-large-cnn --workers 1 2 4 --requests 16
+
+For each worker count the same ``--requests`` reports are summarized by
+
+    shared     a ModelPool: the model is loaded once, moved to shared memory
+               and the workers are forked from it, so they map the same weights
+    separate   the same queue and worker loop, but every worker is its own
+               process that loads its own copy (like running N replicas)
+
+``rss`` is the resident memory summed over every process involved (the
+parent too in shared mode, which holds the model); it counts pages shared
+between processes once per process. ``pss`` splits shared pages between
+the processes that map them, so its sum is the real footprint. Both are
+taken once the workers are idle again; ``peak`` is the highest summed PSS
+sampled during the timed run. Without ``--model`` a randomly initialised
+BART of roughly bart-base size is built offline (``--d-model``, ``--layers``).
+
+An fp32 safetensors checkpoint is loaded as memory-mapped file pages, which
+separate processes already share through the page cache; use ``--quantize``
+to see weights that each separate process holds privately.
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from benchmarks.bench_inference_broker import make_reports
+from modules.model_loader import load_model, warm_up
+from modules.model_pool import ModelPool, _serve
+from modules.summarizer import NUM_BEAMS
+from modules.telemetry import process_memory_mb
+
+MAX_LENGTH = 60
+MIN_LENGTH = 10
+# Seconds between memory samples during the timed run, and before the idle reading
+SAMPLE_INTERVAL_S = 0.05
+SETTLE_S = 1.0
+
+
+def _load_and_serve(model_path, quantize, requests, results, threads, max_batch_size, max_wait_ms):
+    """A separate-mode worker: its own model copy, then the pool's worker loop"""
+    tokenizer, model = load_model(model_path, quantize=quantize)
+    warm_up(tokenizer, model)
+    results.put(("ready", os.getpid(), []))
+    _serve(tokenizer, model, requests, results, threads, max_batch_size, max_wait_ms)
+
+
+def _memory(pids):
+    rss, pss = zip(*(process_memory_mb(pid) for pid in pids))
+    return sum(rss), sum(pss) if None not in pss else None
+
+
+@contextmanager
+def _timed(pids):
+    """Time the block and sample the summed PSS of ``pids`` while it runs"""
+    record = {"peak_mb": 0.0}
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(SAMPLE_INTERVAL_S):
+            record["peak_mb"] = max(record["peak_mb"], _memory(pids)[1] or 0.0)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = time.perf_counter() - started
+        stop.set()
+        sampler.join()
+        time.sleep(SETTLE_S)
+        record["rss_mb"], record["pss_mb"] = _memory(pids)
+
+
+def run_shared(model_path, quantize, workers, texts):
+    pool = ModelPool(lambda: load_model(model_path, quantize=quantize), processes=workers)
+    try:
+        # Every worker's first generate pays for lazy initialisation
+        pool.summarize_batch(texts[:workers * 2], max_length=MAX_LENGTH, min_length=MIN_LENGTH)
+        with _timed(["self", *(worker.pid for worker in pool._workers)]) as record:
+            pool.summarize_batch(texts, max_length=MAX_LENGTH, min_length=MIN_LENGTH)
+        return record
+    finally:
+        pool.close()
+
+
+def run_separate(model_path, quantize, workers, texts, max_batch_size, max_wait_ms):
+    context = multiprocessing.get_context("spawn")
+    requests, results = context.Queue(), context.Queue()
+    threads = max(1, (multiprocessing.cpu_count() or 1) // workers)
+    processes = [
+        context.Process(
+            target=_load_and_serve,
+            args=(model_path, quantize, requests, results, threads, max_batch_size, max_wait_ms),
+            daemon=True,
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def summarize(batch):
+        for i, text in enumerate(batch):
+            requests.put((i, text, (MAX_LENGTH, MIN_LENGTH, NUM_BEAMS), time.monotonic()))
+        done = 0
+        while done < len(batch):
+            kind, _, ids, *rest = results.get()
+            if kind == "failed":
+                raise RuntimeError(rest[0])
+            if kind == "done":
+                done += len(ids)
+
+    try:
+        for _ in processes:
+            while results.get()[0] != "ready":
+                pass
+        summarize(texts[:workers * 2])
+        with _timed([process.pid for process in processes]) as record:
+            summarize(texts)
+        return record
+    finally:
+        for _ in processes:
+            requests.put(None)
+        for process in processes:
+            process.join(10)
+
+
+def run(model_path, worker_counts, requests, modes=("shared", "separate"), quantize=False):
+    from modules.config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+
+    texts = make_reports(requests)
+    results = []
+    for workers in worker_counts:
+        for mode in modes:
+            if mode == "shared":
+                record = run_shared(model_path, quantize, workers, texts)
+            else:
+                record = run_separate(model_path, quantize, workers, texts, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS)
+            results.append({
+                "workers": workers,
+                "mode": mode,
+                **record,
+                "throughput": len(texts) / record["seconds"],
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Model name or path (default: a random BART built offline)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests", type=int, default=32, help="Reports summarized per run")
+    parser.add_argument("--modes", nargs="+", choices=["shared", "separate"], default=["shared", "separate"])
+    parser.add_argument("--quantize", action="store_true", help="Dynamic int8 quantization at load time")
+    parser.add_argument("--d-model", type=int, default=768)
+    parser.add_argument("--layers", type=int, default=6)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        model_path = args.model
+        if model_path is None:
+            from modules.model_loader import build_tiny_bart
+
+            tokenizer, model = build_tiny_bart(model_dir, d_model=args.d_model, layers=args.layers)
+            tokenizer.save_pretrained(model_dir)
+            model.save_pretrained(model_dir)
+            print(f"Random BART: {sum(p.numel() for p in model.parameters()) / 1e6:.0f}M parameters, "
+                  f"{sum(p.numel() * p.element_size() for p in model.parameters()) / 2**20:.0f} MB of weights")
+            del tokenizer, model
+            model_path = model_dir
+
+        print(f"{'workers':>7} {'mode':<9} {'rss':>9} {'pss':>9} {'peak':>9} {'time':>7} {'req/s':>7}")
+        for r in run(model_path, args.workers, args.requests, args.modes, args.quantize):
+            pss = "n/a" if r["pss_mb"] is None else f"{r['pss_mb']:.0f}MB"
+            print(
+                f"{r['workers']:>7} {r['mode']:<9} {r['rss_mb']:>7.0f}MB {pss:>9} {r['peak_mb']:>7.0f}MB "
+                f"{r['seconds']:>6.2f}s {r['throughput']:>7.2f}"
+            )
@@ -0,0 +1,100 @@
+"""
+Nearest-city fallback: brute-force haversine over every town vs the KD-tree CityIndex.
+
+    python -m benchmarks.bench_nearby_search --cities 20000 --rows 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_doctor_df, SPECIALISTS
+from modules.doctor_filtering import DoctorIndex
+from modules.geo import CityIndex, EARTH_RADIUS_KM
+
+
+def make_gazetteer(cities, seed=0):
+    """Synthetic towns scattered over roughly the Tamil Nadu bounding box"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "City": [f"Town {i}" for i in range(cities)],
+        "Latitude": rng.uniform(8.0, 13.5, size=cities),
+        "Longitude": rng.uniform(76.2, 80.3, size=cities),
+    })
+
+
+def brute_force_nearest(gazetteer, city, k):
+    """Haversine to every town, then a full sort: the baseline"""
+    origin = gazetteer[gazetteer["City"] == city].iloc[0]
+    lat1, lon1 = np.radians(origin["Latitude"]), np.radians(origin["Longitude"])
+    lat2, lon2 = np.radians(gazetteer["Latitude"].to_numpy()), np.radians(gazetteer["Longitude"].to_numpy())
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    km = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+    order = np.argsort(km, kind="stable")[:k]
+    return list(zip(gazetteer["City"].to_numpy()[order], km[order]))
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(cities, rows, k=10, radius_km=25, repeat=5):
+    gazetteer = make_gazetteer(cities)
+    started = time.perf_counter()
+    city_index = CityIndex(gazetteer)
+    tree_build_s = time.perf_counter() - started
+
+    doctors = make_doctor_df(rows, locations=list(gazetteer["City"]))
+    doctor_index = DoctorIndex(doctors)
+
+    origin = gazetteer["City"].iloc[0]
+    expected = brute_force_nearest(gazetteer, origin, k)
+    actual = city_index.nearest(origin, k=k)
+    identical = (
+        [c for c, _ in expected] == [c for c, _ in actual]
+        and np.allclose([d for _, d in expected], [d for _, d in actual], atol=1e-6)
+    )
+    nearby = city_index.nearest(origin, k=k)
+    return {
+        "cities": cities,
+        "rows": rows,
+        "tree_build_ms": tree_build_s * 1000,
+        "identical": identical,
+        "brute_force_ms": _time(lambda: brute_force_nearest(gazetteer, origin, k), repeat) * 1000,
+        "kdtree_knn_ms": _time(lambda: city_index.nearest(origin, k=k), repeat) * 1000,
+        "kdtree_radius_ms": _time(lambda: city_index.within(origin, radius_km), repeat) * 1000,
+        "radius_cities": len(city_index.within(origin, radius_km)),
+        "doctor_fetch_ms": _time(
+            lambda: doctor_index.search_nearby(SPECIALISTS[0], nearby, 2, 3.5, limit=50), repeat
+        ) * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, default=20_000)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--radius-km", type=float, default=25)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    report = run(args.cities, args.rows, args.k, args.radius_km, args.repeat)
+    print(
+        f"{report['cities']:,} towns, {report['rows']:,} doctors, "
+        f"KD-tree built in {report['tree_build_ms']:.1f} ms, identical={report['identical']}"
+    )
+    print(
+        f"{args.k} nearest: brute force {report['brute_force_ms']:.2f} ms, "
+        f"KD-tree {report['kdtree_knn_ms']:.3f} ms "
+        f"({report['brute_force_ms'] / report['kdtree_knn_ms']:.0f}x)"
+    )
+    print(f"within {args.radius_km:g} km: {report['radius_cities']} towns in {report['kdtree_radius_ms']:.3f} ms")
+    print(f"doctor fetch over the {args.k} nearest towns: {report['doctor_fetch_ms']:.2f} ms")
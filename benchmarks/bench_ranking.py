@@ -0,0 +1,78 @@
+"""
+Doctor ranking: sort-based top K vs the vectorized composite score with argpartition.
+
+    python -m benchmarks.bench_ranking --rows 100000 1000000 5000000 --k 20
+
+Over ``--rows`` synthetic candidates (rating, experience, distance columns):
+
+    lexicographic   sort_values(["Rating", "Experience"]).head(k), the original ranking
+    composite_sort  composite score, then a full stable argsort
+    composite_topk  composite score, then argpartition top K (CompositeRanker.rank)
+
+The last two must pick the same doctors in the same order ("identical").
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_doctor_df
+from modules.config import RANK_WEIGHTS
+from modules.ranking import CompositeRanker
+
+
+def _time(fn, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def run(rows, k=20, repeat=3, seed=0):
+    df = make_doctor_df(rows, seed=seed)
+    df["Distance_km"] = np.random.default_rng(seed).uniform(0, 150, rows).round(1)
+    rating, experience, distance = (df[c].to_numpy() for c in ("Rating", "Experience", "Distance_km"))
+    ranker = CompositeRanker(
+        RANK_WEIGHTS,
+        rating_range=(rating.min(), rating.max()),
+        experience_range=(experience.min(), experience.max()),
+        distance_scale_km=150,
+    )
+
+    lexicographic_s, _ = _time(
+        lambda: df.sort_values(["Rating", "Experience"], ascending=False).head(k), repeat
+    )
+    score_s, _ = _time(lambda: ranker.scores(rating, experience, distance), repeat)
+    sort_s, by_sort = _time(
+        lambda: np.argsort(-ranker.scores(rating, experience, distance), kind="stable")[:k], repeat
+    )
+    topk_s, by_topk = _time(lambda: ranker.rank(rating, experience, distance, limit=k), repeat)
+    return {
+        "rows": rows,
+        "k": k,
+        "lexicographic_ms": lexicographic_s * 1000,
+        "score_ms": score_s * 1000,
+        "composite_sort_ms": sort_s * 1000,
+        "composite_topk_ms": topk_s * 1000,
+        "identical": bool(np.array_equal(by_sort, by_topk)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"weights: {RANK_WEIGHTS}")
+    print(f"{'rows':>10} {'k':>4} {'lexicographic':>14} {'score only':>11} {'score+sort':>11} {'score+topk':>11} {'identical':>10}")
+    for rows in args.rows:
+        r = run(rows, args.k, args.repeat)
+        print(
+            f"{r['rows']:>10,} {r['k']:>4} {r['lexicographic_ms']:>12.1f}ms {r['score_ms']:>9.1f}ms "
+            f"{r['composite_sort_ms']:>9.1f}ms {r['composite_topk_ms']:>9.1f}ms {str(r['identical']):>10}"
+        )
@@ -0,0 +1,85 @@
+"""
+Extractive pre-filter: model time saved and summary agreement with the unfiltered run.
+
+    python -m benchmarks.bench_salience --pages 10 --budgets 256 512 768
+    python -m benchmarks.bench_salience --model facebook/bart-large-cnn --pdf report.pdf
+
+For each budget the report is summarized after ``select_salient`` kept the
+top-ranked sentences, and compared with the same mode on the raw text:
+
+    truncate   generate_summary (the encoder sees the first 1024 tokens)
+    long       generate_long_summary (chunked map-reduce over the whole report)
+
+Agreement is the ROUGE-1 style unigram F1 against the unfiltered summary;
+it is only meaningful with a real model (the tiny offline BART is random).
+"""
+
+import argparse
+import time
+
+from benchmarks.synthetic import make_pdf
+from modules.jobs import stage_durations
+from modules.model_loader import unigram_f1
+from modules.pdf_extractor import extract_pages
+from modules.salience import select_salient, TEXTRANK, CENTROID
+from modules.summarizer import generate_summary, generate_long_summary
+from modules.telemetry import telemetry
+
+MODES = {"truncate": generate_summary, "long": generate_long_summary}
+
+
+def _summarize(summarize, text, tokenizer, model, max_length, min_length):
+    started = time.perf_counter()
+    with telemetry.trace("bench_salience") as trace:
+        summary = summarize(text, tokenizer, model, max_length, min_length)
+    stages = stage_durations(trace)
+    tokens_in = sum(span.get("tokens_in", 0) for span in trace["spans"] if span["stage"] == "encode")
+    return summary, {
+        "seconds": time.perf_counter() - started,
+        "encode_s": stages.get("encode", 0.0),
+        "generate_s": stages.get("generate", 0.0),
+        "encoder_tokens": tokens_in,
+    }
+
+
+def run(text, tokenizer, model, budgets, method=TEXTRANK, max_length=80, min_length=20):
+    results = []
+    for mode, summarize in MODES.items():
+        reference, baseline = _summarize(summarize, text, tokenizer, model, max_length, min_length)
+        results.append({"mode": mode, "budget": None, "filter_ms": 0.0, "overlap_f1": 1.0, **baseline})
+        for budget in budgets:
+            started = time.perf_counter()
+            filtered, _ = select_salient(text, tokenizer, budget, method)
+            filter_ms = (time.perf_counter() - started) * 1000
+            summary, stats = _summarize(summarize, filtered, tokenizer, model, max_length, min_length)
+            results.append({
+                "mode": mode,
+                "budget": budget,
+                "filter_ms": filter_ms,
+                "overlap_f1": unigram_f1(reference, summary),
+                **stats,
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Model name or path (default: a tiny BART built offline)")
+    parser.add_argument("--pdf", help="Report to summarize (default: a synthetic discharge summary)")
+    parser.add_argument("--pages", type=int, default=10, help="Pages of the synthetic report")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[256, 512, 768])
+    parser.add_argument("--method", choices=[TEXTRANK, CENTROID], default=TEXTRANK)
+    args = parser.parse_args()
+
+    from modules.model_loader import build_tiny_bart, load_model
+
+    tokenizer, model = load_model(args.model) if args.model else build_tiny_bart(d_model=64, layers=2)
+    text = extract_pages(args.pdf or make_pdf(args.pages)).text
+
+    print(f"{'mode':<9} {'budget':>7} {'filter':>9} {'enc tokens':>11} {'encode':>9} {'generate':>9} {'total':>8} {'F1':>6}")
+    for r in run(text, tokenizer, model, args.budgets, args.method):
+        budget = "none" if r["budget"] is None else r["budget"]
+        print(
+            f"{r['mode']:<9} {budget:>7} {r['filter_ms']:>7.1f}ms {r['encoder_tokens']:>11,} "
+            f"{r['encode_s']:>8.3f}s {r['generate_s']:>8.2f}s {r['seconds']:>7.2f}s {r['overlap_f1']:>6.2f}"
+        )
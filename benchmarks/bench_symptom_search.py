@@ -0,0 +1,55 @@
+"""
+Free-text symptom query latency as the disease corpus grows.
+
+    python -m benchmarks.bench_symptom_search --sizes 1000 10000 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_symptom_corpus
+from modules.symptom_search import SymptomIndex
+
+
+def run(sizes, queries=200):
+    rng = np.random.default_rng(1)
+    results = []
+    for size in sizes:
+        corpus = make_symptom_corpus(size)
+        started = time.perf_counter()
+        index = SymptomIndex(corpus["Disease"], corpus["Symptoms"], corpus["Specialist"])
+        build_s = time.perf_counter() - started
+
+        # Queries reuse a few words from random disease descriptions
+        texts = [
+            " ".join(rng.choice(corpus["Symptoms"].iat[i].split(), size=4))
+            for i in rng.integers(size, size=queries)
+        ]
+        started = time.perf_counter()
+        for text in texts:
+            index.rank_specialists(text)
+        query_ms = (time.perf_counter() - started) / queries * 1000
+
+        results.append({
+            "diseases": size,
+            "terms": len(index.vocabulary),
+            "nnz": int(index.matrix.nnz),
+            "build_s": build_s,
+            "query_ms": query_ms,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    for r in run(args.sizes, args.queries):
+        print(
+            f"{r['diseases']:>7,} diseases ({r['terms']:,} terms, {r['nnz']:,} nnz): "
+            f"build {r['build_s']:.2f}s, query {r['query_ms']:.2f} ms"
+        )
@@ -0,0 +1,135 @@
+"""
+Worker memory for large uploads: whole-file bytes vs spooled temp files read through mmap.
+
+    python -m benchmarks.bench_uploads --sizes 25 50 100 --concurrent 4
+
+For each size, ``--concurrent`` scanned-report-like PDFs (``make_pdf`` with
+a large image on every page) of about that many MB are summarized at the
+same time by one job queue set up like the app's and the API's: an
+inference broker, a page cache and long-document summaries, so page
+fingerprinting is measured too.
+Each scenario runs in a fresh process so the resident memory figures are
+its own:
+
+    bytes     each upload read whole into memory and submitted as bytes (the old path)
+    spooled   each upload copied in 1 MB chunks into a SpooledUpload; past the
+              spool size it lives in a temp file the extractor memory-maps
+
+``peak`` is the process's resident-memory growth over the model-loaded
+baseline while the uploads are read and summarized, ``anon`` the part of it
+that is heap rather than file-backed mapped pages.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import make_pdf
+
+PAGES = 20
+
+
+def _child(mode, paths, model_path):
+    """Runs in a fresh process: read and summarize ``paths`` concurrently, print JSON stats"""
+    from modules.inference_broker import InferenceBroker
+    from modules.jobs import SummaryJobQueue, DONE
+    from modules.model_loader import load_model, warm_up
+    from modules.summary_cache import SummaryCache
+    from modules.telemetry import memory_peak
+    from modules.uploads import SpooledUpload
+
+    tokenizer, model = load_model(model_path)
+    warm_up(tokenizer, model)
+    cache_dir = tempfile.mkdtemp(prefix="bench-uploads-")
+    # Empty page cache: every page is fingerprinted, then extracted
+    jobs = SummaryJobQueue(
+        None, "bench", workers=len(paths), broker=InferenceBroker(lambda: (tokenizer, model)),
+        page_cache=SummaryCache(os.path.join(cache_dir, "pages.db"))
+    )
+    time.sleep(0.5)  # let the worker threads settle before the baseline
+
+    started = time.perf_counter()
+    with memory_peak() as memory:
+        ids = []
+        for path in paths:
+            with open(path, "rb") as f:
+                upload = f.read() if mode == "bytes" else SpooledUpload.from_stream(f)
+            ids.append(jobs.submit(upload, max_length=40, min_length=5, long_document=True))
+            del upload
+        finished = [jobs.wait(job_id) for job_id in ids]
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    failed = [job.error for job in finished if job.status != DONE]
+    if failed:
+        raise RuntimeError(failed[0])
+    print(json.dumps({
+        "seconds": time.perf_counter() - started,
+        "peak_mb": memory["growth_mb"],
+        "anon_mb": memory["anon_growth_mb"],
+        "job_peak_mb": max(job.result["memory"]["growth_mb"] for job in finished),
+    }))
+
+
+def run(sizes_mb, concurrent, model_path):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in sizes_mb:
+            image_kb = int(size_mb * 1024 / PAGES)
+            paths = []
+            for i in range(concurrent):
+                path = os.path.join(tmp, f"{size_mb}mb-{i}.pdf")
+                with open(path, "wb") as f:
+                    f.write(make_pdf(PAGES, seed=i, image_kb=image_kb))
+                paths.append(path)
+            for mode in ("bytes", "spooled"):
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_uploads", "--child", mode, "--model", model_path, *paths],
+                    cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                    env={**os.environ, "DOCWISE_TELEMETRY": "0"},
+                    capture_output=True, text=True, check=True
+                ).stdout
+                stats = json.loads(output.strip().splitlines()[-1])
+                results.append({
+                    "size_mb": os.path.getsize(paths[0]) / (1024 * 1024),
+                    "concurrent": concurrent,
+                    "mode": mode,
+                    **stats,
+                })
+            for path in paths:
+                os.remove(path)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Model name or path (default: a tiny BART built offline)")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[25, 50, 100], help="Upload sizes in MB")
+    parser.add_argument("--concurrent", type=int, default=4)
+    parser.add_argument("--child", choices=["bytes", "spooled"], help=argparse.SUPPRESS)
+    parser.add_argument("paths", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.paths, args.model)
+        sys.exit()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        model_path = args.model
+        if model_path is None:
+            from modules.model_loader import build_tiny_bart
+
+            tokenizer, model = build_tiny_bart(model_dir, d_model=64, layers=2)
+            tokenizer.save_pretrained(model_dir)
+            model.save_pretrained(model_dir)
+            model_path = model_dir
+
+        print(f"{'size':>8} {'uploads':>8} {'mode':<8} {'peak':>9} {'anon':>9} {'per job':>9} {'time':>7}")
+        for r in run(args.sizes, args.concurrent, model_path):
+            print(
+                f"{r['size_mb']:>6.1f}MB {r['concurrent']:>8} {r['mode']:<8} {r['peak_mb']:>7.1f}MB "
+                f"{r['anon_mb']:>7.1f}MB {r['job_peak_mb']:>7.1f}MB {r['seconds']:>6.2f}s"
+            )
@@ -0,0 +1,219 @@
+"""
+Offline benchmark suite for every hot path, with JSON results for regression tracking.
+
+    python -m benchmarks.run_benchmarks                   # full run, tiny local BART
+    python -m benchmarks.run_benchmarks --quick           # smaller sizes
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<earlier>.json
+
+Each run is written to benchmarks/results/<timestamp>.json. With --compare,
+stages whose median got slower than --threshold times the earlier run are
+reported and the exit status is 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_pdf, write_doctor_profiles_csv
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def measure(fn, repeat=5, warmup=1):
+    """Run ``fn`` repeatedly and return timing statistics in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings),
+        "runs": repeat,
+    }
+
+
+def bench_pdf_extraction(page_counts, repeat):
+    from modules.pdf_extractor import extract_pages
+
+    results = {}
+    for pages in page_counts:
+        pdf = make_pdf(pages)
+        results[f"pdf_extraction/{pages}_pages/sequential"] = measure(
+            lambda: extract_pages(pdf, workers=1), repeat
+        )
+        results[f"pdf_extraction/{pages}_pages/default"] = measure(
+            lambda: extract_pages(pdf), repeat
+        )
+    return results
+
+
+def bench_model(tokenizer, model, repeat):
+    import torch
+
+    from modules.pdf_extractor import extract_pages
+    from modules.summarizer import MODEL_MAX_TOKENS, SUMMARY_PREFIX, generate_summary
+
+    text = extract_pages(make_pdf(20)).text
+    inputs = tokenizer.encode(
+        SUMMARY_PREFIX + text, max_length=MODEL_MAX_TOKENS, truncation=True, return_tensors="pt"
+    )
+    encoder = model.get_encoder()
+
+    def encode():
+        with torch.no_grad():
+            encoder(inputs)
+
+    def first_text_ms():
+        started = time.perf_counter()
+        first = []
+        generate_summary(
+            text, tokenizer, model, max_length=64, min_length=16,
+            on_text=lambda partial: first or first.append((time.perf_counter() - started) * 1000)
+        )
+        return first[0] if first else None
+
+    return {
+        "tokenization/20_pages": {
+            **measure(lambda: tokenizer.encode(text), repeat),
+            "tokens": len(tokenizer.encode(text)),
+        },
+        "encoder/1024_tokens": measure(encode, repeat),
+        "generate/1024_tokens": measure(
+            lambda: generate_summary(text, tokenizer, model, max_length=64, min_length=16),
+            max(repeat // 2, 1)
+        ),
+        "generate_stream/1024_tokens": {
+            **measure(
+                lambda: generate_summary(text, tokenizer, model, max_length=64, min_length=16, on_text=lambda partial: None),
+                max(repeat // 2, 1)
+            ),
+            "time_to_first_token_ms": first_text_ms(),
+        },
+    }
+
+
+def bench_predict_specialist(repeat):
+    from modules.disease_mapper import predict_specialist
+
+    queries = {
+        "exact": "Diabetes",
+        "synonym": "high bp",
+        "fuzzy": "hypertensoin",
+    }
+    results = {}
+    for kind, query in queries.items():
+        stats = measure(lambda: [predict_specialist(query) for _ in range(100)], repeat)
+        results[f"predict_specialist/{kind}"] = {
+            "median_ms": stats["median_ms"] / 100,
+            "min_ms": stats["min_ms"] / 100,
+            "max_ms": stats["max_ms"] / 100,
+            "runs": repeat * 100,
+        }
+    return results
+
+
+def bench_doctor_search(row_counts, repeat):
+    from modules.doctor_filtering import DoctorIndex
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in row_counts:
+            path = write_doctor_profiles_csv(os.path.join(tmp, f"doctors_{rows}.csv"), rows)
+            started = time.perf_counter()
+            df = pd.read_csv(path)
+            load_ms = (time.perf_counter() - started) * 1000
+            started = time.perf_counter()
+            index = DoctorIndex(df)
+            build_ms = (time.perf_counter() - started) * 1000
+            results[f"get_doctors_by_specialist/{rows}_rows"] = {
+                **measure(lambda: index.search("Cardiologist", "Madurai", 2, 3.5), repeat),
+                "csv_load_ms": load_ms,
+                "index_build_ms": build_ms,
+            }
+    return results
+
+
+def run(quick=False, model_name=None, repeat=5):
+    from modules.model_loader import build_tiny_bart, load_model
+    from modules.telemetry import telemetry
+
+    # Keep thousands of benchmark spans out of the application's span log
+    telemetry.enabled = False
+
+    page_counts = [5, 25] if quick else [10, 50, 200]
+    row_counts = [1_000, 10_000] if quick else [1_000, 10_000, 100_000, 1_000_000]
+    tokenizer, model = load_model(model_name) if model_name else build_tiny_bart(d_model=64, layers=2)
+
+    results = {}
+    results.update(bench_pdf_extraction(page_counts, repeat))
+    results.update(bench_model(tokenizer, model, repeat))
+    results.update(bench_predict_specialist(repeat))
+    results.update(bench_doctor_search(row_counts, repeat))
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "model": model_name or "tiny-bart",
+        "quick": quick,
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Return (stage, baseline_ms, current_ms, ratio) for stages slower than ``threshold``x"""
+    regressions = []
+    for stage, stats in current["results"].items():
+        previous = baseline["results"].get(stage)
+        if previous is None:
+            continue
+        ratio = stats["median_ms"] / previous["median_ms"]
+        if ratio > threshold:
+            regressions.append((stage, previous["median_ms"], stats["median_ms"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs for a fast smoke run")
+    parser.add_argument("--model", help="Benchmark a real model (name or path) instead of the tiny offline BART")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier result file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    report = run(args.quick, args.model, args.repeat)
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for stage, stats in report["results"].items():
+        print(f"{stage:<50} {stats['median_ms']:>10.3f} ms")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for stage, before, after, ratio in regressions:
+            print(f"REGRESSION {stage}: {before:.3f} ms -> {after:.3f} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
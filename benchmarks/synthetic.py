@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+SPECIALISTS = [
+    "General Physician", "Psychiatrist", "ENT Specialist", "Rheumatologist",
+    "Pediatrician", "Endocrinologist", "Orthopedic", "Urologist", "Pulmonologist",
+    "Oncologist", "Cardiologist", "Gynecologist", "Dermatologist", "Neurologist",
+    "Gastroenterologist",
+]
+LOCATIONS = [
+    "Chennai", "Coimbatore", "Cuddalore", "Dindigul", "Erode", "Kanchipuram",
+    "Karur", "Krishnagiri", "Madurai", "Nagapattinam", "Nagercoil", "Pudukkottai",
+    "Salem", "Sivakasi", "Thanjavur", "Thoothukudi", "Tiruchirappalli",
+    "Tirunelveli", "Vellore", "Virudhunagar",
+]
+RATINGS = [3.0, 3.5, 4.0, 4.5, 5.0]
+
+
+def make_doctor_df(rows, seed=0, locations=None):
+    """Synthetic frame with the same columns and value ranges as doctor_profiles.csv"""
+    rng = np.random.default_rng(seed)
+    locations = locations or LOCATIONS
+    return pd.DataFrame({
+        "Name": [f"Dr. Synthetic {i}" for i in range(rows)],
+        "Specialist": np.array(SPECIALISTS)[rng.integers(len(SPECIALISTS), size=rows)],
+        "Location": np.array(locations)[rng.integers(len(locations), size=rows)],
+        "Experience": rng.integers(3, 36, size=rows),
+        "Contact": rng.integers(6_000_000_000, 9_999_999_999, size=rows),
+        "Rating": np.array(RATINGS)[rng.integers(len(RATINGS), size=rows)],
+    })
+
+
+# Greek/Latin medical roots and suffixes, so synthetic names have a realistic
+# spread of character n-grams
+ROOTS = [
+    "aden", "angi", "arthr", "bronch", "carcin", "cardi", "cephal", "chol", "chondr",
+    "col", "crani", "cyst", "cyt", "dermat", "encephal", "enter", "erythr", "fibr",
+    "gastr", "gloss", "glyc", "hem", "hepat", "hist", "hyster", "ile", "kerat",
+    "lapar", "laryng", "leuk", "lip", "lith", "lymph", "mamm", "mast", "mening",
+    "my", "myel", "nephr", "neur", "ocul", "odont", "onc", "oophor", "ophthalm",
+    "orch", "oste", "ot", "pancreat", "path", "ped", "pharyng", "phleb", "pneum",
+    "proct", "psych", "pulmon", "pyel", "rhin", "salping", "sarc", "scler", "splen",
+    "spondyl", "stomat", "thorac", "thromb", "thyr", "trache", "ur", "uter", "vas",
+    "ven", "vertebr", "xer",
+]
+SUFFIXES = [
+    "itis", "osis", "oma", "algia", "emia", "pathy", "plasia", "rrhea", "ectasis",
+    "megaly", "sclerosis", "spasm", "stenosis", "uria", "penia", "cele", "lysis",
+]
+QUALIFIERS = [
+    "acute", "chronic", "congenital", "primary", "secondary", "juvenile", "benign",
+    "malignant", "recurrent", "idiopathic", "bilateral", "familial", "atypical",
+]
+
+
+def make_disease_df(rows, seed=0):
+    """Synthetic disease vocabulary, e.g. "Chronic Nephrocystitis" """
+    rng = np.random.default_rng(seed)
+    names, seen = [], set()
+    while len(names) < rows:
+        word = "o".join(rng.choice(ROOTS, size=rng.integers(1, 3))) + rng.choice(SUFFIXES)
+        qualifiers = rng.choice(QUALIFIERS, size=rng.integers(0, 3), replace=False)
+        name = " ".join([*qualifiers, word]).title()
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return pd.DataFrame({
+        "Disease": names,
+        "Specialist": np.array(SPECIALISTS)[rng.integers(len(SPECIALISTS), size=rows)],
+    })
+
+
+def make_symptom_corpus(rows, vocabulary=5000, words_per_disease=20, seed=0):
+    """Synthetic (disease, symptom text, specialist) corpus with Zipf-distributed words"""
+    rng = np.random.default_rng(seed)
+    diseases = make_disease_df(rows, seed)
+    words = np.array([f"sym{i}" for i in range(vocabulary)])
+    ranks = np.minimum(rng.zipf(1.3, size=(rows, words_per_disease)), vocabulary) - 1
+    diseases["Symptoms"] = [" ".join(words[r]) for r in ranks]
+    return diseases
+
+
+REPORT_LINES = [
+    "Patient was admitted with complaints of fever and productive cough for five days.",
+    "Chest X-ray showed right lower lobe consolidation consistent with pneumonia.",
+    "Haemoglobin 11.2 g/dL, total leucocyte count 14,500 cells/cumm, platelets 2.1 lakhs.",
+    "HbA1c 8.4 percent indicating poorly controlled type 2 diabetes mellitus.",
+    "Treated with intravenous antibiotics and insulin sliding scale during the stay.",
+    "Blood pressure remained stable between 130/80 and 140/90 mmHg throughout.",
+    "Patient improved clinically and was afebrile for 48 hours prior to discharge.",
+    "Advised review in the outpatient clinic after two weeks with repeat blood tests.",
+]
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages, lines_per_page=45, seed=0, revised=(), image_kb=0):
+    """Bytes of a text PDF with ``pages`` pages of discharge-summary-like lines.
+
+    Page indices in ``revised`` get different lines while every other page
+    stays identical, like a report re-issued with a few pages changed.
+    With ``image_kb`` every page also draws an image of that many KB of
+    incompressible bytes, like a scanned report (text extraction skips it).
+    """
+    rng = np.random.default_rng(seed)
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for page in range(pages):
+        picks = rng.integers(len(REPORT_LINES), size=lines_per_page)
+        if page in revised:
+            picks = np.random.default_rng([seed, page, 1]).integers(len(REPORT_LINES), size=lines_per_page)
+        lines = [REPORT_LINES[i] for i in picks]
+        ops = ["BT /F1 9 Tf 36 806 Td 11 TL", f"(Page {page + 1}) Tj T*"]
+        ops += [f"({_pdf_escape(line)}) Tj T*" for line in lines]
+        ops.append("ET")
+        resources = "/Font << /F1 3 0 R >>"
+        if image_kb:
+            image_id = 4 + 2 * pages + page
+            resources += f" /XObject << /Im1 {image_id} 0 R >>"
+            ops.append("q 523 0 0 100 36 36 cm /Im1 Do Q")
+            pixels = rng.bytes(image_kb * 1024)
+            objects[image_id] = (
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height 1024 /ColorSpace /DeviceGray "
+                b"/BitsPerComponent 8 /Length %d >>\nstream\n%s\nendstream" % (image_kb, len(pixels), pixels)
+            )
+        content = "\n".join(ops).encode("latin-1")
+        page_id, content_id = 4 + 2 * page, 5 + 2 * page
+        kids.append(page_id)
+        objects[page_id] = (
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << {resources} >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1")
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+    objects[2] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>"
+    ).encode("latin-1")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (object_id, objects[object_id])
+    xref = len(out)
+    size = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for object_id in range(1, size):
+        out += b"%010d 00000 n \n" % offsets[object_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref)
+    return bytes(out)
+
+
+def write_doctor_profiles_csv(path, rows, seed=0):
+    """Write a synthetic doctor_profiles.csv with ``rows`` doctors"""
+    make_doctor_df(rows, seed).to_csv(path, index=False)
+    return path
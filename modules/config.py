@@ -0,0 +1,79 @@
+import os
+
+# Runtime settings, overridable through environment variables so the same
+# code can run the full model on a workstation and a smaller/quantized one
+# on CPU-only nodes without edits.
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Model name on the Hugging Face hub or a local directory
+MODEL_NAME = os.environ.get("DOCWISE_MODEL", "facebook/bart-large-cnn")
+
+# Apply dynamic int8 quantization to Linear layers at load time
+QUANTIZE = _env_bool("DOCWISE_QUANTIZE", False)
+
+# Per-stage timing spans (JSON lines) and Prometheus metrics are written here
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METRICS_DIR = os.environ.get("DOCWISE_METRICS_DIR", os.path.join(BASE_DIR, "logs"))
+TELEMETRY = _env_bool("DOCWISE_TELEMETRY", True)
+# The span log is rotated to spans.jsonl.1 once it grows past this (0: never)
+SPANS_MAX_MB = float(os.environ.get("DOCWISE_SPANS_MAX_MB", "50"))
+
+# Seconds between checks of the data CSVs for changes (0 disables hot reload)
+RELOAD_INTERVAL = float(os.environ.get("DOCWISE_RELOAD_INTERVAL", "5"))
+
+# Cross-session micro-batching: the inference broker waits up to this many
+# milliseconds after the first pending request and batches at most this many
+BATCH_MAX_SIZE = int(os.environ.get("DOCWISE_BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.environ.get("DOCWISE_BATCH_MAX_WAIT_MS", "10"))
+
+# Inference worker processes forked from one loaded model whose weights they
+# share (0 runs generation on the in-process broker thread instead)
+INFERENCE_PROCESSES = int(os.environ.get("DOCWISE_INFERENCE_PROCESSES", "0"))
+
+# Processes a large PDF's pages are fanned out to (0: one per core; 1 keeps
+# extraction in-process). Each process that extracts starts its own pool
+EXTRACT_PROCESSES = int(os.environ.get("DOCWISE_EXTRACT_PROCESSES", "0"))
+
+# Summary job worker threads (PDF extraction runs here; generation goes through the broker)
+SUMMARY_WORKERS = int(os.environ.get("DOCWISE_SUMMARY_WORKERS", "4"))
+
+# Standalone HTTP API (api.py); command-line flags override these
+API_HOST = os.environ.get("DOCWISE_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("DOCWISE_API_PORT", "8000"))
+API_WORKERS = int(os.environ.get("DOCWISE_API_WORKERS", "1"))
+# Seconds a /summarize call waits for its job before answering 504
+API_REQUEST_TIMEOUT = float(os.environ.get("DOCWISE_API_REQUEST_TIMEOUT", "120"))
+# Seconds an idle keep-alive connection (or a stalled upload) is kept open
+API_KEEPALIVE_TIMEOUT = float(os.environ.get("DOCWISE_API_KEEPALIVE_TIMEOUT", "15"))
+API_MAX_UPLOAD_MB = float(os.environ.get("DOCWISE_API_MAX_UPLOAD_MB", "20"))
+
+# Extractive pre-filter: rank sentences (TextRank or centroid similarity) and
+# keep the best ones within this many tokens before the abstractive model runs
+SALIENCE_FILTER = _env_bool("DOCWISE_SALIENCE_FILTER", False)
+SALIENCE_BUDGET = int(os.environ.get("DOCWISE_SALIENCE_BUDGET", "768"))
+SALIENCE_METHOD = os.environ.get("DOCWISE_SALIENCE_METHOD", "textrank")
+
+# Doctor ranking: "lexicographic" keeps the plain rating-then-experience
+# order (nearby towns nearest first); "composite" (opt-in) scores every match
+# on weighted rating, experience and distance instead
+RANKING = os.environ.get("DOCWISE_RANKING", "lexicographic")
+RANK_WEIGHTS = {
+    "rating": float(os.environ.get("DOCWISE_RANK_WEIGHT_RATING", "0.5")),
+    "experience": float(os.environ.get("DOCWISE_RANK_WEIGHT_EXPERIENCE", "0.3")),
+    "distance": float(os.environ.get("DOCWISE_RANK_WEIGHT_DISTANCE", "0.2")),
+}
+
+# Uploads: PDFs over UPLOAD_SPOOL_MB are spooled to a temp file (in
+# UPLOAD_TMP_DIR, default the system temp dir) and parsed through a
+# memory map; larger uploads or more pages than this are rejected
+UPLOAD_SPOOL_MB = float(os.environ.get("DOCWISE_UPLOAD_SPOOL_MB", "8"))
+UPLOAD_MAX_MB = float(os.environ.get("DOCWISE_UPLOAD_MAX_MB", "200"))
+UPLOAD_MAX_PAGES = int(os.environ.get("DOCWISE_UPLOAD_MAX_PAGES", "1000"))
+UPLOAD_TMP_DIR = os.environ.get("DOCWISE_UPLOAD_TMP_DIR") or None
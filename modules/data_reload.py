@@ -0,0 +1,158 @@
+import hashlib
+import os
+import threading
+import time
+
+from modules.config import RELOAD_INTERVAL
+from modules.telemetry import telemetry
+
+
+def file_signature(paths):
+    """Cheap change check: (path, mtime, size) of every source file"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+def content_version(paths):
+    """Short hash of the files' contents, used as the data version"""
+    digest = hashlib.sha1()
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        digest.update(b"\0")
+    return digest.hexdigest()[:12]
+
+
+class ReloadableResource:
+    """A lookup structure built from data files and rebuilt when they change.
+
+    ``current`` is replaced in a single assignment once a rebuild has
+    finished, so a search that has read it keeps a complete structure for
+    the whole call while the next version is built on the side. Touching a
+    file without changing its contents does not trigger a rebuild, and a
+    failed rebuild keeps the previous version serving.
+    """
+
+    def __init__(self, name, paths, build):
+        self.name = name
+        self.paths = list(paths)
+        self._build = build
+        self._lock = threading.Lock()
+        self._signature = file_signature(self.paths)
+        self.version = content_version(self.paths)
+        started = time.perf_counter()
+        self.current = build()
+        self.reload_seconds = time.perf_counter() - started
+        self.loaded_at = time.time()
+        self.reloads = 0
+        self.last_error = None
+
+    def changed(self):
+        return file_signature(self.paths) != self._signature
+
+    def reload(self, force=False):
+        """Rebuild if the files changed; True when a new version was swapped in"""
+        with self._lock:
+            # Taken before reading, so an edit that lands mid-build is seen next time
+            signature = file_signature(self.paths)
+            if signature == self._signature and not force:
+                return False
+            version = content_version(self.paths)
+            if version == self.version and not force:
+                self._signature = signature
+                return False
+
+            started = time.perf_counter()
+            try:
+                with telemetry.span("data_reload", resource=self.name, version=version):
+                    current = self._build()
+            except Exception as e:
+                # Keep serving the old version; retry once the files change again
+                self.last_error = f"{type(e).__name__}: {e}"
+                self._signature = signature
+                return False
+
+            self.current = current
+            self._signature = signature
+            self.version = version
+            self.reload_seconds = time.perf_counter() - started
+            self.loaded_at = time.time()
+            self.reloads += 1
+            self.last_error = None
+            return True
+
+    def status(self):
+        return {
+            "name": self.name,
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "reload_seconds": self.reload_seconds,
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+        }
+
+
+_resources = {}
+
+
+def register(name, paths, build):
+    """Build ``name`` now and have the watcher rebuild it when ``paths`` change"""
+    resource = ReloadableResource(name, paths, build)
+    _resources[name] = resource
+    return resource
+
+
+def reload_changed(force=False):
+    """Rebuild every resource whose files changed; returns the reloaded names"""
+    return [name for name, resource in list(_resources.items()) if resource.reload(force)]
+
+
+def data_status():
+    return [resource.status() for resource in _resources.values()]
+
+
+def data_version():
+    """One short version string covering every registered data file"""
+    digest = hashlib.sha1()
+    for name, resource in sorted(_resources.items()):
+        digest.update(f"{name}={resource.version};".encode())
+    return digest.hexdigest()[:8]
+
+
+class DataWatcher(threading.Thread):
+    """Daemon thread that polls the data files and reloads what changed"""
+
+    def __init__(self, interval=RELOAD_INTERVAL):
+        super().__init__(name="docwise-data-watcher", daemon=True)
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            reload_changed()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def start_watcher(interval=RELOAD_INTERVAL):
+    """Start the shared watcher once per process; None when reloading is disabled"""
+    global _watcher
+    if interval <= 0:
+        return None
+    with _watcher_lock:
+        if _watcher is None or not _watcher.is_alive():
+            _watcher = DataWatcher(interval)
+            _watcher.start()
+        return _watcher
@@ -0,0 +1,105 @@
+import threading
+from dataclasses import dataclass
+
+# Until the model has been timed (the warm-up generate is the first sample),
+# assume roughly bart-large-cnn on a few CPU cores
+ENCODE_PRIOR_S_PER_TOKEN = 0.0005
+STEP_PRIOR_S = 0.05
+# Weight of a new measurement in the running averages
+SMOOTHING = 0.3
+# Shortest summary a shortened plan will ask for
+MIN_PLANNED_LENGTH = 16
+# Hard stop handed to generate never goes below this, even when the budget is spent
+MIN_MAX_TIME_S = 0.5
+
+
+class DecodeSpeed:
+    """Running estimate of how fast the loaded model encodes and decodes.
+
+    Fed by every single-document ``generate_ids`` call (batched calls are
+    not representative of one request): encoder seconds per input token,
+    and decoder seconds per generation step for each beam count seen.
+    Shared by every thread of the process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.encode_s_per_token = ENCODE_PRIOR_S_PER_TOKEN
+        self.step_s = {}
+        self.samples = 0
+
+    def observe_encode(self, tokens, seconds):
+        if tokens <= 0:
+            return
+        with self._lock:
+            self.encode_s_per_token = self._smooth(self.encode_s_per_token, seconds / tokens)
+
+    def observe_generate(self, steps, num_beams, seconds):
+        if steps <= 0:
+            return
+        with self._lock:
+            previous = self.step_s.get(num_beams)
+            self.step_s[num_beams] = seconds / steps if previous is None else self._smooth(previous, seconds / steps)
+            self.samples += 1
+
+    def _smooth(self, previous, sample):
+        return previous + SMOOTHING * (sample - previous)
+
+    def seconds_per_step(self, num_beams):
+        """Measured for this beam count, else scaled from the nearest one measured"""
+        with self._lock:
+            if num_beams in self.step_s:
+                return self.step_s[num_beams]
+            if not self.step_s:
+                return STEP_PRIOR_S * num_beams
+            nearest = min(self.step_s, key=lambda beams: abs(beams - num_beams))
+            return self.step_s[nearest] * num_beams / nearest
+
+    def estimate(self, tokens_in, num_beams, max_length):
+        """Upper bound in seconds for one document: encoder plus ``max_length`` decoding steps"""
+        return tokens_in * self.encode_s_per_token + max_length * self.seconds_per_step(num_beams)
+
+
+decode_speed = DecodeSpeed()
+
+
+@dataclass
+class GenerationPlan:
+    strategy: str
+    num_beams: int
+    max_length: int
+    min_length: int
+    estimated_s: float
+    # Hard stop for generate (its max_time), so a wrong estimate cannot blow the budget
+    max_time: float
+
+
+def plan_generation(tokens_in, budget_s, max_length, min_length, beam_options, max_positions, speed=decode_speed):
+    """Choose beams and a realistic max length so one generate fits ``budget_s``.
+
+    ``max_length`` is first capped at what the decoder can produce
+    (``max_positions``) and at the input length. Beam counts are tried in
+    the order of ``beam_options`` (widest first); when even the last one
+    does not fit at full length, the summary is shortened to the number of
+    steps the remaining budget allows.
+    """
+    max_length = max(min(max_length, max_positions, tokens_in), min(min_length, max_positions))
+    for num_beams in beam_options:
+        estimated = speed.estimate(tokens_in, num_beams, max_length)
+        if estimated <= budget_s:
+            strategy = f"beam search ({num_beams} beams)" if num_beams > 1 else "greedy"
+            return GenerationPlan(
+                strategy, num_beams, max_length, min(min_length, max_length), estimated, max(budget_s, MIN_MAX_TIME_S)
+            )
+
+    num_beams = beam_options[-1]
+    affordable = (budget_s - tokens_in * speed.encode_s_per_token) / speed.seconds_per_step(num_beams)
+    shortened = int(min(max(affordable, MIN_PLANNED_LENGTH), max_length))
+    return GenerationPlan(
+        f"{'greedy' if num_beams == 1 else f'beam search ({num_beams} beams)'}, shortened to {shortened} tokens",
+        num_beams,
+        shortened,
+        min(min_length, shortened // 2),
+        speed.estimate(tokens_in, num_beams, shortened),
+        max(budget_s, MIN_MAX_TIME_S),
+    )
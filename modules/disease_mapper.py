@@ -1,25 +1,145 @@
-import pandas as pd
+import math
 import os
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from modules.data_reload import register
 
 # Get absolute path of the CSV
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CSV_PATH = os.path.join(BASE_DIR, "data", "disease_to_doctor.csv")
+SYNONYMS_PATH = os.path.join(BASE_DIR, "data", "disease_synonyms.csv")
 
-# Load CSV
-disease_df = pd.read_csv(CSV_PATH)
+# Minimum Dice similarity for a fuzzy match to be trusted as the prediction
+FUZZY_MIN_SCORE = 0.5
+# Weaker matches are still offered as suggestions down to this score
+FUZZY_CANDIDATE_SCORE = 0.3
+NGRAM = 3
 
-def predict_specialist(disease_name):
-    # Normalize input
-    disease_name = disease_name.strip().lower()
+DiseaseMatch = namedtuple("DiseaseMatch", ["term", "disease", "specialist", "score"])
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_term(text):
+    """Lowercase and collapse punctuation/whitespace: "HIV/AIDS" -> "hiv aids" """
+    return _NON_ALNUM_RE.sub(" ", text.lower().replace("'", "")).strip()
+
+
+def char_ngrams(term, n=NGRAM):
+    padded = f" {term} "
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+class DiseaseMatcher:
+    """Disease/synonym -> specialist lookup, compiled once.
+
+    Exact lookups are a dict hit on the normalized term. Otherwise the query's
+    character trigrams are looked up in an inverted index and shared-gram
+    counts for every term come from one bincount; only terms sharing enough
+    grams to pass the suggestion threshold are scored by Dice similarity.
+    """
+
+    def __init__(self, diseases_df, synonyms_df=None):
+        specialist_of = {}
+        for disease, specialist in zip(diseases_df["Disease"], diseases_df["Specialist"]):
+            specialist_of.setdefault(disease.strip(), specialist.strip())
 
-    # Normalize CSV columns
-    disease_df['Disease'] = disease_df['Disease'].str.strip().str.lower()
-    disease_df['Specialist'] = disease_df['Specialist'].str.strip()
+        # (normalized term, canonical disease); diseases first so they win ties
+        entries = [(normalize_term(d), d) for d in specialist_of]
+        if synonyms_df is not None:
+            entries += [
+                (normalize_term(s), d.strip())
+                for s, d in zip(synonyms_df["Synonym"], synonyms_df["Disease"])
+                if d.strip() in specialist_of
+            ]
 
-    # Match disease
-    match = disease_df[disease_df['Disease'] == disease_name]
+        self.exact = {}
+        terms, diseases = [], []
+        for term, disease in entries:
+            if term and term not in self.exact:
+                self.exact[term] = disease
+                terms.append(term)
+                diseases.append(disease)
+        self.terms = terms
+        self.diseases = diseases
+        self.specialist_of = specialist_of
 
-    if not match.empty:
-        return match['Specialist'].values[0]
-    else:
+        postings = {}
+        gram_counts = np.empty(len(terms), dtype=np.int32)
+        for term_id, term in enumerate(terms):
+            grams = char_ngrams(term)
+            gram_counts[term_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(term_id)
+        self._postings = {g: np.array(ids, dtype=np.intp) for g, ids in postings.items()}
+        self._gram_counts = gram_counts
+
+    @classmethod
+    def from_csv(cls, csv_path=CSV_PATH, synonyms_path=SYNONYMS_PATH):
+        synonyms_df = pd.read_csv(synonyms_path) if os.path.exists(synonyms_path) else None
+        return cls(pd.read_csv(csv_path), synonyms_df)
+
+    def _match(self, term, disease, score):
+        return DiseaseMatch(term, disease, self.specialist_of[disease], score)
+
+    def match(self, query, k=5):
+        """Ranked DiseaseMatch candidates for ``query``, best first"""
+        term = normalize_term(query)
+        if not term:
+            return []
+        if term in self.exact:
+            return [self._match(term, self.exact[term], 1.0)]
+
+        grams = char_ngrams(term)
+        hits = [self._postings[g] for g in grams if g in self._postings]
+        if not hits:
+            return []
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.terms))
+
+        # Dice >= t needs at least t*n/(2-t) shared n-grams; anything below
+        # that cannot reach the suggestion threshold, so skip scoring it
+        min_shared = max(math.ceil(FUZZY_CANDIDATE_SCORE * len(grams) / (2 - FUZZY_CANDIDATE_SCORE)), 1)
+        candidates = np.flatnonzero(shared >= min_shared)
+        scores = 2.0 * shared[candidates] / (len(grams) + self._gram_counts[candidates])
+        keep = scores >= FUZZY_CANDIDATE_SCORE
+        candidates, scores = candidates[keep], scores[keep]
+        if not len(scores):
+            return []
+
+        # Over-fetch a little: several synonyms can point at the same disease
+        take = min(k * 3, len(scores))
+        top = np.argpartition(-scores, take - 1)[:take]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        results, seen = [], set()
+        for i in top:
+            term_id = candidates[i]
+            disease = self.diseases[term_id]
+            if disease in seen:
+                continue
+            seen.add(disease)
+            results.append(self._match(self.terms[term_id], disease, float(scores[i])))
+            if len(results) == k:
+                break
+        return results
+
+    def predict(self, query, min_score=FUZZY_MIN_SCORE):
+        matches = self.match(query, k=1)
+        if matches and matches[0].score >= min_score:
+            return matches[0].specialist
         return None
+
+
+# Load CSV
+disease_matcher = register("diseases", [CSV_PATH, SYNONYMS_PATH], DiseaseMatcher.from_csv)
+
+def match_disease(disease_name, k=5):
+    return disease_matcher.current.match(disease_name, k)
+
+def predict_specialist(disease_name):
+    # Exact disease or synonym first, then the closest fuzzy match
+    return disease_matcher.current.predict(disease_name)
@@ -1,33 +1,218 @@
-import os
+from types import MappingProxyType
+
+import numpy as np
 import pandas as pd
 
-# get the absolute path to the CSV, no matter where you run from
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-CSV_PATH = os.path.join(BASE_DIR, "data", "doctor_profiles.csv")
+from modules.config import RANKING, RANK_WEIGHTS
+from modules.data_reload import register
+from modules.doctor_store import CSV_PATH, DoctorStore, load_doctor_store
+from modules.geo import city_index
+from modules.ranking import CompositeRanker
 
-doctor_df = pd.read_csv(CSV_PATH)
+# Radius of the nearest-town fallback when a town has no matching doctor
+NEARBY_RADIUS_KM = 150
+# Bump when the cached sort orders change, so snapshots don't serve stale ones
+ORDER_VERSION = 2
 
-def get_doctors_by_specialist(specialist, location=None, min_experience=0, min_rating=None):
-    # Ensure consistent formatting
-    doctor_df['Specialist'] = doctor_df['Specialist'].str.strip().str.lower()
-    specialist = specialist.strip().lower()
 
-    filtered = doctor_df[doctor_df['Specialist'] == specialist]
+def _readonly(array):
+    array.flags.writeable = False
+    return array
 
-    # Filter by location (optional)
-    if location:
-        filtered = filtered[filtered['Location'].str.strip().str.lower() == location.strip().lower()]
 
-    # Filter by experience
-    filtered = filtered[filtered['Experience'] >= min_experience]
+def _value_range(values):
+    """(min, max) ignoring missing values; (0, 1) for an empty column"""
+    if not len(values) or np.isnan(values.astype(np.float64, copy=False)).all():
+        return 0, 1
+    return float(np.nanmin(values)), float(np.nanmax(values))
 
-    # Filter by rating if column exists
-    if min_rating is not None and "Rating" in filtered.columns:
-        filtered = filtered[filtered['Rating'] >= min_rating]
-        # Sort by rating first, then experience
-        filtered = filtered.sort_values(by=["Rating", "Experience"], ascending=[False, False])
-    else:
-        # Only sort by experience if rating is missing
-        filtered = filtered.sort_values(by="Experience", ascending=False)
 
-    return filtered
\ No newline at end of file
+def _normalized_codes(store, column):
+    """Per-row codes of the normalized value, plus the normalized names"""
+    # Code -1 (missing) indexes the trailing NaN, which normalizes to "nan"
+    categories = np.append(store.categories[column], np.nan)
+    names, inverse = np.unique([str(c).strip().lower() for c in categories], return_inverse=True)
+    codes = store.array(column)
+    return inverse.astype(codes.dtype)[codes], names
+
+
+class DoctorIndex:
+    """Read-only lookup of doctors by (specialist, location).
+
+    Built once from the shared columnar DoctorStore: every normalized
+    (specialist, location) pair and every specialist on its own maps to a
+    contiguous slice of row positions already sorted by rating then
+    experience (and by experience alone for searches without a rating
+    filter), so a search is a dict lookup plus a filter over that group
+    only, and only the matching rows are ever decoded. The sort orders are
+    cached next to the store's snapshot, so later starts skip the sorts.
+    Nothing is mutated after construction, which makes one instance safe to
+    share between sessions. A plain DataFrame is accepted too and converted
+    to a store first.
+
+    With ``weights`` the matches are instead ordered by a CompositeRanker
+    score (rating, experience and, for nearby searches, distance), scaled
+    over the directory's own rating and experience ranges.
+    """
+
+    def __init__(self, store, weights=None):
+        if isinstance(store, pd.DataFrame):
+            store = DoctorStore.from_frame(store)
+        self.store = store
+        self.has_rating = "Rating" in store
+
+        self._specialists, self._specialist_names = _normalized_codes(store, "Specialist")
+        locations, self._location_names = _normalized_codes(store, "Location")
+        self._experience = store.array("Experience")
+        self._rating = store.array("Rating") if self.has_rating else None
+        self.ranker = None
+        if weights is not None:
+            self.ranker = CompositeRanker(
+                weights,
+                rating_range=_value_range(self._rating) if self.has_rating else (0, 1),
+                experience_range=_value_range(self._experience),
+                distance_scale_km=NEARBY_RADIUS_KM,
+            )
+
+        pair_keys = self._specialists.astype(np.int64) * len(self._location_names) + locations
+        self._by_rating = MappingProxyType({
+            **self._groups("rating_pair", pair_keys, by_rating=True, pairs=True),
+            **self._groups("rating_specialist", self._specialists, by_rating=True, pairs=False),
+        })
+        self._by_experience = MappingProxyType({
+            **self._groups("experience_pair", pair_keys, by_rating=False, pairs=True),
+            **self._groups("experience_specialist", self._specialists, by_rating=False, pairs=False),
+        })
+
+    def _groups(self, name, group_keys, by_rating, pairs):
+        """Map each (specialist, location) or (specialist, None) key to its best-first positions"""
+        def build():
+            # lexsort is stable with the last key primary: group, then rating
+            # and experience descending, ties in file order like sort_values
+            # Sorted as floats so fractional years keep their order; missing
+            # experience goes last, where sort_values puts NaN
+            ranks = (-np.nan_to_num(self._experience.astype(np.float64), nan=-np.inf),)
+            if by_rating and self.has_rating:
+                ranks += (-self._rating.astype(np.float64),)
+            return np.lexsort(ranks + (group_keys,)).astype(np.int32)
+
+        order = self.store.derived(f"doctor_index_{name}_v{ORDER_VERSION}", build)
+        keys = group_keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(order)]
+        n_locations = len(self._location_names)
+        groups = {}
+        for key, start, end in zip(keys[starts].tolist(), starts, ends):
+            if pairs:
+                specialist, location = divmod(key, n_locations)
+                label = (self._specialist_names[specialist], self._location_names[location])
+            else:
+                label = (self._specialist_names[key], None)
+            groups[label] = _readonly(order[start:end])
+        return groups
+
+    def select(self, specialist, location=None, min_experience=0, min_rating=None, limit=None):
+        """Positions of the best ``limit`` matches (all when None) and the total match count.
+
+        Groups are stored best first, so the top K is just the first K rows
+        passing the filters: no sort at query time, and only K rows are
+        gathered however many doctors match. With a ranker the matches are
+        scored and the top K picked by partial selection instead.
+        """
+        matched = self._matches(specialist, location, min_experience, min_rating)
+        if self.ranker is None:
+            return matched[:limit], len(matched)
+        return matched[self._rank(matched, limit=limit)], len(matched)
+
+    def _matches(self, specialist, location, min_experience, min_rating):
+        """Positions passing the filters, in the group's stored rating/experience order"""
+        use_rating = min_rating is not None and self.has_rating
+        groups = self._by_rating if use_rating else self._by_experience
+        key = (specialist.strip().lower(), location.strip().lower() if location else None)
+        candidates = groups.get(key)
+        if candidates is None:
+            return np.empty(0, dtype=np.intp)
+
+        keep = self._experience[candidates] >= min_experience
+        if use_rating:
+            keep &= self._rating[candidates] >= min_rating
+        return candidates[np.flatnonzero(keep)]
+
+    def _rank(self, positions, distance_km=None, limit=None):
+        rating = self._rating[positions] if self.has_rating else None
+        return self.ranker.rank(rating, self._experience[positions], distance_km, limit)
+
+    def positions(self, specialist, location=None, min_experience=0, min_rating=None):
+        """Row positions (into the store) matching the search, best first"""
+        return self.select(specialist, location, min_experience, min_rating)[0]
+
+    def take(self, positions):
+        frame = self.store.take(positions)
+        # Results have always carried the normalized specialist name
+        frame["Specialist"] = self._specialist_names[self._specialists[positions]]
+        return frame
+
+    def search(self, specialist, location=None, min_experience=0, min_rating=None, limit=None):
+        """Best matches as a DataFrame; ``attrs["total"]`` counts every match"""
+        positions, total = self.select(specialist, location, min_experience, min_rating, limit)
+        frame = self.take(positions)
+        frame.attrs["total"] = total
+        return frame
+
+    def search_nearby(self, specialist, cities, min_experience=0, min_rating=None, limit=None):
+        """Doctors in ``cities`` (``[(city, km), ...]`` nearest first), ordered by distance.
+
+        Within one city the usual rating/experience order is kept; with a
+        ranker (opt-in), distance is one term of the score instead and the
+        matches of every city are scored once, together. A ``Distance_km``
+        column is added to the result and ``attrs["total"]`` counts the
+        matches in all of ``cities``.
+        """
+        positions, distances = [], []
+        found = total = 0
+        for city, km in cities:
+            if self.ranker is None:
+                remaining = None if limit is None else max(limit - found, 0)
+                matched, count = self.select(specialist, city, min_experience, min_rating, remaining)
+            else:
+                # Left unranked: the ranker has to see every city's matches before it picks the best
+                matched = self._matches(specialist, city, min_experience, min_rating)
+                count = len(matched)
+            total += count
+            if not len(matched):
+                continue
+            positions.append(matched)
+            distances.append(np.full(len(matched), km))
+            found += len(matched)
+        if not positions:
+            frame = self.take(np.empty(0, dtype=np.intp)).assign(Distance_km=pd.Series(dtype=float))
+        else:
+            positions, distances = np.concatenate(positions), np.concatenate(distances)
+            if self.ranker is not None:
+                order = self._rank(positions, distances, limit)
+                positions, distances = positions[order], distances[order]
+            frame = self.take(positions).assign(Distance_km=np.round(distances, 1))
+        frame.attrs["total"] = total
+        return frame
+
+
+# Rebuilt from a fresh snapshot whenever doctor_profiles.csv changes
+doctor_index = register(
+    "doctors", [CSV_PATH],
+    lambda: DoctorIndex(load_doctor_store(), weights=RANK_WEIGHTS if RANKING == "composite" else None)
+)
+
+def get_doctors_by_specialist(specialist, location=None, min_experience=0, min_rating=None, limit=None):
+    # Best first by the configured ranking (composite score, or rating then
+    # experience when min_rating is given, else experience); with limit only
+    # the top rows are built (attrs["total"] has the full count)
+    return doctor_index.current.search(specialist, location, min_experience, min_rating, limit)
+
+def get_nearby_doctors(specialist, location, radius_km=None, k_cities=10, min_experience=0,
+                       min_rating=None, limit=50):
+    # Nearest towns from the gazetteer, then the usual per-town lookup
+    if radius_km is not None:
+        cities = city_index.current.within(location, radius_km)[:k_cities]
+    else:
+        cities = city_index.current.nearest(location, k=k_cities)
+    return doctor_index.current.search_nearby(specialist, cities, min_experience, min_rating, limit)
@@ -1,14 +1,9 @@
 # modules/doctor_profiles.py
 
-import pandas as pd
-import os
+from modules.doctor_filtering import doctor_index
 
-# Get absolute path of the project root
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_PATH = os.path.join(BASE_DIR, "data", "doctor_profiles.csv")
-
-# Load doctor profiles safely
-doctor_df = pd.read_csv(DATA_PATH)
+# Profiles come from the shared columnar store behind the search index
+# (memory-mapped snapshot, swapped in when the CSV changes)
 
 def get_all_doctors():
-    return doctor_df.to_dict(orient="records")
+    return doctor_index.current.store.to_frame().to_dict(orient="records")
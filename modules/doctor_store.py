@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV_PATH = os.path.join(BASE_DIR, "data", "doctor_profiles.csv")
+SNAPSHOT_DIR = os.path.join(BASE_DIR, "cache", "doctor_store")
+
+# Low-cardinality text columns stored as integer codes into a category list
+CATEGORICAL_COLUMNS = ("Specialist", "Location")
+SNAPSHOT_FORMAT = 1
+# Arrays computed from a snapshot (e.g. search sort orders) live in this subdirectory
+DERIVED_DIR = "derived"
+
+CATEGORY, STRING, NUMERIC = "category", "string", "numeric"
+
+
+def _compact_numeric(values):
+    """Smallest dtype that holds ``values`` exactly"""
+    if pd.api.types.is_integer_dtype(values):
+        return pd.to_numeric(values, downcast="integer").to_numpy()
+    as_float = values.to_numpy(dtype=np.float64)
+    as_float32 = as_float.astype(np.float32)
+    if np.array_equal(as_float32.astype(np.float64), as_float, equal_nan=True):
+        return as_float32
+    return as_float
+
+
+def _encode_strings(values):
+    """UTF-8 blob plus offsets, Arrow-style: no per-row Python objects"""
+    encoded = ["" if pd.isna(v) else str(v) for v in values]
+    encoded = [v.encode("utf-8") for v in encoded]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(v) for v in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def source_key(csv_path):
+    """Identifies one version of the CSV: path, size and modification time"""
+    stat = os.stat(csv_path)
+    raw = f"{os.path.abspath(csv_path)}:{stat.st_size}:{stat.st_mtime_ns}:{SNAPSHOT_FORMAT}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+class DoctorStore:
+    """Columnar, read-only doctor directory.
+
+    ``Specialist``/``Location`` are integer codes into small category lists,
+    numeric columns use the narrowest exact dtype, and free text (names) is a
+    single UTF-8 buffer with offsets. Saved as one ``.npy`` file per array and
+    opened with ``mmap_mode="r"``, so a warm start reads only the pages a
+    search touches and every process shares them through the page cache.
+    """
+
+    def __init__(self, columns, kinds, arrays, categories, rows, path=None):
+        self.columns = list(columns)
+        self.kinds = dict(kinds)
+        self.arrays = arrays
+        self.categories = categories
+        self.rows = rows
+        # Snapshot directory this store was opened from, if any
+        self.path = path
+        # Trailing NaN so code -1 decodes to a missing value
+        self._decode = {c: np.append(cats, np.nan) for c, cats in categories.items()}
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, column):
+        return column in self.kinds
+
+    @classmethod
+    def from_frame(cls, df, categorical=CATEGORICAL_COLUMNS):
+        kinds, arrays, categories = {}, {}, {}
+        for column in df.columns:
+            values = df[column]
+            if column in categorical:
+                # Missing values get code -1, which pandas categoricals also use
+                codes, uniques = pd.factorize(values)
+                dtype = np.int16 if len(uniques) < np.iinfo(np.int16).max else np.int32
+                kinds[column] = CATEGORY
+                arrays[column] = codes.astype(dtype)
+                categories[column] = np.asarray(uniques, dtype=object)
+            elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+                kinds[column] = NUMERIC
+                arrays[column] = _compact_numeric(values)
+            else:
+                kinds[column] = STRING
+                arrays[f"{column}.data"], arrays[f"{column}.offsets"] = _encode_strings(values)
+        return cls(df.columns, kinds, arrays, categories, len(df))
+
+    @classmethod
+    def from_csv(cls, csv_path=CSV_PATH):
+        return cls.from_frame(pd.read_csv(csv_path))
+
+    def save(self, path):
+        """Write the snapshot directory atomically (readers never see half of it)"""
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+        try:
+            for name, array in self.arrays.items():
+                np.save(os.path.join(tmp, f"{name}.npy"), array, allow_pickle=False)
+            meta = {
+                "format": SNAPSHOT_FORMAT,
+                "rows": self.rows,
+                "columns": self.columns,
+                "kinds": self.kinds,
+                "categories": {c: list(cats) for c, cats in self.categories.items()},
+            }
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp, path)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            # Another process published the same snapshot first
+            if not os.path.isdir(path):
+                raise
+
+    @classmethod
+    def load(cls, path):
+        """Open a snapshot with every array memory-mapped read-only"""
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {}
+        for name in os.listdir(path):
+            if name.endswith(".npy"):
+                arrays[name[:-len(".npy")]] = np.load(os.path.join(path, name), mmap_mode="r")
+        categories = {c: np.asarray(cats, dtype=object) for c, cats in meta["categories"].items()}
+        return cls(meta["columns"], meta["kinds"], arrays, categories, meta["rows"], path)
+
+    def derived(self, name, build):
+        """Array computed from this store by ``build()``, cached in its snapshot.
+
+        Stores that were not opened from a snapshot just call ``build``.
+        """
+        if self.path is None:
+            return build()
+        path = os.path.join(self.path, DERIVED_DIR, f"{name}.npy")
+        if not os.path.exists(path):
+            array = build()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, array, allow_pickle=False)
+            os.replace(tmp_path, path)
+        return np.load(path, mmap_mode="r")
+
+    def array(self, column):
+        """Raw stored array: category codes or compact numeric values"""
+        return self.arrays[column]
+
+    def _strings(self, column, positions):
+        data, offsets = self.arrays[f"{column}.data"], self.arrays[f"{column}.offsets"]
+        starts = offsets[positions]
+        lengths = offsets[positions + 1] - starts
+        width = int(lengths.max()) if len(lengths) else 0
+        if width == 0:
+            return np.full(len(starts), "", dtype=object)
+        # Gather every value into one zero-padded (rows, width) byte matrix and
+        # decode it in a single call instead of one bytes object per row
+        gather = starts[:, None] + np.arange(width)
+        inside = np.arange(width) < lengths[:, None]
+        matrix = np.where(inside, data[np.minimum(gather, len(data) - 1)], 0).astype(np.uint8)
+        values = matrix.view(f"S{width}").ravel()
+        if matrix.max() < 0x80:
+            # Pure ASCII: numpy's own widening cast is far faster than a codec
+            return values.astype(f"U{width}").astype(object)
+        return np.char.decode(values, "utf-8").astype(object)
+
+    def column(self, column, positions):
+        """Decoded values of ``column`` at ``positions`` (an integer array)"""
+        kind = self.kinds[column]
+        if kind == CATEGORY:
+            return self._decode[column][self.arrays[column][positions]]
+        if kind == STRING:
+            return self._strings(column, positions)
+        values = self.arrays[column][positions]
+        # Widen so results look exactly like a frame read straight from the CSV
+        return values.astype(np.float64 if values.dtype.kind == "f" else np.int64)
+
+    def take(self, positions):
+        """DataFrame of the rows at ``positions``, indexed by position"""
+        positions = np.asarray(positions, dtype=np.intp)
+        return pd.DataFrame(
+            {c: self.column(c, positions) for c in self.columns},
+            index=pd.Index(positions),
+        )
+
+    def to_frame(self):
+        """Whole directory as a DataFrame, categorical columns as pandas categoricals"""
+        data = {}
+        for column in self.columns:
+            if self.kinds[column] == CATEGORY:
+                data[column] = pd.Categorical.from_codes(
+                    np.asarray(self.arrays[column]), categories=pd.Index(self.categories[column])
+                )
+            else:
+                data[column] = self.column(column, np.arange(self.rows, dtype=np.intp))
+        return pd.DataFrame(data)
+
+    def nbytes(self):
+        return sum(a.nbytes for a in self.arrays.values())
+
+
+def load_doctor_store(csv_path=CSV_PATH, snapshot_dir=SNAPSHOT_DIR):
+    """Parse the CSV once and reuse its memory-mapped snapshot on later starts.
+
+    Snapshots are keyed by the CSV's path, size and mtime, so editing the
+    file simply produces a new snapshot. The one it replaces is kept, since
+    the index built on it (in this or another process) serves searches until
+    it is swapped out; snapshots older than that are removed.
+    """
+    key = source_key(csv_path)
+    path = os.path.join(snapshot_dir, key)
+    if not os.path.isfile(os.path.join(path, "meta.json")):
+        DoctorStore.from_csv(csv_path).save(path)
+        _prune_snapshots(snapshot_dir, keep=key)
+    return DoctorStore.load(path)
+
+
+def _prune_snapshots(snapshot_dir, keep):
+    """Remove every snapshot but ``keep`` and the newest other one (the previous)"""
+    snapshots = []
+    for name in os.listdir(snapshot_dir):
+        if name == keep or name.startswith("."):
+            continue
+        try:
+            saved_at = os.path.getmtime(os.path.join(snapshot_dir, name, "meta.json"))
+        except OSError:
+            saved_at = 0.0  # not a complete snapshot
+        snapshots.append((saved_at, name))
+    snapshots.sort(reverse=True)
+    for _, name in snapshots[1:]:
+        shutil.rmtree(os.path.join(snapshot_dir, name), ignore_errors=True)
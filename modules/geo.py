@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from modules.data_reload import register
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAZETTEER_PATH = os.path.join(BASE_DIR, "data", "city_coordinates.csv")
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _unit_vectors(latitudes, longitudes):
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+def _chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+def _km_to_chord(km):
+    return 2 * np.sin(km / (2 * EARTH_RADIUS_KM))
+
+
+class CityIndex:
+    """KD-tree over city coordinates for nearest-city and radius queries.
+
+    Cities are stored as points on the unit sphere, so straight-line (chord)
+    distance in the tree orders cities exactly like great-circle distance and
+    converts back to kilometres without a haversine per candidate.
+    """
+
+    def __init__(self, gazetteer_df):
+        gazetteer_df = gazetteer_df.drop_duplicates("City")
+        self.cities = gazetteer_df["City"].str.strip().to_numpy()
+        self._position = {city.lower(): i for i, city in enumerate(self.cities)}
+        self._points = _unit_vectors(gazetteer_df["Latitude"], gazetteer_df["Longitude"])
+        self._tree = cKDTree(self._points)
+
+    @classmethod
+    def from_csv(cls, path=GAZETTEER_PATH):
+        return cls(pd.read_csv(path))
+
+    def __contains__(self, city):
+        return city.strip().lower() in self._position
+
+    def nearest(self, city, k=5, radius_km=None):
+        """``[(city, km), ...]`` nearest to ``city`` (itself first), optionally within ``radius_km``"""
+        position = self._position.get(city.strip().lower())
+        if position is None:
+            return []
+        k = min(k, len(self.cities))
+        upper = _km_to_chord(radius_km) if radius_km is not None else np.inf
+        chords, ids = self._tree.query(self._points[position], k=k, distance_upper_bound=upper)
+        chords, ids = np.atleast_1d(chords), np.atleast_1d(ids)
+        found = ids < len(self.cities)
+        return [(city, float(km)) for city, km in zip(self.cities[ids[found]], _chord_to_km(chords[found]))]
+
+    def within(self, city, radius_km):
+        """Every city within ``radius_km`` of ``city``, nearest first"""
+        position = self._position.get(city.strip().lower())
+        if position is None:
+            return []
+        ids = np.asarray(self._tree.query_ball_point(self._points[position], _km_to_chord(radius_km)), dtype=np.intp)
+        km = _chord_to_km(np.linalg.norm(self._points[ids] - self._points[position], axis=1))
+        order = np.argsort(km, kind="stable")
+        return [(city, float(d)) for city, d in zip(self.cities[ids[order]], km[order])]
+
+
+city_index = register("cities", [GAZETTEER_PATH], CityIndex.from_csv)
@@ -0,0 +1,206 @@
+import abc
+import contextvars
+import copy
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from modules.config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+from modules.summarizer import summarize_batch, NUM_BEAMS
+from modules.telemetry import telemetry
+
+
+class _Request:
+    __slots__ = ("text", "options", "future", "queued_at")
+
+    def __init__(self, text, options):
+        self.text = text
+        # (max_length, min_length, num_beams): only equal options share a generate call
+        self.options = options
+        self.future = Future()
+        self.queued_at = time.perf_counter()
+
+
+class _Call:
+    __slots__ = ("fn", "future", "context")
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.future = Future()
+        # Run in the caller's context so its spans stay in the caller's trace
+        self.context = contextvars.copy_context()
+
+
+class BaseBroker(abc.ABC):
+    """What InferenceBroker and ModelPool share: the caller-facing API.
+
+    Subclasses implement ``submit`` and a thread that loads the model with
+    ``model_loader``, sets ``_tokenizer`` (or ``_error``) and then ``_loaded``,
+    runs the ``_Call``s put on ``_calls`` with ``_run_call`` and counts each
+    generate with ``_record_batch``. ``result_timeout`` bounds how long a
+    caller waits for its summary (None: as long as it takes).
+    """
+
+    result_timeout = None
+
+    def __init__(self, model_loader, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS):
+        self.model_loader = model_loader
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self.batches = 0
+        self.requests = 0
+        self.largest_batch = 0
+        self._tokenizer = None
+        self._local = threading.local()
+        self._error = None
+        self._loaded = threading.Event()
+        self._calls = queue.Queue()
+
+    @property
+    def tokenizer(self):
+        """The model's tokenizer (for chunking) once the model has loaded.
+
+        Each calling thread gets its own copy: fast tokenizers change their
+        truncation/padding state per call and fail ("Already borrowed") when
+        the model thread uses the same instance at the same time.
+        """
+        self._loaded.wait()
+        if self._error is not None:
+            raise RuntimeError(self._error)
+        if not hasattr(self._local, "tokenizer"):
+            self._local.tokenizer = copy.deepcopy(self._tokenizer)
+        return self._local.tokenizer
+
+    @abc.abstractmethod
+    def submit(self, text, max_length=200, min_length=50, num_beams=NUM_BEAMS):
+        """Queue one text; returns a Future resolving to its summary"""
+
+    def summarize(self, text, max_length=200, min_length=50, num_beams=NUM_BEAMS):
+        with telemetry.span("batched_generate", requests=1):
+            return self._wait([self.submit(text, max_length, min_length, num_beams)])[0]
+
+    def summarize_batch(self, texts, tokenizer=None, model=None, max_length=200, min_length=50,
+                        batch_size=None, num_beams=NUM_BEAMS):
+        """Drop-in for ``summarizer.summarize_batch``: the broker chooses the batches"""
+        with telemetry.span("batched_generate", requests=len(texts)):
+            futures = [self.submit(t, max_length, min_length, num_beams) for t in texts]
+            return self._wait(futures)
+
+    def call(self, fn):
+        """Run ``fn(tokenizer, model)`` alone on the model thread; returns a Future"""
+        call = _Call(fn)
+        self._calls.put(call)
+        return call.future
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "largest_batch": self.largest_batch,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+        }
+
+    def _wait(self, futures):
+        return [future.result(timeout=self.result_timeout) for future in futures]
+
+    def _record_batch(self, size):
+        self.batches += 1
+        self.requests += size
+        self.largest_batch = max(self.largest_batch, size)
+
+    def _run_call(self, call, model):
+        try:
+            call.future.set_result(call.context.run(call.fn, self._tokenizer, model))
+        except Exception as e:
+            call.future.set_exception(e)
+
+
+class InferenceBroker(BaseBroker):
+    """Shared model thread that micro-batches summarization requests.
+
+    Every session and job worker submits texts here instead of calling
+    ``model.generate`` itself. The broker waits up to ``max_wait_ms`` after
+    the first pending request for others to arrive, pads up to
+    ``max_batch_size`` of them into one batch, runs a single generate and
+    resolves each caller's future with its own summary. Work that cannot be
+    batched (streaming) is run alone between batches via ``call``.
+
+    ``model_loader`` is called once on the broker thread and must return
+    ``(tokenizer, model)``.
+    """
+
+    def __init__(self, model_loader, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS):
+        super().__init__(model_loader, max_batch_size, max_wait_ms)
+        # Requests and calls share one queue, so a call runs between batches
+        self._queue = self._calls
+        self._thread = threading.Thread(target=self._run, name="docwise-inference-broker", daemon=True)
+        self._thread.start()
+
+    def submit(self, text, max_length=200, min_length=50, num_beams=NUM_BEAMS):
+        """Queue one text; returns a Future resolving to its summary"""
+        request = _Request(text, (max_length, min_length, num_beams))
+        self._queue.put(request)
+        return request.future
+
+    def _collect(self, first):
+        """Requests arriving within max_wait_ms of ``first``, plus any calls seen meanwhile"""
+        batch, calls = [first], []
+        deadline = first.queued_at + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            try:
+                # Whatever is already queued is taken without waiting
+                item = self._queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                break
+            if isinstance(item, _Call):
+                calls.append(item)
+            else:
+                batch.append(item)
+        return batch, calls
+
+    def _run(self):
+        try:
+            self._tokenizer, model = self.model_loader()
+        except Exception as e:
+            self._error = f"{type(e).__name__}: {e}"
+        finally:
+            self._loaded.set()
+
+        while True:
+            item = self._queue.get()
+            if self._error is not None:
+                item.future.set_exception(RuntimeError(self._error))
+                continue
+            if isinstance(item, _Call):
+                self._run_call(item, model)
+                continue
+            batch, calls = self._collect(item)
+            self._run_batch(batch, model)
+            for call in calls:
+                self._run_call(call, model)
+
+    def _run_batch(self, batch, model):
+        groups = {}
+        for request in batch:
+            groups.setdefault(request.options, []).append(request)
+        for (max_length, min_length, num_beams), requests in groups.items():
+            try:
+                with telemetry.span("broker_batch", batch_size=len(requests)) as span:
+                    span["queue_wait_s"] = time.perf_counter() - requests[0].queued_at
+                    summaries = summarize_batch(
+                        [r.text for r in requests],
+                        self._tokenizer,
+                        model,
+                        max_length=max_length,
+                        min_length=min_length,
+                        batch_size=len(requests),
+                        num_beams=num_beams
+                    )
+            except Exception as e:
+                for request in requests:
+                    request.future.set_exception(e)
+                continue
+            self._record_batch(len(requests))
+            for request, summary in zip(requests, summaries):
+                request.future.set_result(summary)
@@ -0,0 +1,377 @@
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from modules.config import SALIENCE_METHOD, UPLOAD_MAX_PAGES
+from modules.deadline import decode_speed, plan_generation, MIN_MAX_TIME_S
+from modules.pdf_extractor import extract_pages
+from modules.salience import select_salient
+from modules.summarizer import (
+    generate_summary, generate_long_summary, reduce_chunks, reduce_pages, summarize_batch, chunk_text,
+    NUM_BEAMS, MODEL_MAX_TOKENS, SUMMARY_PREFIX,
+)
+from modules.summary_cache import make_cache_key
+from modules.telemetry import telemetry, memory_peak
+from modules.uploads import SpooledUpload
+
+QUEUED = "queued"
+EXTRACTING = "extracting"
+GENERATING = "generating"
+DONE = "done"
+FAILED = "failed"
+
+# Finished jobs are kept this long so a polling session can still collect them
+JOB_TTL_SECONDS = 60 * 60
+
+
+def stage_durations(trace):
+    """Total seconds per stage within a telemetry trace, in first-seen order"""
+    durations = {}
+    for span in trace["spans"]:
+        durations[span["stage"]] = durations.get(span["stage"], 0.0) + span["duration_s"]
+    return durations
+
+
+@dataclass
+class SummaryJob:
+    job_id: str
+    # PDF bytes or a SpooledUpload (closed once the job has run)
+    pdf_bytes: object
+    params: dict
+    status: str = QUEUED
+    result: dict = None
+    error: str = None
+    exception: Exception = field(default=None, repr=False)
+    # Summary text so far while a streamed job is generating
+    partial_summary: str = None
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: float = None
+    # Set once the job is done or failed, for callers that block on it
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+
+class SummaryJobQueue:
+    """In-process summarization jobs served by a small pool of worker threads.
+
+    Without a ``broker`` the workers own the model: ``model_loader`` is
+    called from the worker thread and must return ``(tokenizer, model)``.
+    With an ``InferenceBroker`` the workers only extract and chunk, and
+    every generate goes through the broker so concurrent jobs share
+    batches. With a ``page_cache`` long documents are re-summarized
+    incrementally: page texts and per-page chunk summaries are reused and
+    only changed pages are extracted and summarized again. Callers submit
+    PDF bytes (or a SpooledUpload), get a job id back immediately and poll
+    ``get`` for progress. Documents over ``max_pages`` fail with
+    UploadTooLarge, and every result reports the worker's peak memory
+    while the job ran (``result["memory"]``, see ``telemetry.memory_peak``).
+    """
+
+    def __init__(self, model_loader, model_name, workers=1, cache=None, broker=None, page_cache=None,
+                 max_pages=UPLOAD_MAX_PAGES):
+        self.model_loader = model_loader
+        self.model_name = model_name
+        self.max_pages = max_pages
+        self.cache = cache
+        self.broker = broker
+        self.page_cache = page_cache
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._workers = [
+            threading.Thread(target=self._run, name=f"summary-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, pdf_bytes, max_length=200, min_length=50, long_document=True, stream=False,
+               salience_budget=None, deadline_s=None):
+        """Queue a PDF for summarization and return its job id.
+
+        With ``stream`` the summary is generated greedily and published in
+        ``job.partial_summary`` as it is decoded. With ``salience_budget``
+        only the top-ranked sentences fitting that many tokens are
+        summarized (see ``salience.select_salient``). With ``deadline_s``
+        decoding is planned to finish within that many seconds of this call,
+        queueing included (see ``_summarize_by_deadline``); the chosen
+        strategy is reported in ``result["generation"]`` and a summary cut
+        short at the deadline is not cached.
+        """
+        job = SummaryJob(
+            job_id=uuid.uuid4().hex,
+            pdf_bytes=pdf_bytes,
+            params={
+                "max_length": max_length,
+                "min_length": min_length,
+                "long_document": long_document,
+                "stream": stream,
+                "salience_budget": salience_budget,
+                "salience_method": SALIENCE_METHOD if salience_budget else None,
+                "deadline_s": deadline_s,
+            }
+        )
+        with self._lock:
+            self._prune()
+            self._jobs[job.job_id] = job
+        self._queue.put(job.job_id)
+        return job.job_id
+
+    def get(self, job_id):
+        """Return the SummaryJob for ``job_id`` or None if unknown/expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout=None):
+        """Block until the job finishes or ``timeout`` seconds pass; returns the job"""
+        job = self.get(job_id)
+        if job is not None:
+            job.done.wait(timeout)
+        return job
+
+    def pending(self):
+        """Number of jobs that have not finished yet"""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def _prune(self):
+        cutoff = time.time() - JOB_TTL_SECONDS
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _set_status(self, job, status):
+        with self._lock:
+            job.status = status
+
+    def _run(self):
+        if self.broker is None:
+            tokenizer, model = self.model_loader()
+        else:
+            tokenizer, model = None, None
+        while True:
+            job = self.get(self._queue.get())
+            if job is None:
+                continue
+            try:
+                with memory_peak() as memory, telemetry.trace("summarize_pdf", job_id=job.job_id) as trace:
+                    result = self._process(job, tokenizer, model)
+                result["stages"] = stage_durations(trace)
+                result["memory"] = memory
+                with self._lock:
+                    job.result = result
+                    job.status = DONE
+            except Exception as e:
+                with self._lock:
+                    job.error = str(e)
+                    job.exception = e
+                    job.status = FAILED
+            finally:
+                with self._lock:
+                    upload, job.pdf_bytes = job.pdf_bytes, None
+                    job.finished_at = time.time()
+                # The PDF is no longer needed once the job has run
+                if isinstance(upload, SpooledUpload):
+                    upload.close()
+                job.done.set()
+
+    def _process(self, job, tokenizer, model):
+        start_time = time.time()
+        params = job.params
+        if isinstance(job.pdf_bytes, SpooledUpload):
+            pdf_bytes, source = job.pdf_bytes.data(), job.pdf_bytes.source()
+        else:
+            pdf_bytes = source = job.pdf_bytes
+        cache_key = None
+        if self.cache is not None:
+            cache_key = make_cache_key(
+                pdf_bytes, self.model_name, num_beams=1 if params["stream"] else NUM_BEAMS, **params
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return {**cached, "from_cache": True, "processing_time": time.time() - start_time}
+
+        self._set_status(job, EXTRACTING)
+        document = extract_pages(source, page_cache=self.page_cache, max_pages=self.max_pages)
+        word_count = len(document.text.split())
+
+        self._set_status(job, GENERATING)
+        first_text_at = None
+
+        def on_text(text):
+            nonlocal first_text_at
+            if first_text_at is None:
+                first_text_at = time.time()
+            with self._lock:
+                job.partial_summary = text
+
+        on_text = on_text if params["stream"] else None
+        page_stats = {}
+        salience = None
+        # The budget covers the whole request, time spent waiting in the queue included
+        deadline = {"at": job.submitted_at + params["deadline_s"]} if params.get("deadline_s") else None
+        if params.get("salience_budget"):
+            # The filtered text no longer lines up with pages, so the page cache is skipped
+            text, salience = select_salient(
+                document.text,
+                tokenizer if self.broker is None else self.broker.tokenizer,
+                params["salience_budget"],
+                params["salience_method"]
+            )
+            summary = self._summarize(text, params, tokenizer, model, on_text, deadline)
+        elif self.page_cache is not None and params["long_document"] and deadline is None:
+            # Under a deadline the whole map step has to be budgeted, so the page cache is skipped
+            summary, summarized = self._summarize_pages(document, params, tokenizer, model, on_text)
+            recomputed = {i for i, cached in enumerate(document.page_cached) if not cached} | set(summarized)
+            page_stats = {
+                "pages_reused": document.page_count - len(recomputed),
+                "pages_recomputed": len(recomputed),
+            }
+        else:
+            summary = self._summarize(document.text, params, tokenizer, model, on_text, deadline)
+        if summary.startswith("Error generating summary"):
+            raise RuntimeError(summary)
+
+        result = {
+            "summary": summary,
+            "word_count": word_count,
+            "page_count": document.page_count,
+            "page_time": sum(document.page_timings),
+            "slowest_page": max(document.page_timings, default=0.0),
+            **page_stats,
+        }
+        if salience is not None:
+            result["salience"] = salience
+        if deadline is not None:
+            result["generation"] = {key: value for key, value in deadline.items() if key != "at"}
+        # A summary cut short at the deadline is not kept, so a retry can get the full one
+        if cache_key is not None and not result.get("generation", {}).get("stopped_at_deadline"):
+            self.cache.put(cache_key, result)
+        return {
+            **result,
+            "from_cache": False,
+            "processing_time": time.time() - start_time,
+            "time_to_first_token": first_text_at - start_time if first_text_at else None,
+        }
+
+    def _summarize(self, text, params, tokenizer, model, on_text, deadline=None):
+        if deadline is not None:
+            return self._summarize_by_deadline(text, params, tokenizer, model, on_text, deadline)
+        summarize = generate_long_summary if params["long_document"] else generate_summary
+        max_length, min_length = params["max_length"], params["min_length"]
+        if self.broker is None:
+            return summarize(text, tokenizer, model, max_length, min_length, on_text=on_text)
+        if on_text is not None:
+            if params["long_document"]:
+                # The chunk map step is batched with other sessions' requests;
+                # only the final, streamed pass needs the model to itself
+                try:
+                    text = reduce_chunks([text], self.broker.tokenizer, None, summarize=self.broker.summarize_batch)[0]
+                except Exception as e:
+                    return f"Error generating summary: {str(e)}"
+                if not text:
+                    return ""
+            # A streamed generate is a batch of one; it runs between the broker's batches
+            return self.broker.call(
+                lambda tokenizer, model: generate_summary(text, tokenizer, model, max_length, min_length, on_text=on_text)
+            ).result(timeout=self.broker.result_timeout)
+        if params["long_document"]:
+            return generate_long_summary(
+                text, self.broker.tokenizer, None, max_length, min_length, summarize=self.broker.summarize_batch
+            )
+        try:
+            return self.broker.summarize(text, max_length, min_length)
+        except Exception as e:
+            return f"Error generating summary: {str(e)}"
+
+    def _summarize_pages(self, document, params, tokenizer, model, on_text):
+        """Incremental long-document summary; returns ``(summary, summarized_pages)``"""
+        if self.broker is None:
+            chunk_tokenizer, summarize = tokenizer, summarize_batch
+        else:
+            chunk_tokenizer, summarize = self.broker.tokenizer, self.broker.summarize_batch
+        final, summarized = reduce_pages(
+            document.page_texts(), chunk_tokenizer, model, self.page_cache, self.model_name, summarize=summarize
+        )
+        if not final:
+            return "", summarized
+        # Only this final pass over the combined page summaries always runs again
+        summary = self._summarize(final, {**params, "long_document": False}, tokenizer, model, on_text)
+        return summary, summarized
+
+    def _summarize_by_deadline(self, text, params, tokenizer, model, on_text, deadline):
+        """Summary planned to finish by ``deadline["at"]``; the plan is recorded in ``deadline``.
+
+        Costs come from ``decode_speed`` (measured encoder and per-step
+        decoder times). In long mode the chunk map step runs only if it and
+        a greedy final pass are expected to fit, otherwise the first 1024
+        tokens are summarized. The final generate then gets the widest beam
+        search that fits the time left, else greedy, else a greedy summary
+        shortened to the affordable number of steps, and always a hard
+        ``max_time`` stop. It runs alone (through ``broker.call``) so its
+        timing is not diluted by other sessions' batches.
+        """
+        chunk_tokenizer = tokenizer if self.broker is None else self.broker.tokenizer
+        max_length, min_length = params["max_length"], params["min_length"]
+        deadline["budget_s"] = params["deadline_s"]
+        map_skipped = False
+        if params["long_document"]:
+            chunks = chunk_text(text, chunk_tokenizer)
+            if len(chunks) > 1:
+                # Upper bound: every chunk a full encoder window summarized at 150 tokens
+                map_s = len(chunks) * decode_speed.estimate(MODEL_MAX_TOKENS, NUM_BEAMS, 150)
+                final_s = decode_speed.estimate(MODEL_MAX_TOKENS, 1, min(max_length, MODEL_MAX_TOKENS))
+                map_skipped = map_s + final_s > deadline["at"] - time.time()
+                if not map_skipped:
+                    summarize = summarize_batch if self.broker is None else self.broker.summarize_batch
+                    text = reduce_chunks([text], chunk_tokenizer, model, summarize=summarize)[0]
+
+        tokens_in = len(chunk_tokenizer.encode(SUMMARY_PREFIX + text, max_length=MODEL_MAX_TOKENS, truncation=True))
+        plan = plan_generation(
+            tokens_in,
+            deadline["at"] - time.time(),
+            max_length,
+            min_length,
+            # Streaming can only decode greedily
+            beam_options=(1,) if on_text is not None else (NUM_BEAMS, 1),
+            max_positions=MODEL_MAX_TOKENS,
+        )
+
+        timing = {}
+
+        def run(tokenizer, model):
+            # Time spent waiting for the broker comes off the hard stop, not on top of it
+            timing["max_time"] = min(plan.max_time, max(deadline["at"] - time.time(), MIN_MAX_TIME_S))
+            started = time.perf_counter()
+            try:
+                return generate_summary(
+                    text, tokenizer, model, plan.max_length, plan.min_length,
+                    on_text=on_text, num_beams=plan.num_beams, max_time=timing["max_time"]
+                )
+            finally:
+                timing["generate_s"] = time.perf_counter() - started
+
+        if self.broker is None:
+            summary = run(tokenizer, model)
+        else:
+            summary = self.broker.call(run).result(timeout=self.broker.result_timeout)
+        generate_s = timing["generate_s"]
+        deadline.update(
+            strategy=plan.strategy + (" · chunking skipped, first 1024 tokens only" if map_skipped else ""),
+            num_beams=plan.num_beams,
+            max_length=plan.max_length,
+            estimated_s=plan.estimated_s,
+            generate_s=generate_s,
+            # generate stops itself at max_time; getting close means it was cut short
+            stopped_at_deadline=generate_s >= 0.95 * timing["max_time"],
+            within_budget=time.time() <= deadline["at"],
+        )
+        return summary
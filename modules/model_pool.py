@@ -0,0 +1,286 @@
+import copy
+import ctypes
+import itertools
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from modules.config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, INFERENCE_PROCESSES
+from modules.inference_broker import BaseBroker
+from modules.summarizer import summarize_batch, NUM_BEAMS
+from modules.telemetry import telemetry, process_memory_mb
+
+# Seconds a caller waits for a summary before giving up on the pool
+RESULT_TIMEOUT_S = 600
+# Seconds between checks that every worker process (and, in a worker, the parent) is still alive
+WATCH_INTERVAL_S = 1.0
+
+try:
+    # glibc keeps freed activation memory (hundreds of MB after a batched
+    # beam search) in the worker's heap; an idle worker hands it back
+    _malloc_trim = ctypes.CDLL("libc.so.6").malloc_trim
+except (OSError, AttributeError):
+    _malloc_trim = None
+
+
+def _serve(tokenizer, model, requests, results, threads, max_batch_size, max_wait_ms):
+    """Worker process loop: micro-batch queued texts, generate, send the summaries back.
+
+    Every message to the parent carries this process's pid, which the
+    parent tracks in-flight requests by.
+    """
+    # Ctrl-C reaches the whole process group; the parent shuts workers down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import torch
+
+    torch.set_num_threads(threads)
+    parent = os.getppid()
+    worker = os.getpid()
+    stopping = False
+    while not stopping:
+        try:
+            first = requests.get(timeout=WATCH_INTERVAL_S)
+        except queue.Empty:
+            # A parent killed without the chance to stop us leaves nobody to serve
+            if os.getppid() != parent:
+                return
+            continue
+        if first is None:
+            return
+        batch = [first]
+        deadline = first[3] + max_wait_ms / 1000
+        while len(batch) < max_batch_size:
+            try:
+                item = requests.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+
+        # Everything pulled is reported before any generate, so if this
+        # worker dies the parent fails every request it held, not one group
+        results.put(("taken", worker, [request[0] for request in batch]))
+        groups = {}
+        for request in batch:
+            groups.setdefault(request[2], []).append(request)
+        for (max_length, min_length, num_beams), group in groups.items():
+            ids = [request[0] for request in group]
+            try:
+                summaries = summarize_batch(
+                    [request[1] for request in group],
+                    tokenizer,
+                    model,
+                    max_length=max_length,
+                    min_length=min_length,
+                    batch_size=len(group),
+                    num_beams=num_beams
+                )
+            except Exception as e:
+                results.put(("failed", worker, ids, f"{type(e).__name__}: {e}"))
+            else:
+                results.put(("done", worker, ids, summaries))
+        if telemetry.enabled:
+            # Worker spans belong to no trace, so nothing else exports them promptly
+            telemetry.write_prometheus()
+        if _malloc_trim is not None and requests.empty():
+            _malloc_trim(0)
+
+
+class ModelPool(BaseBroker):
+    """Inference worker processes forked from one loaded model.
+
+    The model is loaded once in this process and moved to shared memory
+    (``share_memory()``); ``processes`` workers are then forked and map the
+    same weight pages instead of holding a copy each. Texts go to a local
+    multiprocessing queue that idle workers take from, micro-batching
+    whatever arrives within ``max_wait_ms`` as the InferenceBroker does,
+    and each caller's future resolves with its own summary. A worker that
+    dies fails its in-flight requests and is replaced; a caller waits at
+    most ``RESULT_TIMEOUT_S`` for a summary.
+
+    Drop-in for InferenceBroker in SummaryJobQueue. Work that cannot cross
+    a process boundary (``call``, used for streaming and deadline-planned
+    generates) runs on a model thread in this process, on the same shared
+    weights. ``model_loader`` is called once on a background thread and
+    must return ``(tokenizer, model)``.
+    """
+
+    result_timeout = RESULT_TIMEOUT_S
+
+    def __init__(self, model_loader, processes=INFERENCE_PROCESSES, threads_per_process=None,
+                 max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS):
+        super().__init__(model_loader, max_batch_size, max_wait_ms)
+        self.processes = max(1, int(processes))
+        # Split the cores between workers so they do not oversubscribe the CPU
+        self.threads_per_process = threads_per_process or max(1, (os.cpu_count() or 1) // self.processes)
+        self.shared_memory = False
+        self.restarts = 0
+        self._closing = False
+        self._context = multiprocessing.get_context("fork")
+        self._requests = self._context.Queue()
+        self._results = self._context.Queue()
+        self._futures = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._workers = []
+        # Worker pid -> ids of the requests it took and has not answered yet
+        self._inflight = {}
+        self._model = None
+        threading.Thread(target=self._run, name="docwise-model-pool", daemon=True).start()
+
+    def submit(self, text, max_length=200, min_length=50, num_beams=NUM_BEAMS):
+        """Queue one text for the worker processes; returns a Future resolving to its summary"""
+        future = Future()
+        with self._lock:
+            if self._error is not None:
+                future.set_exception(RuntimeError(self._error))
+                return future
+            request_id = next(self._ids)
+            self._futures[request_id] = future
+        self._requests.put((request_id, text, (max_length, min_length, num_beams), time.monotonic()))
+        return future
+
+    def stats(self):
+        return {**super().stats(), "processes": self.processes, "restarts": self.restarts}
+
+    def memory(self):
+        """Resident memory of this process and the workers: summed RSS and summed PSS in MB.
+
+        Summed RSS counts the shared weights once per process; summed PSS
+        counts them once overall and is the pool's real footprint.
+        """
+        pids = ["self", *(worker.pid for worker in self._workers if worker.is_alive())]
+        rss, pss = zip(*(process_memory_mb(pid) for pid in pids))
+        return {
+            "processes": len(pids),
+            "rss_mb": round(sum(rss), 1),
+            "pss_mb": round(sum(pss), 1) if None not in pss else None,
+        }
+
+    def close(self, timeout=10):
+        """Stop the workers once they finish what they are generating"""
+        self._closing = True
+        for _ in self._workers:
+            self._requests.put(None)
+        for worker in self._workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+
+    def _spawn(self, index):
+        worker = self._context.Process(
+            target=_serve,
+            args=(
+                self._worker_tokenizer, self._model, self._requests, self._results,
+                self.threads_per_process, self.max_batch_size, self.max_wait_ms
+            ),
+            name=f"docwise-inference-{index}",
+            daemon=True,
+        )
+        worker.start()
+        return worker
+
+    def _run(self):
+        try:
+            self._tokenizer, self._model = self.model_loader()
+            try:
+                self._model.share_memory()
+                self.shared_memory = True
+            except RuntimeError as e:
+                # e.g. /dev/shm too small: forked workers still share the pages copy-on-write
+                print(f"Model weights not moved to shared memory ({e})", file=sys.stderr)
+            # The workers' own tokenizer, so none inherits one a thread here is using mid-call
+            self._worker_tokenizer = copy.deepcopy(self._tokenizer)
+            self._workers = [self._spawn(i) for i in range(self.processes)]
+        except Exception as e:
+            with self._lock:
+                self._error = f"{type(e).__name__}: {e}"
+                pending, self._futures = self._futures, {}
+            for future in pending.values():
+                future.set_exception(RuntimeError(self._error))
+        finally:
+            self._loaded.set()
+
+        # Started on a failed load too: it fails every queued and later call with the load error
+        threading.Thread(target=self._run_calls, name="docwise-model-pool-calls", daemon=True).start()
+        if self._error is not None:
+            return
+        watched_at = time.monotonic()
+        while True:
+            try:
+                self._handle(self._results.get(timeout=WATCH_INTERVAL_S))
+            except queue.Empty:
+                pass
+            if time.monotonic() - watched_at >= WATCH_INTERVAL_S:
+                self._replace_dead_workers()
+                watched_at = time.monotonic()
+
+    def _handle(self, message):
+        kind, pid, ids = message[:3]
+        if kind == "taken":
+            self._inflight.setdefault(pid, set()).update(ids)
+            return
+        inflight = self._inflight.get(pid)
+        if inflight is not None:
+            inflight.difference_update(ids)
+            if not inflight:
+                del self._inflight[pid]
+        futures = self._pop_futures(ids)
+        if kind == "failed":
+            for future in futures:
+                if future is not None:
+                    future.set_exception(RuntimeError(message[3]))
+            return
+        self._record_batch(len(ids))
+        for future, summary in zip(futures, message[3]):
+            if future is not None:
+                future.set_result(summary)
+
+    def _pop_futures(self, ids):
+        with self._lock:
+            return [self._futures.pop(request_id, None) for request_id in ids]
+
+    def _replace_dead_workers(self):
+        dead = [(index, worker) for index, worker in enumerate(self._workers) if not worker.is_alive()]
+        if not dead or self._closing:
+            return
+        # What a dead worker sent before it died is still in the pipe: handle
+        # it first, so a late "taken" is charged to that worker and failed below
+        while True:
+            try:
+                self._handle(self._results.get_nowait())
+            except queue.Empty:
+                break
+        for index, worker in dead:
+            print(f"Inference worker {worker.pid} exited ({worker.exitcode}); starting a replacement",
+                  file=sys.stderr)
+            for future in self._pop_futures(self._inflight.pop(worker.pid, ())):
+                if future is not None:
+                    future.set_exception(RuntimeError(f"inference worker exited ({worker.exitcode})"))
+            self.restarts += 1
+            self._workers[index] = self._spawn(index)
+
+    def _wait(self, futures):
+        try:
+            return super()._wait(futures)
+        except FutureTimeoutError:
+            # The caller has given up on all of them; drop them so _futures does not grow
+            abandoned = set(map(id, futures))
+            with self._lock:
+                self._futures = {i: f for i, f in self._futures.items() if id(f) not in abandoned}
+            raise
+
+    def _run_calls(self):
+        while True:
+            call = self._calls.get()
+            if self._error is not None:
+                call.future.set_exception(RuntimeError(self._error))
+                continue
+            self._run_call(call, self._model)
@@ -0,0 +1,295 @@
+import atexit
+import hashlib
+import io
+import mmap
+import multiprocessing
+import os
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import PyPDF2
+
+from modules.config import EXTRACT_PROCESSES
+from modules.telemetry import telemetry
+from modules.uploads import UploadTooLarge
+
+# Documents with fewer pages are parsed in-process; the pool start-up and
+# re-parsing the xref table in every worker only pay off on large reports
+PARALLEL_MIN_PAGES = 24
+PAGES_PER_TASK = 8
+PAGE_SEPARATOR = "\n"
+# Bump when extraction changes so cached page texts are not reused
+PAGE_TEXT_VERSION = 1
+
+# Spawn pools of this process, by size; a forked child starts its own
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+
+
+@dataclass
+class ExtractedDocument:
+    """Full text of a PDF plus where each page starts in it"""
+    text: str
+    page_offsets: list = field(default_factory=list)
+    page_timings: list = field(default_factory=list)
+    # Per page: True when its text came from the page cache instead of PyPDF2
+    page_cached: list = field(default_factory=list)
+
+    @property
+    def page_count(self):
+        return len(self.page_offsets)
+
+    def page_texts(self):
+        """Text of each page, split back out of ``text``"""
+        ends = self.page_offsets[1:] + [len(self.text) + len(PAGE_SEPARATOR)]
+        return [self.text[start:end - len(PAGE_SEPARATOR)] for start, end in zip(self.page_offsets, ends)]
+
+    def page_for_offset(self, offset):
+        """Return the 0-based page index that character ``offset`` came from"""
+        return max(bisect_right(self.page_offsets, offset) - 1, 0)
+
+
+def _read_source(source):
+    """Return raw PDF bytes from an upload buffer, file object, path or bytes.
+
+    A path is memory-mapped instead of read, so a large file is parsed in
+    place and only the parts PyPDF2 touches are paged in; ``_opened``
+    closes that mapping again.
+    """
+    if isinstance(source, (bytes, mmap.mmap)):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    source.seek(0)
+    return source.read()
+
+
+@contextmanager
+def _opened(source):
+    """``_read_source`` for a with block: an mmap it made for a path is closed on exit"""
+    pdf = _read_source(source)
+    try:
+        yield pdf
+    finally:
+        if isinstance(pdf, mmap.mmap) and pdf is not source:
+            pdf.close()
+
+
+def _open_reader(pdf, max_pages=None):
+    """PdfReader over bytes or an mmap, refusing documents over ``max_pages``"""
+    reader = PyPDF2.PdfReader(pdf if isinstance(pdf, mmap.mmap) else io.BytesIO(pdf))
+    if max_pages is not None and len(reader.pages) > max_pages:
+        raise UploadTooLarge(f"PDF has {len(reader.pages)} pages; the limit is {max_pages}")
+    return reader
+
+
+def _canonical(value, depth=0):
+    """A PDF object as text with indirect references resolved, so object numbering does not matter"""
+    if depth > 8:
+        return "..."
+    value = value.get_object() if isinstance(value, PyPDF2.generic.IndirectObject) else value
+    if isinstance(value, dict):
+        return "<<" + " ".join(f"{key} {_canonical(value[key], depth + 1)}" for key in sorted(value)) + ">>"
+    if isinstance(value, list):
+        return "[" + " ".join(_canonical(item, depth + 1) for item in value) + "]"
+    return str(value)
+
+
+def _hash_resources(digest, resources, seen):
+    """Fonts and Form XObjects of a /Resources dictionary; forms are followed into their own resources"""
+    resources = resources.get_object() if resources is not None else {}
+    fonts = resources.get("/Font")
+    fonts = fonts.get_object() if fonts is not None else {}
+    for name in sorted(fonts):
+        font = fonts[name].get_object()
+        digest.update(f"font {name}:{font.get('/BaseFont')}:{_canonical(font.get('/Encoding'))}".encode())
+        to_unicode = font.get("/ToUnicode")
+        if to_unicode is not None:
+            digest.update(to_unicode.get_object().get_data())
+    xobjects = resources.get("/XObject")
+    xobjects = xobjects.get_object() if xobjects is not None else {}
+    for name in sorted(xobjects):
+        # raw_get: indexing would resolve the reference and hide its object number
+        reference = xobjects.raw_get(name)
+        xobject = reference.get_object()
+        # Images carry no text; skipping them also keeps scanned pages cheap to fingerprint
+        if xobject.get("/Subtype") != "/Form":
+            if isinstance(reference, PyPDF2.generic.IndirectObject):
+                # Resolved only to read /Subtype: don't let the reader keep the image stream
+                reference.pdf.resolved_objects.pop((reference.generation, reference.idnum), None)
+            continue
+        digest.update(f"form {name}:{_canonical(xobject.get('/Matrix'))}".encode())
+        key = reference.idnum if isinstance(reference, PyPDF2.generic.IndirectObject) else id(xobject)
+        if key in seen:
+            # Drawn again (or a form that draws itself): its content is already in the hash
+            continue
+        seen.add(key)
+        digest.update(xobject.get_data())
+        _hash_resources(digest, xobject.get("/Resources"), seen)
+
+
+def page_fingerprint(page):
+    """Content hash of everything extract_text reads from one page.
+
+    Covers the decoded content stream, the page rotation, each font's
+    name, resolved encoding and ToUnicode map, and the streams of the Form
+    XObjects the page draws (whose text extract_text also reads) with
+    their own fonts and forms. A re-issued PDF whose page draws the same
+    text gets the same fingerprint even if the file around it (other
+    pages, metadata, object numbering) changed.
+    """
+    digest = hashlib.sha256(f"v{PAGE_TEXT_VERSION}:{PyPDF2.__version__}:{page.get('/Rotate', 0)}".encode())
+    contents = page.get_contents()
+    digest.update(contents.get_data() if contents is not None else b"")
+    _hash_resources(digest, page.get("/Resources"), set())
+    return digest.hexdigest()
+
+
+def _extract_page(reader, index):
+    """Text of one page and the seconds it took"""
+    began = time.perf_counter()
+    text = reader.pages[index].extract_text() or ""
+    # extract_text resolves every XObject the page draws, scanned images
+    # included, and PdfReader would keep them all until it is dropped
+    reader.resolved_objects.clear()
+    return text, time.perf_counter() - began
+
+
+def _extract_page_list(source, indices):
+    """Worker task: extract the pages at ``indices`` and time each one"""
+    with _opened(source) as pdf:
+        reader = _open_reader(pdf)
+        return [_extract_page(reader, index) for index in indices]
+
+
+def _pool_size(workers=None):
+    """Processes to extract in: ``workers``, else DOCWISE_EXTRACT_PROCESSES, else one per core.
+
+    Always 1 inside a worker process (ours or anyone's), so pools are never
+    nested: a nested pool keeps its parent worker from exiting.
+    """
+    if multiprocessing.parent_process() is not None:
+        return 1
+    return max(1, int(workers or EXTRACT_PROCESSES or os.cpu_count() or 1))
+
+
+def _get_pool(workers):
+    """This process's spawn pool of ``workers`` processes, started on first use"""
+    global _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # Pools inherited through os.fork have no live workers here
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(workers)
+        if pool is None:
+            # spawn avoids forking a process that already holds torch threads
+            pool = _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return pool
+
+
+@atexit.register
+def shutdown_pools():
+    """Stop this process's extraction pools; registered to run at exit"""
+    with _pools_lock:
+        pools = list(_pools.values()) if _pools_pid == os.getpid() else []
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(cancel_futures=True)
+
+
+def iter_pages(source, workers=None, parallel_min_pages=PARALLEL_MIN_PAGES, indices=None, max_pages=None):
+    """Yield ``(page_index, text, seconds)`` for every page, in page order.
+
+    Large documents are split into page ranges that are extracted in a
+    process pool; results are still yielded in order as they become ready,
+    so callers can start consuming early pages before the last one is done.
+    ``indices`` restricts extraction to those pages. Pool workers are sent
+    a path source as the path (each maps the file itself), not its bytes.
+    Documents over ``max_pages`` raise UploadTooLarge before any page is read.
+    """
+    with _opened(source) as pdf_bytes:
+        reader = _open_reader(pdf_bytes, max_pages)
+        indices = list(range(len(reader.pages))) if indices is None else list(indices)
+        workers = _pool_size(workers)
+
+        if len(indices) < parallel_min_pages or workers == 1:
+            for index in indices:
+                yield (index, *_extract_page(reader, index))
+            return
+
+        pool = _get_pool(workers)
+        groups = [indices[i:i + PAGES_PER_TASK] for i in range(0, len(indices), PAGES_PER_TASK)]
+        task_source = os.fspath(source) if isinstance(source, (str, os.PathLike)) else pdf_bytes
+        futures = [pool.submit(_extract_page_list, task_source, group) for group in groups]
+        for group, future in zip(groups, futures):
+            for index, (text, seconds) in zip(group, future.result()):
+                yield index, text, seconds
+
+
+def extract_pages(source, workers=None, parallel_min_pages=PARALLEL_MIN_PAGES, page_cache=None, max_pages=None):
+    """Extract a PDF into an ExtractedDocument, joining pages in one pass.
+
+    With ``page_cache`` (a SummaryCache) each page's text is stored under
+    its ``page_fingerprint`` and only pages not seen before are extracted.
+    """
+    with telemetry.span("pdf_extraction") as span:
+        if page_cache is None:
+            pages = iter_pages(source, workers, parallel_min_pages, max_pages=max_pages)
+            cached = None
+        else:
+            pages, cached = _cached_pages(source, page_cache, workers, parallel_min_pages, max_pages)
+        texts, offsets, timings = [], [], []
+        offset = 0
+        for _, text, seconds in pages:
+            offsets.append(offset)
+            timings.append(seconds)
+            texts.append(text)
+            offset += len(text) + len(PAGE_SEPARATOR)
+        span["pages"] = len(texts)
+        span["slowest_page_s"] = max(timings, default=0.0)
+        if cached is not None:
+            span["pages_cached"] = sum(cached)
+    return ExtractedDocument(PAGE_SEPARATOR.join(texts), offsets, timings, cached or [False] * len(texts))
+
+
+def _cached_pages(source, page_cache, workers, parallel_min_pages, max_pages=None):
+    """Pages as ``(index, text, seconds)`` with cache hits filled in, plus the hit flags"""
+    with _opened(source) as pdf_bytes:
+        reader = _open_reader(pdf_bytes, max_pages)
+        keys = []
+        for page in reader.pages:
+            keys.append(f"page-text:{page_fingerprint(page)}")
+            # Like _extract_page: nothing the fingerprint resolved is kept for the next page
+            reader.resolved_objects.clear()
+        found = page_cache.get_many(keys)
+        missing = [i for i, entry in enumerate(found) if entry is None]
+
+        pages = {i: (i, entry["text"], 0.0) for i, entry in enumerate(found) if entry is not None}
+        if missing:
+            # A path is passed on as is, so pool workers map the file themselves
+            source = source if isinstance(source, (str, os.PathLike)) else pdf_bytes
+            for index, text, seconds in iter_pages(source, workers, parallel_min_pages, indices=missing):
+                pages[index] = (index, text, seconds)
+            page_cache.put_many((keys[i], {"text": pages[i][1]}) for i in missing)
+    return [pages[i] for i in range(len(keys))], [entry is not None for entry in found]
+
+
+def extract_text_from_pdf(uploaded_file):
+    """Extract text from PDF file"""
+    return extract_pages(uploaded_file).text
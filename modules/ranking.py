@@ -0,0 +1,57 @@
+import numpy as np
+
+RATING, EXPERIENCE, DISTANCE = "rating", "experience", "distance"
+
+
+def top_k(scores, k=None):
+    """Indices of the ``k`` highest scores (all when None), best first.
+
+    ``argpartition`` finds the k-th best score in linear time and only the
+    k winners are sorted. Equal scores keep their input order, also at the
+    cut-off, so the first page is unchanged when k grows ("load more").
+    """
+    n = len(scores)
+    if k is None or k >= n:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:k - len(above)]
+    chosen = np.sort(np.concatenate([above, ties]))
+    return chosen[np.argsort(-scores[chosen], kind="stable")]
+
+
+class CompositeRanker:
+    """Weighted score over rating, experience and distance.
+
+    Rating and experience are scaled to 0..1 over fixed ranges (the whole
+    directory's, so scores compare across searches) and distance costs its
+    full weight at ``distance_scale_km`` and beyond. Scoring is one pass of
+    array arithmetic over the candidate columns; a missing rating scores
+    lowest.
+    """
+
+    def __init__(self, weights, rating_range, experience_range, distance_scale_km):
+        self.weights = {RATING: 0.0, EXPERIENCE: 0.0, DISTANCE: 0.0, **weights}
+        self.rating_range = rating_range
+        self.experience_range = experience_range
+        self.distance_scale_km = distance_scale_km
+
+    @staticmethod
+    def _unit(values, value_range):
+        low, high = value_range
+        return (values.astype(np.float32) - low) / (high - low or 1)
+
+    def scores(self, rating, experience, distance_km=None):
+        w = self.weights
+        score = w[EXPERIENCE] * self._unit(experience, self.experience_range)
+        if rating is not None:
+            score += w[RATING] * self._unit(rating, self.rating_range)
+        if distance_km is not None:
+            score -= w[DISTANCE] * np.minimum(np.asarray(distance_km, dtype=np.float32) / self.distance_scale_km, 1)
+        return np.nan_to_num(score, nan=-np.inf)
+
+    def rank(self, rating, experience, distance_km=None, limit=None):
+        """Indices of the best ``limit`` candidates, best first"""
+        return top_k(self.scores(rating, experience, distance_km), limit)
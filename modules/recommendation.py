@@ -0,0 +1,61 @@
+from collections import namedtuple
+
+from modules.disease_mapper import match_disease, FUZZY_MIN_SCORE
+from modules.doctor_filtering import get_doctors_by_specialist, get_nearby_doctors, NEARBY_RADIUS_KM
+from modules.geo import city_index
+from modules.symptom_search import rank_specialists
+from modules.telemetry import telemetry
+
+# Doctors shown to patients (dashboard and API alike)
+MIN_EXPERIENCE = 2
+MIN_RATING = 3.5
+
+# ``method`` is "name" (disease name or synonym), "symptoms" (free-text
+# symptoms) or "none"; ``matches`` are the closest disease names and
+# ``doctors`` a DataFrame (None without a specialist)
+Recommendation = namedtuple(
+    "Recommendation", ["specialist", "method", "matches", "symptom_matches", "doctors", "nearby"]
+)
+
+
+def recommend(disease, location=None, limit=10):
+    """Specialist for ``disease`` and the best ``limit`` doctors, as a Recommendation.
+
+    A known disease name (or close fuzzy match) picks the specialist;
+    otherwise the text is treated as a description of symptoms. Doctors
+    come from ``location``, or from the nearest towns when it has none.
+    """
+    with telemetry.span("predict_specialist") as span:
+        matches = match_disease(disease, k=3)
+        best = matches[0] if matches and matches[0].score >= FUZZY_MIN_SCORE else None
+        specialist = best.specialist if best else None
+        symptom_matches = [] if best else rank_specialists(disease, k=3)
+        if symptom_matches:
+            specialist = symptom_matches[0].specialist
+        method = "symptoms" if symptom_matches else ("name" if best else "none")
+        span["method"] = method
+
+    if specialist is None:
+        return Recommendation(None, method, matches, symptom_matches, None, False)
+
+    with telemetry.span("get_doctors_by_specialist") as span:
+        doctors = get_doctors_by_specialist(
+            specialist, location=location or None, min_experience=MIN_EXPERIENCE, min_rating=MIN_RATING,
+            limit=limit
+        )
+        span["results"] = len(doctors)
+
+    # No match in the patient's own town: fall back to the nearest towns
+    nearby = doctors.empty and bool(location) and location in city_index.current
+    if nearby:
+        with telemetry.span("get_nearby_doctors") as span:
+            doctors = get_nearby_doctors(
+                specialist,
+                location,
+                radius_km=NEARBY_RADIUS_KM,
+                min_experience=MIN_EXPERIENCE,
+                min_rating=MIN_RATING,
+                limit=limit
+            )
+            span["results"] = len(doctors)
+    return Recommendation(specialist, method, matches, symptom_matches, doctors, nearby)
@@ -0,0 +1,121 @@
+import re
+
+import numpy as np
+from scipy import sparse
+
+from modules.summarizer import split_sentences
+from modules.telemetry import telemetry
+
+TEXTRANK, CENTROID = "textrank", "centroid"
+
+STOPWORDS = frozenset(
+    "a an and are as at be been but by for from had has have he her his in into is it its of on or "
+    "she that the their there this to was were which with".split()
+)
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+# Sentences with fewer letters than this share of their characters are
+# mostly numbers (reference ranges, lab value tables) and are ranked last
+MIN_ALPHA_RATIO = 0.5
+
+_WORD_RE = re.compile(r"[a-z][a-z0-9]+")
+
+
+def sentence_matrix(sentences):
+    """L2-normalized TF-IDF rows (sentences x terms) as a SciPy CSR matrix"""
+    vocabulary = {}
+    rows, cols = [], []
+    for row, sentence in enumerate(sentences):
+        for word in _WORD_RE.findall(sentence.lower()):
+            if word not in STOPWORDS:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(word, len(vocabulary)))
+    counts = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(sentences), len(vocabulary))
+    )
+    counts.sum_duplicates()
+    document_frequency = np.bincount(counts.indices, minlength=len(vocabulary))
+    idf = (np.log((1 + len(sentences)) / (1 + document_frequency)) + 1).astype(np.float32)
+    counts.data = (1 + np.log(counts.data)) * idf[counts.indices]
+    norms = np.sqrt(counts.multiply(counts).sum(axis=1)).A1
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms).dot(counts).tocsr()
+
+
+def textrank_scores(matrix, damping=DAMPING):
+    """PageRank over the sentence cosine-similarity graph, by power iteration.
+
+    The graph stays sparse (only sentences sharing a word are linked), so
+    long reports do not need a dense sentences x sentences matrix.
+    """
+    n = matrix.shape[0]
+    similarity = matrix.dot(matrix.T).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+    out_weight = similarity.sum(axis=1).A1
+    inverse = np.divide(1, out_weight, out=np.zeros_like(out_weight), where=out_weight > 0)
+    # Similarity is symmetric, so this is the transposed row-stochastic matrix
+    transition_t = similarity.dot(sparse.diags(inverse)).tocsr()
+    # Sentences sharing no words with any other spread their score evenly
+    dangling = out_weight == 0
+    scores = np.full(n, 1 / n)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - damping) / n + damping * (transition_t.dot(scores) + scores[dangling].sum() / n)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def centroid_scores(matrix):
+    """Cosine similarity of every sentence to the document's mean TF-IDF vector"""
+    centroid = np.asarray(matrix.mean(axis=0)).ravel()
+    norm = np.linalg.norm(centroid)
+    return matrix.dot(centroid / norm) if norm else np.zeros(matrix.shape[0])
+
+
+def select_salient(text, tokenizer, budget, method=TEXTRANK):
+    """Keep the highest-ranked sentences that fit in ``budget`` tokens.
+
+    Sentences are ranked by TextRank (or similarity to the centroid) over
+    their TF-IDF vectors; repeated sentences (page headers, disclaimers)
+    are kept once and mostly-numeric lines are ranked last. The kept
+    sentences stay in document order. Returns ``(text, stats)``; text that
+    already fits is returned unchanged.
+    """
+    with telemetry.span("salience", method=method, budget=budget) as span:
+        sentences = split_sentences(text)
+        # The leading space matches how sentences are joined back together
+        lengths = np.array(
+            [len(ids) for ids in tokenizer([" " + s for s in sentences], add_special_tokens=False)["input_ids"]]
+            if sentences else [],
+            dtype=np.int64
+        )
+        stats = {
+            "sentences_in": len(sentences),
+            "tokens_in": int(lengths.sum()),
+        }
+        if stats["tokens_in"] <= budget:
+            span.update(stats, sentences_kept=len(sentences), tokens_kept=stats["tokens_in"])
+            return text, {**stats, "sentences_kept": len(sentences), "tokens_kept": stats["tokens_in"]}
+
+        _, first = np.unique(np.array([s.lower() for s in sentences], dtype=object), return_index=True)
+        unique = np.sort(first)
+        matrix = sentence_matrix([sentences[i] for i in unique])
+        scores = textrank_scores(matrix) if method == TEXTRANK else centroid_scores(matrix)
+        alpha = np.array([sum(c.isalpha() for c in sentences[i]) / len(sentences[i]) for i in unique])
+        scores = np.where(alpha >= MIN_ALPHA_RATIO, scores, scores - scores.max() - 1)
+
+        # Greedy by score; past a sentence that overflows, shorter ones may still fit
+        kept, used = [], 0
+        for i in unique[np.argsort(-scores, kind="stable")]:
+            if used + lengths[i] <= budget:
+                kept.append(i)
+                used += lengths[i]
+        kept = np.sort(np.array(kept, dtype=np.int64))
+
+        stats.update(sentences_kept=len(kept), tokens_kept=int(lengths[kept].sum()))
+        span.update(stats)
+        return " ".join(sentences[i] for i in kept), stats
@@ -0,0 +1,376 @@
+import re
+import time
+
+from modules.deadline import decode_speed
+from modules.telemetry import telemetry
+
+# BART's encoder accepts at most 1024 positions
+MODEL_MAX_TOKENS = 1024
+SUMMARY_PREFIX = "summarize: "
+NUM_BEAMS = 2
+
+# Split after sentence punctuation or on blank/new lines (PDF text is line-broken)
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def generate_summary(text, tokenizer, model, max_length=200, min_length=50, on_text=None,
+                     num_beams=NUM_BEAMS, max_time=None):
+    """Generate summary using BART model - optimized for speed.
+
+    With ``on_text`` the summary is streamed: generation runs in a worker
+    thread and ``on_text(partial_summary)`` is called as tokens are decoded.
+    Streaming uses greedy decoding, since token streamers cannot follow
+    beam search. ``max_time`` stops generation after that many seconds.
+    """
+    try:
+        # Truncate text for faster processing
+        with telemetry.span("tokenize") as span:
+            inputs = tokenizer.encode(
+                SUMMARY_PREFIX + text,
+                max_length=MODEL_MAX_TOKENS,
+                truncation=True,
+                return_tensors="pt"
+            )
+            span["tokens_in"] = inputs.shape[1]
+
+        if on_text is not None:
+            return stream_summary(inputs, tokenizer, model, max_length, min_length, on_text, max_time)
+
+        summary_ids = generate_ids(
+            inputs, None, tokenizer, model, max_length, min_length, num_beams=num_beams, max_time=max_time
+        )
+
+        with telemetry.span("decode"):
+            summary = tokenizer.decode(
+                summary_ids[0],
+                skip_special_tokens=True
+            )
+
+        return summary
+    except Exception as e:
+        return f"Error generating summary: {str(e)}"
+
+
+def stream_summary(input_ids, tokenizer, model, max_length, min_length, on_text, max_time=None):
+    """Greedy generate in a worker thread, passing the growing summary to ``on_text``"""
+    import contextvars
+    import threading
+
+    from transformers import TextIteratorStreamer
+
+    streamer = TextIteratorStreamer(tokenizer, skip_special_tokens=True)
+    failure = []
+
+    def run():
+        try:
+            generate_ids(
+                input_ids, None, tokenizer, model, max_length, min_length,
+                num_beams=1, streamer=streamer, max_time=max_time
+            )
+        except Exception as e:
+            failure.append(e)
+            # Unblock the reader below
+            streamer.end()
+
+    # Copy the context so the worker's spans stay in the caller's trace
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(run,), daemon=True)
+    with telemetry.span("stream") as span:
+        started = time.perf_counter()
+        worker.start()
+        summary = ""
+        for piece in streamer:
+            summary += piece
+            # The streamer yields "" until it has a whole word to show
+            if not summary.strip():
+                continue
+            if "ttft_s" not in span:
+                span["ttft_s"] = time.perf_counter() - started
+            on_text(summary)
+        worker.join()
+    if failure:
+        raise failure[0]
+    return summary.strip()
+
+
+def generate_ids(input_ids, attention_mask, tokenizer, model, max_length=200, min_length=50,
+                 num_beams=NUM_BEAMS, streamer=None, max_time=None):
+    """Encoder pass and beam search, timed as separate telemetry stages.
+
+    Single-document calls also feed ``decode_speed``, the running speed
+    estimate behind deadline-aware generation.
+    """
+    import torch
+
+    if attention_mask is None:
+        attention_mask = torch.ones_like(input_ids)
+
+    with telemetry.span("encode", batch_size=input_ids.shape[0]) as span:
+        span["tokens_in"] = int(attention_mask.sum())
+        with torch.no_grad():
+            encoder_outputs = model.get_encoder()(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                return_dict=True
+            )
+    if input_ids.shape[0] == 1:
+        decode_speed.observe_encode(span["tokens_in"], span["duration_s"])
+
+    # Length penalty and early stopping only apply to beam search
+    beam_options = {"length_penalty": 1.5, "early_stopping": True} if num_beams > 1 else {}
+
+    # Generate summary with optimized parameters for speed
+    with telemetry.span("generate", batch_size=input_ids.shape[0], num_beams=num_beams) as span:
+        span["tokens_in"] = int(attention_mask.sum())
+        summary_ids = model.generate(
+            input_ids,
+            attention_mask=attention_mask,
+            encoder_outputs=encoder_outputs,
+            max_length=max_length,
+            min_length=min_length,
+            num_beams=num_beams,
+            no_repeat_ngram_size=3,
+            forced_bos_token_id=tokenizer.bos_token_id,
+            streamer=streamer,
+            max_time=max_time,
+            **beam_options
+        )
+        # Every row starts with the decoder start token, which was not generated
+        span["tokens_out"] = int((summary_ids != tokenizer.pad_token_id).sum()) - summary_ids.shape[0]
+    if input_ids.shape[0] == 1:
+        decode_speed.observe_generate(summary_ids.shape[1] - 1, num_beams, span["duration_s"])
+    return summary_ids
+
+
+def split_sentences(text):
+    """Split extracted PDF text into non-empty sentences"""
+    return [s.strip() for s in SENTENCE_SPLIT_RE.split(text) if s and s.strip()]
+
+
+def chunk_text(text, tokenizer, max_tokens=MODEL_MAX_TOKENS, overlap_sentences=1):
+    """Split text into sentence-aligned chunks that each fit the encoder.
+
+    Consecutive chunks share their last/first ``overlap_sentences`` sentences
+    so that context spanning a chunk boundary is seen by both chunks.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+
+    # Leave room for <s>, </s> and the summary prefix
+    budget = max_tokens - 2 - len(tokenizer.encode(SUMMARY_PREFIX, add_special_tokens=False))
+
+    # Tokenize every sentence in one call instead of once per chunk attempt;
+    # the leading space accounts for the separator added when chunks are joined
+    spaced = [" " + s for s in sentences]
+    lengths = [len(ids) for ids in tokenizer(spaced, add_special_tokens=False)["input_ids"]]
+
+    # A single sentence longer than the budget is hard-split on token boundaries
+    pieces, piece_lengths = [], []
+    for sentence, length in zip(sentences, lengths):
+        if length <= budget:
+            pieces.append(sentence)
+            piece_lengths.append(length)
+            continue
+        ids = tokenizer.encode(sentence, add_special_tokens=False)
+        for start in range(0, len(ids), budget - 1):
+            window = ids[start:start + budget - 1]
+            pieces.append(tokenizer.decode(window))
+            piece_lengths.append(len(window))
+
+    chunks = []
+    start = 0
+    while start < len(pieces):
+        end, used = start, 0
+        while end < len(pieces) and used + piece_lengths[end] <= budget:
+            used += piece_lengths[end]
+            end += 1
+        chunks.append(" ".join(pieces[start:end]))
+        if end >= len(pieces):
+            break
+        # Step back for the overlap, but always make forward progress
+        start = max(end - overlap_sentences, start + 1)
+
+    return chunks
+
+
+def summarize_batch(texts, tokenizer, model, max_length=200, min_length=50,
+                    batch_size=4, num_beams=NUM_BEAMS):
+    """Summarize several texts, running model.generate on padded batches"""
+    summaries = []
+    for i in range(0, len(texts), batch_size):
+        batch = [SUMMARY_PREFIX + t for t in texts[i:i + batch_size]]
+        with telemetry.span("tokenize", batch_size=len(batch)) as span:
+            inputs = tokenizer(
+                batch,
+                max_length=MODEL_MAX_TOKENS,
+                truncation=True,
+                padding=True,
+                return_tensors="pt"
+            )
+            span["tokens_in"] = int(inputs["attention_mask"].sum())
+        summary_ids = generate_ids(
+            inputs["input_ids"],
+            inputs["attention_mask"],
+            tokenizer,
+            model,
+            max_length=max_length,
+            min_length=min_length,
+            num_beams=num_beams
+        )
+        with telemetry.span("decode", batch_size=len(batch)):
+            summaries.extend(tokenizer.batch_decode(summary_ids, skip_special_tokens=True))
+    return summaries
+
+
+def reduce_chunks(texts, tokenizer, model, chunk_max_length=150, chunk_min_length=30,
+                  overlap_sentences=1, batch_size=4, summarize=summarize_batch):
+    """Map/intermediate-reduce rounds until each document fits one encoder pass.
+
+    Chunks from all documents are pooled so that every generate call runs on
+    a full padded batch. Returns the final chunk per document ("" if empty).
+    ``summarize`` runs the batches; the inference broker passes its own so
+    chunks are batched together with other sessions' requests.
+    """
+    with telemetry.span("chunk", documents=len(texts)) as span:
+        chunk_lists = [chunk_text(t, tokenizer, overlap_sentences=overlap_sentences) for t in texts]
+        span["chunks"] = sum(len(chunks) for chunks in chunk_lists)
+
+    while any(len(chunks) > 1 for chunks in chunk_lists):
+        pending = [i for i, chunks in enumerate(chunk_lists) if len(chunks) > 1]
+        flat = [chunk for i in pending for chunk in chunk_lists[i]]
+        partials = iter(summarize(
+            flat,
+            tokenizer,
+            model,
+            max_length=chunk_max_length,
+            min_length=chunk_min_length,
+            batch_size=batch_size
+        ))
+        for i in pending:
+            doc_partials = [next(partials) for _ in chunk_lists[i]]
+            chunk_lists[i] = chunk_text(" ".join(doc_partials), tokenizer, overlap_sentences=0)
+
+    return [chunks[0] if chunks else "" for chunks in chunk_lists]
+
+
+def page_summary_key(page_text, model_name, chunk_max_length, chunk_min_length, overlap_sentences, num_beams):
+    """Cache key of one page's chunk summaries: its text plus everything that shapes them"""
+    from modules.summary_cache import make_cache_key
+
+    return "page-summary:" + make_cache_key(
+        page_text.encode("utf-8"),
+        model_name,
+        chunk_max_length=chunk_max_length,
+        chunk_min_length=chunk_min_length,
+        overlap_sentences=overlap_sentences,
+        num_beams=num_beams
+    )
+
+
+def reduce_pages(pages, tokenizer, model, page_cache, model_name, chunk_max_length=150,
+                 chunk_min_length=30, overlap_sentences=1, batch_size=4, summarize=summarize_batch):
+    """Like ``reduce_chunks`` for one document, with the map step cached per page.
+
+    Each page is chunked on its own and its chunk summaries are stored in
+    ``page_cache`` under the page text's hash, so when a revised report is
+    summarized again only changed pages go through the model; the combined
+    page summaries are then reduced as usual. Chunks do not span pages
+    (sentences broken across a page boundary are summarized in two halves).
+
+    Returns ``(final_chunk, summarized_pages)``: the text for the final
+    summary pass and the indices of pages that had to be summarized now.
+    A document that fits one encoder pass needs no map step at all.
+    """
+    whole = chunk_text(" ".join(pages), tokenizer, overlap_sentences=overlap_sentences)
+    if len(whole) <= 1:
+        return (whole[0] if whole else ""), []
+
+    keys = [
+        page_summary_key(page, model_name, chunk_max_length, chunk_min_length, overlap_sentences, NUM_BEAMS)
+        for page in pages
+    ]
+    found = page_cache.get_many(keys)
+    page_summaries = [entry["summaries"] if entry is not None else None for entry in found]
+
+    missing = [i for i, summaries in enumerate(page_summaries) if summaries is None]
+    with telemetry.span("chunk", documents=1) as span:
+        chunk_lists = {i: chunk_text(pages[i], tokenizer, overlap_sentences=overlap_sentences) for i in missing}
+        span["chunks"] = sum(len(chunks) for chunks in chunk_lists.values())
+        span["pages_cached"] = len(pages) - len(missing)
+
+    # Every changed page's chunks go through the model together
+    flat = [chunk for i in missing for chunk in chunk_lists[i]]
+    partials = iter(summarize(
+        flat,
+        tokenizer,
+        model,
+        max_length=chunk_max_length,
+        min_length=chunk_min_length,
+        batch_size=batch_size
+    ) if flat else [])
+    for i in missing:
+        page_summaries[i] = [next(partials) for _ in chunk_lists[i]]
+    page_cache.put_many((keys[i], {"summaries": page_summaries[i]}) for i in missing)
+
+    combined = " ".join(summary for summaries in page_summaries for summary in summaries)
+    final = reduce_chunks(
+        [combined], tokenizer, model, chunk_max_length, chunk_min_length, 0, batch_size, summarize
+    )[0]
+    summarized = [i for i in missing if chunk_lists[i]]
+    return final, summarized
+
+
+def generate_long_summaries(texts, tokenizer, model, max_length=200, min_length=50,
+                            chunk_max_length=150, chunk_min_length=30,
+                            overlap_sentences=1, batch_size=4, summarize=summarize_batch):
+    """Map-reduce summaries for several documents at once.
+
+    Each document is reduced to a single chunk (see ``reduce_chunks``), then
+    the final summaries are generated together in padded batches.
+    """
+    finals = reduce_chunks(
+        texts, tokenizer, model, chunk_max_length, chunk_min_length, overlap_sentences, batch_size, summarize
+    )
+
+    # Final reduce: one summary per non-empty document
+    summaries = iter(summarize(
+        [f for f in finals if f],
+        tokenizer,
+        model,
+        max_length=max_length,
+        min_length=min_length,
+        batch_size=batch_size
+    ))
+    return [next(summaries) if final else "" for final in finals]
+
+
+def generate_long_summary(text, tokenizer, model, max_length=200, min_length=50,
+                          chunk_max_length=150, chunk_min_length=30,
+                          overlap_sentences=1, batch_size=4, on_text=None, summarize=summarize_batch):
+    """Map-reduce summary covering the whole document instead of the first 1024 tokens.
+
+    The text is split into overlapping chunks which are summarized in padded
+    batches (map); the chunk summaries are then summarized again (reduce),
+    recursing until the combined summaries fit in a single encoder pass.
+    With ``on_text`` the final pass is streamed (see ``generate_summary``).
+    """
+    try:
+        if on_text is None:
+            return generate_long_summaries(
+                [text],
+                tokenizer,
+                model,
+                max_length=max_length,
+                min_length=min_length,
+                chunk_max_length=chunk_max_length,
+                chunk_min_length=chunk_min_length,
+                overlap_sentences=overlap_sentences,
+                batch_size=batch_size,
+                summarize=summarize
+            )[0]
+        final = reduce_chunks(
+            [text], tokenizer, model, chunk_max_length, chunk_min_length, overlap_sentences, batch_size, summarize
+        )[0]
+        return generate_summary(final, tokenizer, model, max_length, min_length, on_text=on_text) if final else ""
+    except Exception as e:
+        return f"Error generating summary: {str(e)}"
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Cache lives on local disk next to the app so it survives restarts
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+CACHE_PATH = os.path.join(CACHE_DIR, "summaries.sqlite3")
+# Per-page extracted text and chunk summaries, for incremental re-summarization
+PAGE_CACHE_PATH = os.path.join(CACHE_DIR, "pages.sqlite3")
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def make_cache_key(pdf_bytes, model_name, **params):
+    """Content-addressed key: PDF byte hash + model name + generation parameters"""
+    digest = hashlib.sha256(pdf_bytes).hexdigest()
+    settings = json.dumps({"model": model_name, **params}, sort_keys=True)
+    return hashlib.sha256(f"{digest}:{settings}".encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """Disk-backed summary cache shared by every session and process.
+
+    Entries are evicted least-recently-used first once the stored payloads
+    exceed ``max_bytes``. Hit/miss counters are stored in the same database
+    so they reflect all workers, not just the current process, as is the
+    running total of payload bytes (kept by triggers), so a write only
+    scans the table when it has to evict.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                " key TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS summaries_last_access ON summaries(last_access)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO counters(name, value) VALUES (?, 0)",
+                [("hits",), ("misses",), ("evictions",)]
+            )
+            # Counted once for a database written before the running total existed
+            conn.execute(
+                "INSERT OR IGNORE INTO counters(name, value)"
+                " SELECT 'bytes', COALESCE(SUM(size), 0) FROM summaries"
+            )
+            # INSERT OR REPLACE does not fire delete triggers (recursive_triggers
+            # is off), so the insert trigger takes off the size of a replaced row
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS summaries_bytes_insert BEFORE INSERT ON summaries BEGIN"
+                " UPDATE counters SET value = value + NEW.size"
+                " - COALESCE((SELECT size FROM summaries WHERE key = NEW.key), 0) WHERE name = 'bytes';"
+                " END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS summaries_bytes_delete AFTER DELETE ON summaries BEGIN"
+                " UPDATE counters SET value = value - OLD.size WHERE name = 'bytes';"
+                " END"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # A fresh connection per call keeps this safe across Streamlit threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        """Return the cached payload dict for ``key`` or None"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT payload FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'misses'")
+                return None
+            conn.execute("UPDATE summaries SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'hits'")
+        return json.loads(row[0])
+
+    def get_many(self, keys):
+        """Payload dict (or None) for each of ``keys``, in one transaction"""
+        keys = list(keys)
+        if not keys:
+            return []
+        found = {}
+        with self._lock, self._connect() as conn:
+            # Stay under SQLite's limit on bound parameters
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                found.update(conn.execute(
+                    f"SELECT key, payload FROM summaries WHERE key IN ({placeholders})", batch
+                ).fetchall())
+            hits = [k for k in keys if k in found]
+            conn.executemany(
+                "UPDATE summaries SET last_access = ? WHERE key = ?", [(time.time(), k) for k in set(hits)]
+            )
+            conn.execute("UPDATE counters SET value = value + ? WHERE name = 'hits'", (len(hits),))
+            conn.execute("UPDATE counters SET value = value + ? WHERE name = 'misses'", (len(keys) - len(hits),))
+        return [json.loads(found[k]) if k in found else None for k in keys]
+
+    def put(self, key, payload):
+        """Store a JSON-serialisable payload and evict old entries if over budget"""
+        data = json.dumps(payload)
+        size = len(data.encode("utf-8"))
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries(key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, data, size, time.time())
+            )
+            self._evict(conn)
+
+    def put_many(self, items):
+        """Store several ``(key, payload)`` pairs in one transaction"""
+        rows = []
+        for key, payload in items:
+            data = json.dumps(payload)
+            rows.append((key, data, len(data.encode("utf-8")), time.time()))
+        if not rows:
+            return
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO summaries(key, payload, size, last_access) VALUES (?, ?, ?, ?)", rows
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute(
+            "SELECT key, size FROM summaries ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        conn.execute("UPDATE counters SET value = value + ? WHERE name = 'evictions'", (evicted,))
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM summaries")
+            conn.execute("UPDATE counters SET value = 0")
+
+    def stats(self):
+        """Hit/miss/eviction counts plus current entry count and size"""
+        with self._lock, self._connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries"
+            ).fetchone()
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "evictions": counters["evictions"],
+            "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+        }
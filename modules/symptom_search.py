@@ -0,0 +1,145 @@
+import os
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from modules.data_reload import register
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SYMPTOMS_PATH = os.path.join(BASE_DIR, "data", "disease_symptoms.csv")
+DISEASES_PATH = os.path.join(BASE_DIR, "data", "disease_to_doctor.csv")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from have has i in is it my of on or the to "
+    "with me im am feel feeling having since very some".split()
+)
+
+SpecialistScore = namedtuple("SpecialistScore", ["specialist", "score", "diseases"])
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Words plus adjacent-word bigrams, with stopwords removed and plurals folded"""
+    words = [
+        w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+        for w in _WORD_RE.findall(text.lower())
+        if w not in STOPWORDS
+    ]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class SymptomIndex:
+    """TF-IDF index of disease descriptions held as a SciPy CSR matrix.
+
+    Rows are diseases, columns are terms; rows are L2-normalized so one sparse
+    matrix-vector product gives the cosine score of a query against every
+    disease at once.
+    """
+
+    def __init__(self, diseases, documents, specialists):
+        self.diseases = list(diseases)
+        self.specialist_names, self._specialist_codes = np.unique(
+            np.asarray(specialists, dtype=object), return_inverse=True
+        )
+
+        vocabulary = {}
+        rows, cols = [], []
+        for row, document in enumerate(documents):
+            for term in tokenize(document):
+                rows.append(row)
+                cols.append(vocabulary.setdefault(term, len(vocabulary)))
+        self.vocabulary = vocabulary
+
+        # Duplicate (row, col) pairs are summed into raw term frequencies
+        counts = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(self.diseases), len(vocabulary))
+        )
+        counts.sum_duplicates()
+        document_frequency = np.bincount(counts.indices, minlength=len(vocabulary))
+        self.idf = (np.log((1 + len(self.diseases)) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        # Sublinear tf * idf, then L2-normalize each row
+        counts.data = (1 + np.log(counts.data)) * self.idf[counts.indices]
+        norms = np.sqrt(counts.multiply(counts).sum(axis=1)).A1
+        norms[norms == 0] = 1
+        self.matrix = sparse.diags(1 / norms).dot(counts).tocsr()
+        # Column-major copy for slicing out a query's terms
+        self._columns = self.matrix.tocsc()
+
+    @classmethod
+    def from_csv(cls, symptoms_path=SYMPTOMS_PATH, diseases_path=DISEASES_PATH):
+        symptoms = pd.read_csv(symptoms_path)
+        specialist_of = (
+            pd.read_csv(diseases_path)
+            .assign(Disease=lambda d: d["Disease"].str.strip(), Specialist=lambda d: d["Specialist"].str.strip())
+            .drop_duplicates("Disease")
+            .set_index("Disease")["Specialist"]
+        )
+        symptoms = symptoms[symptoms["Disease"].str.strip().isin(specialist_of.index)]
+        diseases = symptoms["Disease"].str.strip()
+        # The disease name itself is part of its document
+        documents = diseases + " " + symptoms["Symptoms"].fillna("")
+        return cls(diseases, documents, specialist_of[diseases].to_numpy())
+
+    def query_terms(self, query):
+        """Column ids and L2-normalized TF-IDF weights of ``query``'s known terms"""
+        terms = [self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary]
+        if not terms:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        cols, counts = np.unique(terms, return_counts=True)
+        weights = (1 + np.log(counts)) * self.idf[cols]
+        return cols, weights / np.linalg.norm(weights)
+
+    def score(self, query):
+        """Cosine score of ``query`` against every disease (one mat-vec)"""
+        cols, weights = self.query_terms(query)
+        # Only the query's columns can contribute, so multiply just those
+        return self._columns[:, cols].dot(weights)
+
+    def top_diseases(self, query, k=5):
+        scores = self.score(query)
+        k = min(k, len(scores))
+        if k <= 0:
+            # argpartition needs at least one row to pick
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.diseases[i], float(scores[i])) for i in top if scores[i] > 0]
+
+    def rank_specialists(self, query, k=3, top_diseases=10):
+        """Specialists ranked by the summed scores of their best-matching diseases"""
+        scores = self.score(query)
+        n = min(top_diseases, len(scores))
+        if n <= 0 or k <= 0:
+            return []
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[scores[top] > 0]
+        if not len(top):
+            return []
+        totals = np.bincount(
+            self._specialist_codes[top], weights=scores[top], minlength=len(self.specialist_names)
+        )
+        ranked = np.argsort(-totals, kind="stable")[:k]
+        results = []
+        for code in ranked:
+            if totals[code] <= 0:
+                break
+            members = top[self._specialist_codes[top] == code]
+            members = members[np.argsort(-scores[members], kind="stable")]
+            results.append(SpecialistScore(
+                self.specialist_names[code],
+                float(totals[code]),
+                [self.diseases[i] for i in members]
+            ))
+        return results
+
+
+symptom_index = register("symptoms", [SYMPTOMS_PATH, DISEASES_PATH], SymptomIndex.from_csv)
+
+def rank_specialists(query, k=3):
+    return symptom_index.current.rank_specialists(query, k)
@@ -0,0 +1,386 @@
+import atexit
+import contextvars
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from modules.config import METRICS_DIR, SPANS_MAX_MB, TELEMETRY
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+SPANS_FILE = "spans.jsonl"
+PROMETHEUS_FILE = "metrics.prom"
+# Each process's aggregates, merged into PROMETHEUS_FILE by whichever process exports
+PROCESS_STATE_PATTERN = "metrics.{pid}.json"
+
+# Seconds; chosen to separate sub-millisecond searches from minute-long generates
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Rewrite the Prometheus file at most this often (plus at the end of every trace)
+PROMETHEUS_INTERVAL_S = 1.0
+# Span lines are appended in batches of this many (and at every Prometheus export)
+SPANS_BUFFER_LINES = 64
+# Seconds between resident memory samples while ``memory_peak`` measures a request
+MEMORY_SAMPLE_INTERVAL_S = 0.01
+
+_current_trace = contextvars.ContextVar("docwise_trace", default=None)
+
+
+def current_rss_mb():
+    """Resident set size of this process right now"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        # No procfs (macOS/Windows): fall back to the high-water mark
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """Process high-water resident memory (0.0 where getrusage is missing)"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def process_memory_mb(pid="self"):
+    """``(rss_mb, pss_mb)`` of a process; PSS is None without procfs.
+
+    PSS (proportional set size) splits every page shared by several
+    processes between them, so PSS summed over processes that share model
+    weights counts the weights once; summed RSS counts them in full for
+    every process.
+    """
+    try:
+        kb = {}
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                # "Rss:   123456 kB"; the first line is the address range
+                name, _, value = line.partition(":")
+                if name in ("Rss", "Pss"):
+                    kb[name] = int(value.split()[0])
+        return kb["Rss"] / 1024, kb["Pss"] / 1024
+    except (OSError, KeyError, ValueError):
+        return (current_rss_mb() if pid == "self" else 0.0), None
+
+
+def _resident_and_anonymous_mb():
+    """Resident and anonymous (heap, not file-backed) MB; anonymous is None without procfs"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident, shared = (int(v) for v in f.read().split()[1:3])
+        page_mb = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        return resident * page_mb, (resident - shared) * page_mb
+    except (OSError, ValueError):
+        return peak_rss_mb(), None
+
+
+@contextmanager
+def memory_peak(interval=MEMORY_SAMPLE_INTERVAL_S):
+    """Peak memory while the block runs, sampled in a background thread.
+
+    Yields a dict filled in on exit with ``start_mb``, ``peak_mb`` and
+    ``growth_mb`` for the whole RSS, and ``anon_growth_mb`` for anonymous
+    memory only, which leaves out memory-mapped file pages the kernel can
+    drop. The figures are per process, so requests running at the same
+    time are counted together.
+    """
+    start, start_anon = _resident_and_anonymous_mb()
+    peak, peak_anon = start, start_anon
+    stop = threading.Event()
+
+    def sample():
+        nonlocal peak, peak_anon
+        while True:
+            resident, anonymous = _resident_and_anonymous_mb()
+            peak = max(peak, resident)
+            if anonymous is not None:
+                peak_anon = max(peak_anon, anonymous)
+            if stop.wait(interval):
+                return
+
+    sampler = threading.Thread(target=sample, name="docwise-memory-sampler", daemon=True)
+    sampler.start()
+    record = {}
+    try:
+        yield record
+    finally:
+        stop.set()
+        sampler.join()
+        record.update({
+            "start_mb": round(start, 1),
+            "peak_mb": round(peak, 1),
+            "growth_mb": round(peak - start, 1),
+            "anon_growth_mb": round(peak_anon - start_anon, 1) if start_anon is not None else None,
+        })
+
+
+class Telemetry:
+    """Timing spans written to a JSON-lines log and a Prometheus text file.
+
+    ``trace`` groups the spans of one request (a summary, a doctor search);
+    ``span`` times one stage and records whatever attributes the caller adds
+    to the yielded dict (token counts, result sizes). Aggregates are exposed
+    in Prometheus text format for a node-exporter textfile collector or any
+    scraper that can read a file.
+
+    Pre-forked API workers and inference pool workers each keep their own
+    aggregates (a forked child starts from zero) and save them to a
+    per-pid state file; every export merges the state files of the live
+    processes, so the Prometheus file covers all of them.
+    """
+
+    def __init__(self, log_dir=METRICS_DIR, enabled=TELEMETRY, spans_max_mb=SPANS_MAX_MB):
+        self.enabled = enabled
+        self.log_dir = log_dir
+        self.spans_path = os.path.join(log_dir, SPANS_FILE)
+        self.prometheus_path = os.path.join(log_dir, PROMETHEUS_FILE)
+        self.spans_max_bytes = int(spans_max_mb * 1024 * 1024)
+        self._reset()
+        if hasattr(os, "register_at_fork"):
+            # Not on Windows, which has no fork
+            os.register_at_fork(after_in_child=self._reset)
+        if enabled:
+            os.makedirs(log_dir, exist_ok=True)
+            atexit.register(self.flush_spans)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        # Held for a whole export so concurrent traces don't interleave their file writes
+        self._export_lock = threading.Lock()
+        self._durations = {}
+        self._tokens = {}
+        # stage -> (tokens/s of the latest call, when it was recorded)
+        self._tokens_per_second = {}
+        self._last_export = 0.0
+        # Span lines not yet appended to the log
+        self._pending = []
+
+    @contextmanager
+    def trace(self, name, **attrs):
+        """Group the spans opened inside this block; yields the trace dict"""
+        trace = {"trace_id": uuid.uuid4().hex[:16], "name": name, "spans": []}
+        token = _current_trace.set(trace)
+        try:
+            with self.span(name, **attrs) as record:
+                yield trace
+                record["stages"] = len(trace["spans"])
+        finally:
+            _current_trace.reset(token)
+            if self.enabled:
+                self.write_prometheus()
+
+    @contextmanager
+    def span(self, stage, **attrs):
+        """Time one stage; yields a dict the caller can add attributes to"""
+        record = dict(attrs)
+        peak_before = peak_rss_mb()
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            duration = time.perf_counter() - started
+            trace = _current_trace.get()
+            peak_after = peak_rss_mb()
+            record.update({
+                "stage": stage,
+                "trace_id": trace["trace_id"] if trace else None,
+                "start": started_at,
+                "duration_s": duration,
+                "rss_mb": round(current_rss_mb(), 1),
+                "peak_rss_mb": round(peak_after, 1),
+                "peak_rss_growth_mb": round(peak_after - peak_before, 1),
+            })
+            if record.get("tokens_out") and duration > 0:
+                record["tokens_per_s"] = record["tokens_out"] / duration
+            if trace is not None and trace["name"] != stage:
+                trace["spans"].append(record)
+            if self.enabled:
+                self._record(record)
+
+    def _record(self, record):
+        stage = record["stage"]
+        line = json.dumps(record, default=str)
+        with self._lock:
+            stats = self._durations.setdefault(
+                stage, {"count": 0, "sum": 0.0, "buckets": [0] * len(DURATION_BUCKETS)}
+            )
+            stats["count"] += 1
+            stats["sum"] += record["duration_s"]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if record["duration_s"] <= bound:
+                    stats["buckets"][i] += 1
+            for direction in ("tokens_in", "tokens_out"):
+                if record.get(direction):
+                    key = (stage, direction[len("tokens_"):])
+                    self._tokens[key] = self._tokens.get(key, 0) + int(record[direction])
+            if "tokens_per_s" in record:
+                self._tokens_per_second[stage] = (record["tokens_per_s"], record["start"])
+            self._pending.append(line + "\n")
+            full = len(self._pending) >= SPANS_BUFFER_LINES
+            due = time.monotonic() - self._last_export >= PROMETHEUS_INTERVAL_S
+        if due:
+            self.write_prometheus()
+        elif full:
+            self.flush_spans()
+
+    def flush_spans(self):
+        """Append the buffered span lines to the log, rotating it first once it is over the size cap"""
+        with self._lock:
+            lines, self._pending = self._pending, []
+            if not lines:
+                return
+            if self.spans_max_bytes:
+                try:
+                    if os.path.getsize(self.spans_path) >= self.spans_max_bytes:
+                        os.replace(self.spans_path, self.spans_path + ".1")
+                except OSError:
+                    pass  # no log yet
+            try:
+                with open(self.spans_path, "a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+            except OSError:
+                pass  # telemetry must never fail the request it measures
+
+    def _state(self):
+        """This process's aggregates as a JSON-serialisable dict"""
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "durations": {stage: dict(stats, buckets=list(stats["buckets"]))
+                              for stage, stats in self._durations.items()},
+                "tokens": [[stage, direction, total] for (stage, direction), total in self._tokens.items()],
+                "tokens_per_second": {stage: list(latest) for stage, latest in self._tokens_per_second.items()},
+                "rss_bytes": int(current_rss_mb() * 1024 * 1024),
+                "peak_rss_bytes": int(peak_rss_mb() * 1024 * 1024),
+            }
+
+    def _process_states(self):
+        """Saved state of every live process sharing the log directory; files of dead ones are removed"""
+        states = []
+        prefix, suffix = PROCESS_STATE_PATTERN.split("{pid}")
+        for name in os.listdir(self.log_dir):
+            if not (name.startswith(prefix) and name.endswith(suffix)):
+                continue
+            path = os.path.join(self.log_dir, name)
+            try:
+                pid = int(name[len(prefix):-len(suffix)])
+                if os.name == "nt":
+                    # os.kill(pid, 0) would terminate the process there, and with
+                    # no fork there are no worker processes to merge
+                    if pid != os.getpid():
+                        continue
+                else:
+                    os.kill(pid, 0)
+            except ValueError:
+                continue
+            except ProcessLookupError:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            except PermissionError:
+                pass
+            try:
+                with open(path, encoding="utf-8") as f:
+                    states.append(json.load(f))
+            except (OSError, ValueError):
+                # Being replaced right now or half written by a dying process
+                continue
+        return states
+
+    def render_prometheus(self, states=None):
+        """Aggregates of ``states`` (default: this process's) in Prometheus text exposition format"""
+        states = [self._state()] if states is None else states
+        durations, tokens, latest = {}, {}, {}
+        for state in states:
+            for stage, stats in state["durations"].items():
+                merged = durations.setdefault(stage, {"count": 0, "sum": 0.0, "buckets": [0] * len(DURATION_BUCKETS)})
+                merged["count"] += stats["count"]
+                merged["sum"] += stats["sum"]
+                merged["buckets"] = [a + b for a, b in zip(merged["buckets"], stats["buckets"])]
+            for stage, direction, total in state["tokens"]:
+                tokens[(stage, direction)] = tokens.get((stage, direction), 0) + total
+            for stage, (rate, at) in state["tokens_per_second"].items():
+                if stage not in latest or at > latest[stage][1]:
+                    latest[stage] = (rate, at)
+
+        lines = [
+            "# HELP docwise_stage_duration_seconds Time spent in each pipeline stage.",
+            "# TYPE docwise_stage_duration_seconds histogram",
+        ]
+        for stage, stats in sorted(durations.items()):
+            for bound, count in zip(DURATION_BUCKETS, stats["buckets"]):
+                lines.append(f'docwise_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'docwise_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {stats["count"]}')
+            lines.append(f'docwise_stage_duration_seconds_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+            lines.append(f'docwise_stage_duration_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        lines += [
+            "# HELP docwise_tokens_total Tokens consumed (in) and produced (out) per stage.",
+            "# TYPE docwise_tokens_total counter",
+        ]
+        for (stage, direction), total in sorted(tokens.items()):
+            lines.append(f'docwise_tokens_total{{stage="{stage}",direction="{direction}"}} {total}')
+        lines += [
+            "# HELP docwise_tokens_per_second Generated tokens per second of the latest call.",
+            "# TYPE docwise_tokens_per_second gauge",
+        ]
+        for stage, (rate, _) in sorted(latest.items()):
+            lines.append(f'docwise_tokens_per_second{{stage="{stage}"}} {rate:.3f}')
+        lines += [
+            "# HELP docwise_resident_memory_bytes Current resident memory of each process.",
+            "# TYPE docwise_resident_memory_bytes gauge",
+            *(f'docwise_resident_memory_bytes{{pid="{state["pid"]}"}} {state["rss_bytes"]}' for state in states),
+            "# HELP docwise_peak_resident_memory_bytes Peak resident memory of each process.",
+            "# TYPE docwise_peak_resident_memory_bytes gauge",
+            *(f'docwise_peak_resident_memory_bytes{{pid="{state["pid"]}"}} {state["peak_rss_bytes"]}'
+              for state in states),
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _write_atomic(self, path, text):
+        # A temp file of its own per write, so no other writer can replace it first
+        fd, tmp_path = tempfile.mkstemp(dir=self.log_dir, prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            # mkstemp creates it owner-only; keep the file readable by a metrics scraper
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def write_prometheus(self):
+        """Flush the span log, save this process's state, then atomically rewrite the merged metrics file"""
+        with self._lock:
+            self._last_export = time.monotonic()
+        self.flush_spans()
+        try:
+            with self._export_lock:
+                self._write_atomic(
+                    os.path.join(self.log_dir, PROCESS_STATE_PATTERN.format(pid=os.getpid())),
+                    json.dumps(self._state()),
+                )
+                self._write_atomic(self.prometheus_path, self.render_prometheus(self._process_states()))
+        except OSError:
+            pass  # a missed export is picked up by the next one; never fail the request over it
+
+
+telemetry = Telemetry()
@@ -0,0 +1,107 @@
+import io
+import mmap
+import os
+import tempfile
+
+from modules.config import UPLOAD_MAX_MB, UPLOAD_SPOOL_MB, UPLOAD_TMP_DIR
+
+MB = 1024 * 1024
+# Uploads are copied in pieces of this size, so no full second copy is made
+READ_CHUNK_BYTES = MB
+
+
+class UploadTooLarge(ValueError):
+    """An upload over the per-request byte or page limit"""
+
+
+class SpooledUpload:
+    """A PDF upload held in memory up to ``spool_bytes`` and in a temp file beyond.
+
+    Spooled uploads are never read back into memory: the extractor parses
+    them through a read-only memory map (``source()`` is then the file's
+    path), so their pages are file cache the kernel can drop rather than
+    worker heap. Writing past ``max_bytes`` raises UploadTooLarge.
+    ``close()`` (or leaving a ``with`` block) unmaps and deletes the temp
+    file. The file is not delete-on-close, so the extractor can open it by
+    name while it is still open here (which Windows would refuse).
+    """
+
+    def __init__(self, max_bytes=UPLOAD_MAX_MB * MB, spool_bytes=UPLOAD_SPOOL_MB * MB):
+        self.max_bytes = max_bytes
+        self.spool_bytes = spool_bytes
+        self.size = 0
+        self._memory = io.BytesIO()
+        self._file = None
+        self._map = None
+
+    @classmethod
+    def from_stream(cls, stream, length=None, **limits):
+        """Copy ``length`` bytes (or everything) from a file-like object in chunks"""
+        upload = cls(**limits)
+        try:
+            remaining = length
+            while remaining is None or remaining > 0:
+                chunk = stream.read(READ_CHUNK_BYTES if remaining is None else min(READ_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                upload.write(chunk)
+                if remaining is not None:
+                    remaining -= len(chunk)
+        except BaseException:
+            upload.close()
+            raise
+        return upload
+
+    def write(self, chunk):
+        if self.size + len(chunk) > self.max_bytes:
+            raise UploadTooLarge(f"upload larger than {self.max_bytes / MB:g} MB")
+        self.size += len(chunk)
+        if self._file is None and self.size > self.spool_bytes:
+            self._file = tempfile.NamedTemporaryFile(
+                prefix="docwise-upload-", suffix=".pdf", dir=UPLOAD_TMP_DIR, delete=False
+            )
+            self._file.write(self._memory.getbuffer())
+            self._memory = None
+        (self._memory if self._file is None else self._file).write(chunk)
+
+    @property
+    def spooled(self):
+        return self._file is not None
+
+    def data(self):
+        """The PDF as a bytes-like object: bytes in memory, or an mmap of the temp file"""
+        if self._file is None:
+            return self._memory.getvalue()
+        if self._map is None:
+            self._file.flush()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def source(self):
+        """What to hand to ``extract_pages``: the temp file's path when spooled, else the bytes"""
+        if self._file is None:
+            return self._memory.getvalue()
+        self._file.flush()
+        return self._file.name
+
+    def close(self):
+        """Unmap and delete the temp file; calling it again does nothing"""
+        self._memory = None
+        try:
+            if self._map is not None:
+                self._map.close()
+        finally:
+            self._map = None
+            if self._file is not None and not self._file.closed:
+                # Unmapped first: Windows cannot delete a file that is still mapped
+                self._file.close()
+                try:
+                    os.unlink(self._file.name)
+                except FileNotFoundError:
+                    pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,17 @@
+import pytest
+
+from modules.model_loader import build_tiny_bart
+
+
+@pytest.fixture(scope="session")
+def tiny_bart(tmp_path_factory):
+    """``(path, tokenizer, model)`` of a tiny random BART saved to a temp directory"""
+    # Imported here so tests that need no model run without torch installed
+    import torch
+
+    torch.manual_seed(0)
+    path = str(tmp_path_factory.mktemp("tiny-bart"))
+    tokenizer, model = build_tiny_bart(path, d_model=64, layers=2)
+    tokenizer.save_pretrained(path)
+    model.save_pretrained(path)
+    return path, tokenizer, model
@@ -0,0 +1,50 @@
+"""End-to-end runs of batch_summarize.py in a subprocess, so a hang fails the test instead of the suite."""
+
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.synthetic import make_pdf
+from modules.pdf_extractor import PARALLEL_MIN_PAGES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TIMEOUT_S = 120
+
+
+def _run(input_dir, output, model_path, *extra):
+    return subprocess.run(
+        [
+            sys.executable, "batch_summarize.py", str(input_dir), "-o", str(output),
+            "--model", model_path, "--max-length", "16", "--min-length", "4", *extra
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=TIMEOUT_S,
+    )
+
+
+def test_run_with_large_pdfs_exits(tiny_bart, tmp_path):
+    # Large enough that extract_pages would fan its pages out to a pool of its own
+    path, _, _ = tiny_bart
+    reports = tmp_path / "reports"
+    reports.mkdir()
+    pdf = make_pdf(PARALLEL_MIN_PAGES + 6)
+    names = [f"report-{i}.pdf" for i in range(4)]
+    for name in names:
+        (reports / name).write_bytes(pdf)
+    output = tmp_path / "summaries.jsonl"
+
+    completed = _run(reports, output, path, "--extract-workers", "2", "--batch-size", "2")
+
+    assert completed.returncode == 0, completed.stderr
+    assert "docs/sec" in completed.stdout
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted(record["file"] for record in records) == names
+    assert all("summary" in record for record in records)
+
+    # A second run finds everything done
+    completed = _run(reports, output, path)
+    assert completed.returncode == 0, completed.stderr
+    assert "4 already done, 0 to summarize" in completed.stderr
@@ -0,0 +1,68 @@
+"""DoctorIndex.search must return exactly what the original per-call pandas filter did."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_doctor_df
+from modules.doctor_filtering import DoctorIndex
+
+
+def pandas_filter(doctor_df, specialist, location=None, min_experience=0, min_rating=None):
+    """The original per-call pandas filter and sort, kept here as the reference"""
+    doctor_df = doctor_df.assign(Specialist=doctor_df["Specialist"].str.strip().str.lower())
+    filtered = doctor_df[doctor_df["Specialist"] == specialist.strip().lower()]
+    if location:
+        filtered = filtered[filtered["Location"].str.strip().str.lower() == location.strip().lower()]
+    filtered = filtered[filtered["Experience"] >= min_experience]
+    if min_rating is not None and "Rating" in filtered.columns:
+        filtered = filtered[filtered["Rating"] >= min_rating]
+        return filtered.sort_values(by=["Rating", "Experience"], ascending=[False, False])
+    return filtered.sort_values(by="Experience", ascending=False)
+
+
+@pytest.fixture(scope="module", params=["whole years", "fractional and missing years"])
+def doctors(request):
+    df = make_doctor_df(2000, locations=["Chennai", "Madurai", "Coimbatore", "Salem"])
+    # Mixed case and stray whitespace, which both implementations normalize
+    df.loc[::7, "Specialist"] = " " + df.loc[::7, "Specialist"].str.upper() + " "
+    df.loc[::5, "Location"] = df.loc[::5, "Location"].str.lower() + "  "
+    if request.param != "whole years":
+        # 5.9 and 5.1 must not tie, and a missing value must not sort first
+        df["Experience"] = df["Experience"] + np.resize([0.0, 0.1, 0.9, 0.5], len(df))
+        df.loc[::11, "Experience"] = np.nan
+    return df
+
+
+QUERIES = [
+    # (specialist, location, min_experience, min_rating)
+    ("Cardiologist", "Chennai", 0, 4.0),
+    (" cardiologist ", "  CHENNAI", 10, 3.5),
+    ("Neurologist", None, 5, 4.5),
+    ("Dermatologist", "Madurai", 12, None),
+    ("Dermatologist", None, 0, None),
+    ("Oncologist", "Salem", 40, None),
+    ("No Such Specialist", None, 0, None),
+]
+
+
+@pytest.mark.parametrize("specialist, location, min_experience, min_rating", QUERIES)
+def test_search_matches_legacy_filter(doctors, specialist, location, min_experience, min_rating):
+    args = (specialist, location, min_experience, min_rating)
+    expected = pandas_filter(doctors, *args)
+    actual = DoctorIndex(doctors).search(*args)
+
+    assert actual.attrs["total"] == len(expected)
+    if min_rating is not None:
+        # The multi-column sort is stable, so the order must match exactly
+        assert actual.index.equals(expected.index)
+    else:
+        # A single-column sort_values is not stable: same rows, experience descending
+        assert set(actual.index) == set(expected.index)
+        assert actual["Experience"].is_monotonic_decreasing
+    pd.testing.assert_frame_equal(
+        actual.loc[expected.index].reset_index(drop=True),
+        expected.reset_index(drop=True),
+        check_dtype=False,
+        check_categorical=False,
+    )
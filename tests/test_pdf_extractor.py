@@ -0,0 +1,37 @@
+"""Page fingerprints must not keep scanned images in PyPDF2's object cache."""
+
+import io
+
+import PyPDF2
+
+from benchmarks.synthetic import make_pdf
+from modules.pdf_extractor import extract_pages, page_fingerprint
+from modules.summary_cache import SummaryCache
+
+
+def _cached_images(reader):
+    return [
+        obj for obj in reader.resolved_objects.values()
+        if isinstance(obj, dict) and obj.get("/Subtype") == "/Image"
+    ]
+
+
+def test_fingerprint_drops_image_xobjects():
+    reader = PyPDF2.PdfReader(io.BytesIO(make_pdf(3, image_kb=64)))
+    fingerprints = [page_fingerprint(page) for page in reader.pages]
+
+    assert len(set(fingerprints)) == 3
+    assert _cached_images(reader) == []
+
+
+def test_cached_extraction_matches_plain_extraction(tmp_path):
+    pdf = make_pdf(4, image_kb=16)
+    cache = SummaryCache(str(tmp_path / "pages.db"))
+
+    plain = extract_pages(pdf)
+    first = extract_pages(pdf, page_cache=cache)
+    second = extract_pages(pdf, page_cache=cache)
+
+    assert first.text == plain.text == second.text
+    assert first.page_cached == [False] * 4
+    assert second.page_cached == [True] * 4
@@ -0,0 +1,99 @@
+"""Dynamic int8 quantization against a tiny BART built offline (no downloads)."""
+
+import pytest
+import torch
+
+from modules.model_loader import compare_quantization, load_model, quantize_model, state_dict_mb
+from modules.summarizer import generate_summary
+
+REPORT = (
+    "Patient presented with mild fever and cough for three days. Chest examination was clear. "
+    "Blood counts were within normal limits and the chest X-ray showed no consolidation."
+)
+
+
+def _linear_layers(model):
+    return [name for name, module in model.named_modules() if type(module) is torch.nn.Linear]
+
+
+def _quantized_layers(model):
+    return [
+        name for name, module in model.named_modules()
+        if isinstance(module, torch.ao.nn.quantized.dynamic.Linear)
+    ]
+
+
+def test_quantize_model_replaces_every_linear_layer(tiny_bart):
+    _, _, model = tiny_bart
+    linear = _linear_layers(model)
+    quantized = quantize_model(model)
+
+    assert linear
+    assert _linear_layers(quantized) == []
+    assert _quantized_layers(quantized) == linear
+    # quantize_dynamic works on a copy; the fp32 model is left as it was
+    assert _linear_layers(model) == linear
+
+
+def test_quantized_logits_stay_close_to_fp32(tiny_bart):
+    _, tokenizer, model = tiny_bart
+    quantized = quantize_model(model)
+    inputs = tokenizer(REPORT, return_tensors="pt")
+    decoder_input_ids = inputs["input_ids"][:, :16]
+
+    with torch.no_grad():
+        fp32 = model(**inputs, decoder_input_ids=decoder_input_ids).logits
+        int8 = quantized(**inputs, decoder_input_ids=decoder_input_ids).logits
+
+    assert not torch.equal(fp32, int8)
+    relative_error = (fp32 - int8).norm() / fp32.norm()
+    assert relative_error < 0.1
+
+
+def test_quantized_model_is_smaller(tiny_bart):
+    _, _, model = tiny_bart
+    assert state_dict_mb(quantize_model(model)) < 0.75 * state_dict_mb(model)
+
+
+def test_load_model_quantize(tiny_bart):
+    path, _, _ = tiny_bart
+    tokenizer, model = load_model(path, quantize=True)
+
+    assert _linear_layers(model) == []
+    assert _quantized_layers(model)
+    assert not model.training
+    summary = generate_summary(REPORT, tokenizer, model, max_length=16, min_length=4)
+    assert isinstance(summary, str)
+    assert not summary.startswith("Error generating summary")
+
+
+def test_compare_quantization_report(tiny_bart):
+    _, tokenizer, model = tiny_bart
+    report = compare_quantization(REPORT, tokenizer, model, max_length=16, min_length=4)
+
+    for label in ("fp32", "int8"):
+        assert report[label]["latency_s"] > 0
+        assert report[label]["state_dict_mb"] > 0
+        assert report[label]["rss_after_mb"] > 0
+        assert isinstance(report[label]["rss_growth_mb"], float)
+        assert isinstance(report[label]["summary"], str)
+    assert report["state_dict_ratio"] == pytest.approx(
+        report["int8"]["state_dict_mb"] / report["fp32"]["state_dict_mb"]
+    )
+    assert report["state_dict_ratio"] < 0.75
+    assert report["speedup"] > 0
+    assert 0.0 <= report["summary_overlap_f1"] <= 1.0
+    assert set(report["memory_figures"]) == {"state_dict_mb", "rss_growth_mb", "rss_after_mb"}
+    # The model passed in is compared as fp32, not quantized in place
+    assert _linear_layers(model)
+
+
+def test_compare_quantization_raises_on_failed_generate(tiny_bart, monkeypatch):
+    _, tokenizer, model = tiny_bart
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("out of memory")
+
+    monkeypatch.setattr(model, "generate", fail)
+    with pytest.raises(RuntimeError, match="fp32 Error generating summary: out of memory"):
+        compare_quantization(REPORT, tokenizer, model, max_length=16, min_length=4)
@@ -0,0 +1,44 @@
+"""SummaryCache keeps its running byte total in step with the stored payloads."""
+
+import sqlite3
+
+from modules.summary_cache import SummaryCache
+
+
+def _stored_bytes(path):
+    conn = sqlite3.connect(path)
+    try:
+        total = conn.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()[0]
+        actual = conn.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+    finally:
+        conn.close()
+    return total, actual
+
+
+def test_running_total_tracks_puts_replacements_and_evictions(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SummaryCache(path, max_bytes=1000)
+
+    cache.put("a", {"summary": "x" * 100})
+    cache.put("a", {"summary": "x" * 40})
+    cache.put_many((f"k{i}", {"summary": "y" * 100}) for i in range(20))
+    total, actual = _stored_bytes(path)
+
+    assert total == actual <= 1000
+    assert cache.stats()["evictions"] > 0
+    cache.clear()
+    assert _stored_bytes(path) == (0, 0)
+
+
+def test_running_total_is_counted_for_an_existing_database(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SummaryCache(path).put("a", {"summary": "x" * 100})
+    # As written before the running total existed
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("DELETE FROM counters WHERE name = 'bytes'")
+    conn.close()
+
+    SummaryCache(path)
+    total, actual = _stored_bytes(path)
+    assert total == actual > 0
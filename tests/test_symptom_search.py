@@ -0,0 +1,36 @@
+"""SymptomIndex queries on empty corpora, zero limits and queries that match nothing."""
+
+import pytest
+
+from modules.symptom_search import SymptomIndex
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SymptomIndex(
+        ["Influenza", "Migraine", "Eczema"],
+        ["fever cough body ache", "throbbing headache nausea", "itchy dry skin rash"],
+        ["General Physician", "Neurologist", "Dermatologist"],
+    )
+
+
+def test_empty_corpus_returns_nothing():
+    empty = SymptomIndex([], [], [])
+    assert empty.top_diseases("fever") == []
+    assert empty.rank_specialists("fever") == []
+
+
+def test_zero_limits_return_nothing(index):
+    assert index.top_diseases("fever", k=0) == []
+    assert index.rank_specialists("fever", k=0) == []
+    assert index.rank_specialists("fever", top_diseases=0) == []
+
+
+def test_no_matching_terms_returns_nothing(index):
+    assert index.top_diseases("broken ankle") == []
+    assert index.rank_specialists("broken ankle") == []
+
+
+def test_match_is_ranked(index):
+    assert [name for name, _ in index.top_diseases("headache and nausea", k=5)] == ["Migraine"]
+    assert index.rank_specialists("skin rash")[0].specialist == "Dermatologist"